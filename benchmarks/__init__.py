@@ -0,0 +1 @@
+"""Benchmarks of the data pipeline and the section render paths."""
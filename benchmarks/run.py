@@ -0,0 +1,202 @@
+"""Time the data pipeline and the section render paths on synthetic data.
+
+For each size, a synthetic consolidation is generated (and kept for the
+next runs), then every stage of the pipeline is timed on a cold cache:
+CSV parsing into the Parquet cache, Parquet load, preparation, station
+table, aggregates and the indexes the sections build. The app itself is
+then run headless with AppTest, once to load the data and once per
+section, with the chart and table calls stubbed out so the timings cover
+the section code rather than the browser payload.
+
+Results are written as JSON; pass a previous result file as --baseline to
+flag the steps that got slower.
+
+    python -m benchmarks.run --rows 100000 1000000 5000000
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from irve.instrument import peak_rss_mb
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_ROWS = [100_000, 1_000_000, 5_000_000]
+
+# A step is reported as a regression when it is this much slower than the baseline
+REGRESSION_RATIO = 1.2
+# Steps faster than this (in seconds) are too noisy to compare
+MIN_COMPARED_SECONDS = 0.05
+
+# Rendering calls replaced by no-ops when timing the sections
+STUBBED_CALLS = ['plotly_chart', 'dataframe']
+
+
+class Timer:
+    """Collects the wall time and peak memory of named steps"""
+
+    def __init__(self):
+        self.steps = {}
+
+    def __call__(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.steps[name] = {
+            'seconds': round(time.perf_counter() - start, 4),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        print(f'  {name:<28} {self.steps[name]["seconds"]:>9.3f} s', flush=True)
+        return result
+
+
+def bench_pipeline(timer, source, cache_dir):
+    """Time each stage of the data pipeline, from the CSV to the section indexes"""
+    from irve.aggregates import compute_aggregates, stream_aggregates
+    from irve.cache import build_cache, load_table
+    from irve.cube import build_cube
+    from irve.dataset import prepare
+    from irve.nearest import DC_FAST_KW, ChargerIndex, commune_points
+    from irve.spatial import VIEWS, build_grid_index
+    from irve.stations import build_stations
+
+    timer('csv_to_parquet', build_cache, source, cache_dir)
+    table = timer('parquet_load', load_table, source, cache_dir)
+    frame = timer('prepare', prepare, table)
+    stations = timer('stations', build_stations, frame)
+    timer('aggregates', compute_aggregates, frame, stations)
+    timer('stream_aggregates', stream_aggregates, source, cache_dir=Path(cache_dir) / 'stream')
+
+    grid = timer('grid_index', build_grid_index, stations)
+    bbox = VIEWS['Metropolitan France']
+    timer('grid_cells', lambda: grid.cells(grid.pick_level(bbox), bbox))
+
+    charger_index = ChargerIndex(stations)
+    points = commune_points(stations)
+    timer('coverage', charger_index.uncovered_share,
+          points['longitude'], points['latitude'], 10, DC_FAST_KW)
+
+    cube = timer('cube', build_cube, frame, stations)
+    region = cube.values('region')[0]
+    timer('cube_slice', lambda: cube.slice(regions=[region], years=(2018, 2023)).aggregates())
+
+
+def bench_app(timer, source, cache_dir, sections, stub=True):
+    """Time the app: the first run loads the data, then one run per section"""
+    import streamlit as st
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # Bare-mode warnings would drown the timings
+    set_log_level('error')
+
+    os.environ['IRVE_CACHE_DIR'] = str(cache_dir)
+    os.environ['IRVE_DATA_DIR'] = str(Path(source).parent)
+    # The irve modules read their configuration at import time
+    for name in [name for name in sys.modules if name == 'irve' or name.startswith('irve.')]:
+        del sys.modules[name]
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    originals = {call: getattr(st, call) for call in STUBBED_CALLS}
+    if stub:
+        for call in STUBBED_CALLS:
+            setattr(st, call, lambda *args, **kwargs: None)
+    try:
+        app = AppTest.from_file(str(ROOT / 'streamlit_app.py'), default_timeout=3600)
+        timer('app_load', app.run)
+        for section in sections:
+            app.session_state.current_section = section
+            timer(f'section_{section}', app.run)
+            errors = [e.value for e in app.exception] + [e.value for e in app.error]
+            if errors:
+                raise RuntimeError(f'section {section} failed: {errors}')
+    finally:
+        for call, original in originals.items():
+            setattr(st, call, original)
+
+
+def compare(results, baseline):
+    """Steps of results slower than the baseline run on the same size"""
+    regressions = []
+    for rows, run in results['runs'].items():
+        previous = baseline.get('runs', {}).get(rows, {})
+        for step, timing in run.items():
+            before = previous.get(step, {}).get('seconds')
+            if before is None or max(before, timing['seconds']) < MIN_COMPARED_SECONDS:
+                continue
+            ratio = timing['seconds'] / before if before else float('inf')
+            if ratio > REGRESSION_RATIO:
+                regressions.append({'rows': rows, 'step': step, 'before': before,
+                                    'after': timing['seconds'], 'ratio': round(ratio, 2)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--sections', nargs='+', default=['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII'])
+    parser.add_argument('--data-dir', default=str(ROOT / '.irve_bench'),
+                        help='where the synthetic CSVs are kept between runs')
+    parser.add_argument('--output', default=None,
+                        help='result file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', default=None, help='previous result file to compare with')
+    parser.add_argument('--render', action='store_true', help='keep the chart and table calls')
+    parser.add_argument('--no-app', action='store_true', help='only time the pipeline stages')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import release_name, write_csv
+
+    started = datetime.now(UTC)
+    import numpy
+    import pandas
+    import pyarrow
+    results = {
+        'started': started.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'versions': {'pandas': pandas.__version__, 'numpy': numpy.__version__, 'pyarrow': pyarrow.__version__},
+        'stubbed': [] if args.render else STUBBED_CALLS,
+        'runs': {},
+    }
+
+    for rows in args.rows:
+        # One directory per size, holding a single release for the app to serve
+        source = Path(args.data_dir) / f'{rows}-seed{args.seed}' / release_name()
+        if not source.exists():
+            print(f'generating {rows:,} rows -> {source}', flush=True)
+            write_csv(source, rows, args.seed)
+        print(f'{rows:,} rows ({source.stat().st_size / (1 << 20):.0f} MB)', flush=True)
+
+        timer = Timer()
+        cache_dir = Path(tempfile.mkdtemp(prefix='irve-bench-'))
+        try:
+            bench_pipeline(timer, source, cache_dir / 'pipeline')
+            if not args.no_app:
+                bench_app(timer, source, cache_dir / 'app', args.sections, stub=not args.render)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        results['runs'][str(rows)] = timer.steps
+
+    output = Path(args.output or ROOT / 'benchmarks' / 'results' / f'{started:%Y%m%dT%H%M%S}.json')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if args.baseline:
+        results['regressions'] = compare(results, json.loads(Path(args.baseline).read_text()))
+        for r in results['regressions']:
+            print(f'slower: {r["step"]} at {int(r["rows"]):,} rows, '
+                  f'{r["before"]:.3f} s -> {r["after"]:.3f} s (x{r["ratio"]})')
+    output.write_text(json.dumps(results, indent=2))
+    print(f'results written to {output}')
+    return 1 if results.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
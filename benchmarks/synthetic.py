@@ -0,0 +1,158 @@
+"""Synthetic IRVE consolidation CSVs for the benchmarks.
+
+The files follow the columns and value formats of the consolidation, with
+cardinalities close to the real one: a few hundred operators, thousands of
+communes spread over every department, about three charge points (PDC
+rows) per station, a share of rows without a date or a station id, and a
+few duplicated PDC ids. Rows are written in chunks, so generating the 5M
+row file does not need the whole table in memory.
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from irve.geo import DEPARTMENT_REGION
+from irve.spatial import VIEWS
+
+# Bounding box of the communes of each overseas department
+OVERSEAS_VIEWS = {
+    '971': 'Guadeloupe',
+    '972': 'Martinique',
+    '973': 'French Guiana',
+    '974': 'La Réunion',
+    '976': 'Mayotte',
+}
+
+OPERATORS = 320
+COMMUNES = 6000
+PDC_PER_STATION = 3
+CHUNK_ROWS = 500_000
+
+POWERS = [3.7, 7.4, 11, 22, 24, 50, 100, 150, 300, 22000]
+POWER_SHARES = [.08, .2, .1, .3, .02, .1, .08, .07, .04, .01]
+
+FLAG_SHARES = {
+    'prise_type_ef': .3,
+    'prise_type_2': .85,
+    'prise_type_combo_ccs': .25,
+    'prise_type_chademo': .05,
+    'prise_type_autre': .01,
+    'gratuit': .1,
+    'paiement_acte': .6,
+    'paiement_cb': .5,
+    'paiement_autre': .3,
+    'reservation': .23,
+}
+
+
+def release_name(date='20251024'):
+    """File name the app recognizes as a consolidation release"""
+    return f'consolidation-etalab-schema-irve-statique-v-2.3.1-{date}.csv'
+
+
+def _communes(rng):
+    """Commune table: INSEE code, name and centroid"""
+    departments = np.array(sorted(DEPARTMENT_REGION))
+    department = departments[rng.integers(0, len(departments), COMMUNES)]
+    number = rng.choice(np.arange(1, 900), COMMUNES)
+    overseas = np.char.startswith(department, '97')
+    # Overseas codes are the 3-digit department plus a 2-digit number
+    code = np.where(
+        overseas,
+        np.char.add(department, np.char.zfill((number % 100).astype(str), 2)),
+        np.char.add(department, np.char.zfill(number.astype(str), 3)),
+    )
+    lon = np.empty(COMMUNES)
+    lat = np.empty(COMMUNES)
+    for i, dep in enumerate(department):
+        x0, y0, x1, y1 = VIEWS[OVERSEAS_VIEWS.get(dep, 'Metropolitan France')]
+        lon[i] = rng.uniform(x0, x1)
+        lat[i] = rng.uniform(y0, y1)
+    return pd.DataFrame({
+        'code': code,
+        'name': np.char.add('Commune ', code),
+        'lon': lon,
+        'lat': lat,
+    }).drop_duplicates('code', ignore_index=True)
+
+
+def _chunk(rng, communes, operators, first_row, n_rows):
+    """n_rows PDC rows, numbered from first_row"""
+    rows = np.arange(first_row, first_row + n_rows)
+    station = rows // PDC_PER_STATION
+    # Station attributes are derived from the station number, so every PDC
+    # of a station agrees on them whichever chunk it lands in
+    commune = station * 7919 % len(communes)
+    operator = station * 104729 % len(operators)
+
+    lon = communes['lon'].to_numpy()[commune] + rng.normal(0, 0.02, n_rows)
+    lat = communes['lat'].to_numpy()[commune] + rng.normal(0, 0.02, n_rows)
+    station_ids = pd.Series(station.astype(str)).radd('FRSYNP')
+    # A few stations carry no id
+    station_ids[station % 97 == 0] = ''
+    pdc_ids = pd.Series(rows.astype(str)).radd('FRSYNE')
+    # And a few PDC ids are listed twice
+    duplicated = rng.random(n_rows) < 0.002
+    pdc_ids[duplicated] = pdc_ids.shift(1)[duplicated].fillna(pdc_ids[duplicated])
+
+    days = (station * 2654435761 % (365 * 15)).astype('timedelta64[D]')
+    dates = pd.Series(np.datetime64('2011-01-01') + days).dt.strftime('%Y-%m-%d')
+    dates[rng.random(n_rows) < 0.05] = ''
+
+    frame = pd.DataFrame({
+        'nom_amenageur': 'Amenageur',
+        'nom_operateur': operators[operator],
+        'id_station_itinerance': station_ids,
+        'nom_station': pd.Series(station.astype(str)).radd('Station '),
+        'code_insee_commune': communes['code'].to_numpy()[commune],
+        'coordonneesXY': '[' + pd.Series(lon).round(6).astype(str) + ', ' + pd.Series(lat).round(6).astype(str) + ']',
+        'nbre_pdc': station % 8 + 1,
+        'id_pdc_itinerance': pdc_ids,
+        'puissance_nominale': rng.choice(POWERS, n_rows, p=POWER_SHARES),
+    })
+    for col, share in FLAG_SHARES.items():
+        frame[col] = np.where(rng.random(n_rows) < share, 'true', 'false')
+    frame = frame.assign(
+        tarification='0,35€/kWh',
+        accessibilite_pmr='Accessible',
+        date_mise_en_service=dates,
+        observations='',
+        date_maj='2025-10-01',
+        consolidated_longitude=lon.round(6),
+        consolidated_latitude=lat.round(6),
+        consolidated_code_postal='75001',
+        consolidated_commune=communes['name'].to_numpy()[commune],
+        consolidated_is_lon_lat_correct='True',
+        consolidated_is_code_insee_verified='True',
+    )
+    return frame
+
+
+def write_csv(path, n_rows, seed=0):
+    """Write a synthetic consolidation of n_rows PDC rows to path"""
+    rng = np.random.default_rng(seed)
+    communes = _communes(rng)
+    operators = np.array([f'Operateur {i:03d}' for i in range(OPERATORS)])
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    for first in range(0, n_rows, CHUNK_ROWS):
+        chunk = _chunk(rng, communes, operators, first, min(CHUNK_ROWS, n_rows - first))
+        chunk.to_csv(tmp, mode='w' if first == 0 else 'a', header=first == 0, index=False)
+    tmp.replace(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Data layer for the France EV charging infrastructure app."""
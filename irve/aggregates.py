@@ -0,0 +1,291 @@
+"""Precomputed section metrics.
+
+Every number and small table the sections display is computed in one pass
+over the prepared frame, or folded chunk by chunk straight from the CSV in
+streaming mode, then stored as a JSON sidecar in the cache
+directory, keyed on the dataset version. Sections read these summaries
+instead of scanning the rows on each rerun.
+"""
+import json
+import os
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR, source_identity
+from .dataset import prepare
+from .geo import department_codes
+from .instrument import cache_miss, instrumented
+from .quality import SERVICE_YEARS, sidecar_key
+from .schema import FLAGS_COLUMN, has_flags, iter_irve_csv
+from .stations import SeenPdc, finalize_stations, merge_partials, station_partials
+
+# Bump when the layout or the computation of the aggregates changes
+AGGREGATES_VERSION = 7
+
+# Commissioning dates outside these years are cleared by the quality rules
+YEAR_RANGE = SERVICE_YEARS
+
+# Rows per chunk in streaming mode
+STREAM_CHUNKSIZE = 100_000
+
+POWER_BINS = [0, 22, 50, 150, 10000]
+POWER_LABELS = ['Slow (≤22kW)', 'Medium (22-50kW)', 'Fast (50-150kW)', 'Ultra-Fast (>150kW)']
+
+PLUG_TYPES = {
+    'Type 2 (AC standard)': 'prise_type_2',
+    'CCS Combo (DC fast)': 'prise_type_combo_ccs',
+    'CHAdeMO (DC)': 'prise_type_chademo',
+    'Type EF (AC)': 'prise_type_ef',
+}
+
+PAYMENT_METHODS = {
+    'Credit Card': 'paiement_cb',
+    'Pay-as-you-go': 'paiement_acte',
+    'Free': 'gratuit',
+}
+
+
+def _counts(series):
+    """Non-zero value counts of a column as a plain dict"""
+    counts = series.value_counts()
+    return {key: int(n) for key, n in counts[counts > 0].items()}
+
+
+def top_records(counter, n, label):
+    """The n largest entries of a {value: count} dict as records, ties broken by name"""
+    ranked = sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))[:n]
+    return [{label: str(value), 'Stations': count} for value, count in ranked]
+
+
+def commune_counts(table):
+    """{label: stations} of the communes of a table with code_insee, commune and stations columns.
+
+    Communes are told apart by INSEE code and labelled with their name and
+    department, so homonyms in different departments stay separate. Rows
+    without a code are counted by name.
+    """
+    table = table[table['stations'] > 0]
+    coded = table['code_insee'].notna().to_numpy()
+    grouped = table[coded].groupby('code_insee', observed=True).agg(
+        name=('commune', 'first'), stations=('stations', 'sum'),
+    )
+    codes = grouped.index.astype(str)
+    departments = department_codes(codes).to_numpy()
+    names = grouped['name'].astype(object).where(grouped['name'].notna(), codes).to_numpy()
+    counts = {f"{name} ({department})": int(n)
+              for name, department, n in zip(names, departments, grouped['stations'])}
+    by_name = table[~coded].groupby('commune', observed=True)['stations'].sum()
+    for name, n in by_name[by_name > 0].items():
+        counts[str(name)] = counts.get(str(name), 0) + int(n)
+    return counts
+
+
+def area_records(totals, label):
+    """Records of a table of area totals (stations, charge_points, power_kw), largest first, ties by name"""
+    totals = totals[totals['stations'] > 0].sort_index(key=lambda areas: areas.astype(str))
+    totals = totals.sort_values('stations', ascending=False, kind='stable')
+    return [
+        {label: str(area), 'Stations': int(row.stations), 'Charge_Points': int(row.charge_points),
+         'Power_kW': float(row.power_kw)}
+        for area, row in totals.iterrows()
+    ]
+
+
+def _station_area_totals(stations, column):
+    """Area totals of the stations grouped on a station column"""
+    grouped = stations.groupby(column, observed=True)
+    return pd.DataFrame({
+        'stations': grouped.size(),
+        'charge_points': grouped['nbre_pdc'].sum() if 'nbre_pdc' in stations.columns else grouped['pdc_rows'].sum(),
+        'power_kw': grouped['puissance_totale'].agg(lambda power: np.nansum(power.to_numpy(), dtype=np.float64))
+        if 'puissance_totale' in stations.columns else 0.0,
+    })
+
+
+def pdc_totals(df):
+    """Total power (kW) and speed tier counts of a set of charge point rows"""
+    if 'puissance_nominale' not in df.columns:
+        return 0.0, Counter()
+    # Accumulate in float64 so the total does not depend on chunking
+    power_kw = float(np.nansum(df['puissance_nominale'].to_numpy(), dtype=np.float64))
+    tiers = pd.cut(df['puissance_nominale'].dropna(), bins=POWER_BINS, labels=POWER_LABELS)
+    return power_kw, Counter(_counts(tiers))
+
+
+def summarize(stations, pdc_rows, power_kw, tiers, has_power=True):
+    """Assemble the aggregates from a station table and the charge point totals"""
+    years = {}
+    if 'year_installed' in stations.columns:
+        installed = stations['year_installed'].dropna()
+        years = _counts(installed[(installed >= YEAR_RANGE[0]) & (installed <= YEAR_RANGE[1])])
+    if 'code_insee_commune' in stations.columns:
+        communes = commune_counts(pd.DataFrame({
+            'code_insee': stations['code_insee_commune'].to_numpy(),
+            'commune': stations['commune'].to_numpy() if 'commune' in stations.columns else None,
+            'stations': np.ones(len(stations), dtype=np.int64),
+        }))
+    else:
+        communes = _counts(stations['commune']) if 'commune' in stations.columns else {}
+    operators = _counts(stations['nom_operateur']) if 'nom_operateur' in stations.columns else {}
+
+    flags = stations[FLAGS_COLUMN].to_numpy() if FLAGS_COLUMN in stations.columns else None
+
+    def flag_totals(labels):
+        if flags is None:
+            return {}
+        return {label: int(has_flags(flags, col).sum()) for label, col in labels.items()}
+
+    return {
+        'totals': {
+            'stations': len(stations),
+            'charge_points': int(stations['nbre_pdc'].sum()) if 'nbre_pdc' in stations.columns else pdc_rows,
+            'pdc_rows': pdc_rows,
+            'power_kw': power_kw,
+            'operators': len(operators),
+        },
+        'yearly_installs': [
+            {'Year': int(year), 'New_Stations': n} for year, n in sorted(years.items())
+        ],
+        'top_communes': top_records(communes, 15, 'Commune'),
+        'top_operators': top_records(operators, 10, 'Operator'),
+        'regions': area_records(_station_area_totals(stations, 'region'), 'Region')
+        if 'region' in stations.columns else [],
+        'departments': area_records(_station_area_totals(stations, 'department'), 'Department')
+        if 'department' in stations.columns else [],
+        'power_tiers': [
+            {'Charging_Speed': label, 'Count': tiers.get(label, 0)} for label in POWER_LABELS
+        ] if has_power else [],
+        'plug_types': flag_totals(PLUG_TYPES),
+        'payment_methods': flag_totals(PAYMENT_METHODS),
+        'reservation': {
+            'has': int(has_flags(flags, 'reservation').sum()),
+            'total': len(stations),
+        } if flags is not None else None,
+    }
+
+
+class AggregateAccumulator:
+    """Folds chunks of the prepared frame into the section aggregates.
+
+    Charge point metrics (power, speed tiers) are kept as running totals.
+    Station metrics need PDC rows grouped by station first, so each chunk
+    is reduced to a partial station table and the partials are merged as
+    they pile up: memory is bounded by the chunk size plus the station
+    table, not by the number of rows. compute_aggregates() is the
+    single-chunk case.
+    """
+
+    # Merge partial station tables once this many are pending
+    MERGE_EVERY = 16
+
+    def __init__(self):
+        self.columns = set()
+        self.pdc_rows = 0
+        self.power_kw = 0.0
+        self.tiers = Counter()
+        self.parts = []
+
+    def add(self, df, stations=None):
+        """Fold one chunk of the prepared frame; stations is its station table if already built"""
+        self.columns.update(df.columns)
+        self.pdc_rows += len(df)
+        power_kw, tiers = pdc_totals(df)
+        self.power_kw += power_kw
+        self.tiers.update(tiers)
+        self.parts.append(station_partials(df) if stations is None else stations)
+        if len(self.parts) >= self.MERGE_EVERY:
+            self.parts = [merge_partials(self.parts)]
+        return self
+
+    def station_table(self):
+        """Station table of every chunk folded so far"""
+        if not self.parts:
+            return finalize_stations(pd.DataFrame({'pdc_rows': []}))
+        return finalize_stations(merge_partials(self.parts))
+
+    def result(self):
+        """The aggregates of every chunk folded so far"""
+        return summarize(
+            self.station_table(), self.pdc_rows, self.power_kw, self.tiers,
+            has_power='puissance_nominale' in self.columns
+        )
+
+
+def compute_aggregates(df, stations=None):
+    """Compute every section summary from the prepared frame and its station table"""
+    return AggregateAccumulator().add(df, stations).result()
+
+
+def sidecar_path(source, version, cache_dir=CACHE_DIR):
+    """Path of the aggregates sidecar for a dataset version"""
+    return Path(cache_dir) / f"{Path(source).stem}-{sidecar_key(version)}.aggregates.json"
+
+
+def _read_sidecar(path, version):
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored.get('format') != AGGREGATES_VERSION or stored.get('dataset') != version:
+        return None
+    return stored['aggregates']
+
+
+def _write_sidecar(path, stem, version, aggregates):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".json.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump({'format': AGGREGATES_VERSION, 'dataset': version, 'aggregates': aggregates}, f)
+    os.replace(tmp, path)
+    for stale in path.parent.glob(f"{stem}-*.aggregates.json"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def has_aggregates(source, version, cache_dir=CACHE_DIR):
+    """Whether an up-to-date sidecar exists for a dataset version"""
+    return _read_sidecar(sidecar_path(source, version, cache_dir), version) is not None
+
+
+def save_aggregates(source, version, aggregates, cache_dir=CACHE_DIR):
+    """Persist the aggregates of a dataset version as its sidecar"""
+    _write_sidecar(sidecar_path(source, version, cache_dir), Path(source).stem, version, aggregates)
+
+
+@instrumented('load_aggregates', cached=True)
+def _load_or_compute(source, version, compute, cache_dir):
+    aggregates = _read_sidecar(sidecar_path(source, version, cache_dir), version)
+    if aggregates is None:
+        cache_miss()
+        aggregates = compute()
+        save_aggregates(source, version, aggregates, cache_dir)
+    return aggregates
+
+
+def load_aggregates(dataset, cache_dir=CACHE_DIR):
+    """Aggregates for a dataset, read from its sidecar or computed and persisted"""
+    return _load_or_compute(
+        dataset.source, dataset.version,
+        lambda: compute_aggregates(dataset.frame, dataset.stations), cache_dir
+    )
+
+
+def stream_aggregates(source, chunksize=STREAM_CHUNKSIZE, cache_dir=CACHE_DIR):
+    """Aggregates for a CSV, folded chunk by chunk without loading the whole file.
+
+    Shares its sidecar with load_aggregates(), so whichever mode runs first
+    computes it for both.
+    """
+    def compute():
+        accumulator = AggregateAccumulator()
+        seen = SeenPdc()
+        for chunk in iter_irve_csv(source, chunksize):
+            accumulator.add(seen.filter(prepare(chunk)))
+        return accumulator.result()
+
+    _, _, version = source_identity(source, cache_dir)
+    return _load_or_compute(source, version, compute, cache_dir)
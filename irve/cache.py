@@ -0,0 +1,143 @@
+"""Columnar cache for the IRVE consolidation CSV.
+
+The first load of a CSV reads the declared columns with their schema dtypes
+(see schema.py) and converts them to a Parquet file stored in the cache
+directory, next to a small JSON manifest describing the source it was built
+from. Later loads read the Parquet file directly, as long as the source has
+not changed. A source is identified by its size, mtime and SHA-256 hash: the
+hash is only recomputed when size or mtime differ from the manifest, so a
+touched but unchanged file keeps its cache.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .instrument import cache_miss, instrumented
+from .schema import SCHEMA_VERSION, read_irve_csv
+
+CACHE_DIR = Path(os.environ.get('IRVE_CACHE_DIR', '.irve_cache'))
+CACHE_FORMAT = 2
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_path(source, cache_dir):
+    return Path(cache_dir) / f"{Path(source).stem}.json"
+
+
+def _read_manifest(source, cache_dir):
+    try:
+        with open(_manifest_path(source, cache_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(source, cache_dir, manifest):
+    path = _manifest_path(source, cache_dir)
+    tmp = path.with_suffix(f".json.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def source_identity(source, cache_dir=CACHE_DIR):
+    """Return (size, mtime_ns, sha256) for a source file.
+
+    The hash is taken from the manifest when size and mtime still match it,
+    so repeated calls only cost a stat().
+    """
+    stat = os.stat(source)
+    manifest = _read_manifest(source, cache_dir)
+    if (manifest and manifest.get('size') == stat.st_size
+            and manifest.get('mtime_ns') == stat.st_mtime_ns):
+        return stat.st_size, stat.st_mtime_ns, manifest['sha256']
+    return stat.st_size, stat.st_mtime_ns, file_sha256(source)
+
+
+def build_cache(source, cache_dir=CACHE_DIR):
+    """Convert the source CSV to typed Parquet and record its identity in the manifest"""
+    cache_miss()
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    size, mtime_ns, sha256 = source_identity(source, cache_dir)
+
+    df = read_irve_csv(source)
+    parquet_name = f"{Path(source).stem}-{sha256[:16]}.parquet"
+    parquet_path = cache_dir / parquet_name
+    tmp = parquet_path.with_suffix(f".parquet.{os.getpid()}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, parquet_path)
+
+    previous = _read_manifest(source, cache_dir)
+    _write_manifest(source, cache_dir, {
+        'format': CACHE_FORMAT,
+        'schema': SCHEMA_VERSION,
+        'source': str(source),
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'sha256': sha256,
+        'parquet': parquet_name,
+    })
+    if previous and previous.get('parquet') not in (None, parquet_name):
+        (cache_dir / previous['parquet']).unlink(missing_ok=True)
+    return df
+
+
+def cached_parquet(source, cache_dir=CACHE_DIR):
+    """Path of an up-to-date Parquet cache for source, or None if it must be rebuilt"""
+    cache_dir = Path(cache_dir)
+    manifest = _read_manifest(source, cache_dir)
+    if (not manifest or manifest.get('format') != CACHE_FORMAT
+            or manifest.get('schema') != SCHEMA_VERSION):
+        return None
+    parquet_path = cache_dir / manifest['parquet']
+    if not parquet_path.exists():
+        return None
+
+    size, mtime_ns, sha256 = source_identity(source, cache_dir)
+    if sha256 != manifest['sha256']:
+        return None
+    if (size, mtime_ns) != (manifest['size'], manifest['mtime_ns']):
+        # Same content with a new mtime: keep the cache, refresh the manifest
+        _write_manifest(source, cache_dir, {**manifest, 'size': size, 'mtime_ns': mtime_ns})
+    return parquet_path
+
+
+@instrumented(cached=True)
+def load_table(source, cache_dir=CACHE_DIR):
+    """Load the IRVE table, going through the Parquet cache"""
+    parquet_path = cached_parquet(source, cache_dir)
+    if parquet_path is not None:
+        return pd.read_parquet(parquet_path)
+    return build_cache(source, cache_dir)
+
+
+def sample_rows(source, nrows, cache_dir=CACHE_DIR):
+    """First rows of the IRVE table, from the Parquet cache when it is up to date.
+
+    Only the first record batch is decoded, so this never loads the whole
+    table; without a cache the rows are parsed from the head of the CSV.
+    """
+    parquet_path = cached_parquet(source, cache_dir)
+    if parquet_path is None:
+        return read_irve_csv(source, nrows=nrows)
+    parquet = pq.ParquetFile(parquet_path)
+    batch = next(parquet.iter_batches(batch_size=nrows), None)
+    if batch is None:
+        return parquet.schema_arrow.empty_table().to_pandas()
+    # The pandas metadata of the file restores the column dtypes
+    table = pa.Table.from_batches([batch]).replace_schema_metadata(parquet.schema_arrow.metadata)
+    return table.to_pandas()
@@ -0,0 +1,285 @@
+"""Fast chargers along the road corridors of a local geometry file.
+
+The roads are read from a GeoJSON file of LineString or MultiLineString
+features, grouped into corridors by their 'ref' property (falling back to
+'name'), e.g. every feature of the A6 forms the A6 corridor. Roads
+usually come as many short ways, so the lines of a corridor are first
+joined end to end into chains wherever their endpoints meet. Chains are
+cut into segments of at most SEGMENT_KM, indexed in a KD-tree of their
+midpoints, and each DC fast charger within SNAP_KM of a segment is
+snapped to its closest one. Along each chain of a corridor the snapped
+chargers then have a position (km from the start of the chain), and the
+gaps between consecutive positions, counting the stretches before the
+first and after the last charger, give the longest distance a driver
+covers without a fast charger.
+
+The summary depends on the served stations and the roads file only: it
+is stored as a JSON sidecar per dataset version and roads file content.
+"""
+import json
+import os
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR, file_sha256
+from .instrument import cache_miss, instrumented
+from .nearest import DC_FAST_KW, EARTH_RADIUS_KM, km_to_chord, unit_vectors
+from .quality import sidecar_key
+
+# Bump when the snapping or the gap computation changes
+CORRIDORS_VERSION = 2
+
+# Chargers further than this from every road segment are off the corridors
+SNAP_KM = 2.0
+
+# Longer road segments are split, which bounds the index search radius
+SEGMENT_KM = 1.0
+
+# Longest gap allowed by the EU AFIR regulation between fast charging pools
+# on the core TEN-T road network
+TARGET_GAP_KM = 60
+
+CORRIDOR_COLUMNS = [
+    'corridor', 'length_km', 'chargers', 'max_gap_km',
+    'gap_start_lon', 'gap_start_lat', 'gap_end_lon', 'gap_end_lat',
+]
+
+
+def _haversine_km(lon0, lat0, lon1, lat1):
+    lon0, lat0, lon1, lat1 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lon0, lat0, lon1, lat1))
+    h = np.sin((lat1 - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(lat1) * np.sin((lon1 - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+def _densify(line):
+    """Vertices of a line with points added so that no segment is longer than SEGMENT_KM"""
+    lengths = _haversine_km(line[:-1, 0], line[:-1, 1], line[1:, 0], line[1:, 1])
+    pieces = np.maximum(1, np.ceil(lengths / SEGMENT_KM).astype(int))
+    # Fraction along each original segment of every new vertex
+    starts = np.repeat(np.arange(len(pieces)), pieces)
+    fractions = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    fractions = fractions / np.repeat(pieces, pieces)
+    points = line[starts] + (line[starts + 1] - line[starts]) * fractions[:, None]
+    return np.vstack([points, line[-1:]])
+
+
+def _end_key(point):
+    # Ways meeting at a junction share its node, rounding absorbs float noise (about 1 m)
+    return round(float(point[0]), 5), round(float(point[1]), 5)
+
+
+def _chains(lines):
+    """Lines joined end to end, reversed where needed, into chains that do not share an endpoint.
+
+    At a junction of more than two lines the chain goes on along the
+    first unused one; the others start chains of their own.
+    """
+    ends = {}
+    for i, line in enumerate(lines):
+        ends.setdefault(_end_key(line[0]), []).append(i)
+        ends.setdefault(_end_key(line[-1]), []).append(i)
+    used = np.zeros(len(lines), dtype=bool)
+    chains = []
+    for first in range(len(lines)):
+        if used[first]:
+            continue
+        used[first] = True
+        pieces = deque([lines[first]])
+        for forward in (True, False):
+            while True:
+                end = _end_key(pieces[-1][-1] if forward else pieces[0][0])
+                following = next((j for j in ends[end] if not used[j]), None)
+                if following is None:
+                    break
+                used[following] = True
+                line = lines[following]
+                if forward:
+                    line = line if _end_key(line[0]) == end else line[::-1]
+                    pieces.append(line)
+                else:
+                    line = line if _end_key(line[-1]) == end else line[::-1]
+                    pieces.appendleft(line)
+        # Consecutive pieces share their joining vertex
+        head, *rest = pieces
+        chains.append(np.vstack([head, *(piece[1:] for piece in rest)]))
+    return chains
+
+
+def read_roads(path):
+    """Road segments of a GeoJSON file, one row per segment of at most SEGMENT_KM.
+
+    Columns: corridor, line (number of the chain within the file), the
+    lon/lat of both ends, the length and the position of the start along
+    its chain, in km.
+    """
+    with open(path) as f:
+        features = json.load(f).get('features', [])
+    corridors = {}
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        properties = feature.get('properties') or {}
+        corridor = properties.get('ref') or properties.get('name')
+        if not corridor:
+            continue
+        if geometry.get('type') == 'LineString':
+            lines = [geometry['coordinates']]
+        elif geometry.get('type') == 'MultiLineString':
+            lines = geometry['coordinates']
+        else:
+            continue
+        for line in lines:
+            line = np.asarray(line, dtype=np.float64)[:, :2]
+            if len(line) >= 2:
+                corridors.setdefault(str(corridor), []).append(line)
+    parts = [(corridor, _densify(chain)) for corridor, lines in corridors.items() for chain in _chains(lines)]
+
+    segments = []
+    for number, (corridor, line) in enumerate(parts):
+        lengths = _haversine_km(line[:-1, 0], line[:-1, 1], line[1:, 0], line[1:, 1])
+        segments.append(pd.DataFrame({
+            'corridor': corridor,
+            'line': number,
+            'lon0': line[:-1, 0], 'lat0': line[:-1, 1],
+            'lon1': line[1:, 0], 'lat1': line[1:, 1],
+            'length_km': lengths,
+            'start_km': np.cumsum(lengths) - lengths,
+        }))
+    if not segments:
+        return pd.DataFrame(columns=['corridor', 'line', 'lon0', 'lat0', 'lon1', 'lat1', 'length_km', 'start_km'])
+    return pd.concat(segments, ignore_index=True)
+
+
+def snap_chargers(segments, lon, lat):
+    """Closest segment of each charger and its position along the segment's line.
+
+    Returns the segment row of each charger (-1 when none is within
+    SNAP_KM), its distance to it and its position in km along the line.
+    """
+    from scipy.spatial import cKDTree
+
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    segment = np.full(len(lon), -1)
+    distance = np.full(len(lon), np.inf)
+    position = np.full(len(lon), np.nan)
+    if len(segments) == 0 or len(lon) == 0:
+        return segment, distance, position
+
+    x0, y0 = segments['lon0'].to_numpy(), segments['lat0'].to_numpy()
+    x1, y1 = segments['lon1'].to_numpy(), segments['lat1'].to_numpy()
+    tree = cKDTree(unit_vectors((x0 + x1) / 2, (y0 + y1) / 2))
+    # A point within SNAP_KM of a segment is within SNAP_KM plus half its length of its midpoint
+    radius = km_to_chord(SNAP_KM + segments['length_km'].max() / 2)
+    found = tree.query_ball_point(unit_vectors(lon, lat), radius)
+    counts = np.fromiter((len(candidates) for candidates in found), dtype=np.int64, count=len(found))
+    if counts.sum() == 0:
+        return segment, distance, position
+    points = np.repeat(np.arange(len(lon)), counts)
+    candidates = np.concatenate([np.asarray(c, dtype=np.int64) for c in found if c])
+
+    # Point to segment distance on the plane tangent at the segment start
+    scale = np.radians(1) * EARTH_RADIUS_KM
+    cos_lat = np.cos(np.radians(y0[candidates]))
+    dx, dy = (x1 - x0)[candidates] * cos_lat * scale, (y1 - y0)[candidates] * scale
+    px, py = (lon[points] - x0[candidates]) * cos_lat * scale, (lat[points] - y0[candidates]) * scale
+    squared = dx ** 2 + dy ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.clip(np.where(squared > 0, (px * dx + py * dy) / squared, 0.0), 0, 1)
+    gaps = np.hypot(px - t * dx, py - t * dy)
+
+    # Closest candidate of each point: sort by point, then distance
+    order = np.lexsort((gaps, points))
+    first = order[np.r_[True, points[order][1:] != points[order][:-1]]]
+    close = gaps[first] <= SNAP_KM
+    chosen, rows = points[first][close], candidates[first][close]
+    segment[chosen] = rows
+    distance[chosen] = gaps[first][close]
+    position[chosen] = (segments['start_km'].to_numpy()[rows]
+                        + t[first][close] * segments['length_km'].to_numpy()[rows])
+    return segment, distance, position
+
+
+def _point_at(segments, line, km):
+    """lon/lat of the point km along a line"""
+    rows = segments[segments['line'] == line]
+    i = min(np.searchsorted(rows['start_km'].to_numpy(), km, side='right') - 1, len(rows) - 1)
+    row = rows.iloc[max(i, 0)]
+    t = np.clip((km - row['start_km']) / row['length_km'], 0, 1) if row['length_km'] > 0 else 0.0
+    return row['lon0'] + t * (row['lon1'] - row['lon0']), row['lat0'] + t * (row['lat1'] - row['lat0'])
+
+
+def corridor_gaps(segments, stations, min_power_kw=DC_FAST_KW):
+    """One row per corridor: length, fast chargers snapped to it and its longest gap.
+
+    max_gap_km is the longest stretch of a chain of the corridor without a
+    charger of at least min_power_kw, the gap_* columns locate it.
+    """
+    power = stations['puissance_max'].to_numpy(dtype=np.float64, na_value=0)
+    lon = stations['longitude'].to_numpy(dtype=np.float64)
+    lat = stations['latitude'].to_numpy(dtype=np.float64)
+    fast = (power >= min_power_kw) & np.isfinite(lon) & np.isfinite(lat)
+    segment, _, position = snap_chargers(segments, lon[fast], lat[fast])
+    snapped = segment >= 0
+    lines = segments['line'].to_numpy()[segment[snapped]]
+    positions = position[snapped]
+    line_lengths = segments.groupby('line')['length_km'].sum()
+    line_corridor = segments.groupby('line')['corridor'].first()
+
+    rows = []
+    for corridor, corridor_lines in line_corridor.groupby(line_corridor, sort=True):
+        best = (-1.0, None, 0.0, 0.0)
+        chargers = 0
+        for line in corridor_lines.index:
+            on_line = np.sort(positions[lines == line])
+            chargers += len(on_line)
+            stops = np.concatenate([[0.0], on_line, [line_lengths[line]]])
+            gaps = np.diff(stops)
+            i = int(np.argmax(gaps))
+            if gaps[i] > best[0]:
+                best = (float(gaps[i]), line, stops[i], stops[i + 1])
+        gap, line, start, end = best
+        start_lon, start_lat = _point_at(segments, line, start)
+        end_lon, end_lat = _point_at(segments, line, end)
+        rows.append({
+            'corridor': corridor,
+            'length_km': float(line_lengths[corridor_lines.index].sum()),
+            'chargers': chargers,
+            'max_gap_km': gap,
+            'gap_start_lon': float(start_lon), 'gap_start_lat': float(start_lat),
+            'gap_end_lon': float(end_lon), 'gap_end_lat': float(end_lat),
+        })
+    return pd.DataFrame(rows, columns=CORRIDOR_COLUMNS).sort_values(
+        'max_gap_km', ascending=False, kind='stable', ignore_index=True,
+    )
+
+
+def corridors_path(source, version, roads_sha256, cache_dir=CACHE_DIR):
+    """Path of the corridor summary of a dataset version and roads file"""
+    return Path(cache_dir) / f"{Path(source).stem}-{sidecar_key(version)}.corridors-{roads_sha256[:12]}.json"
+
+
+@instrumented(cached=True)
+def load_corridors(dataset, roads_path, cache_dir=CACHE_DIR):
+    """Corridor summary of a dataset and roads file, read from its sidecar or computed and persisted"""
+    path = corridors_path(dataset.source, dataset.version, file_sha256(roads_path), cache_dir)
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+        if stored.get('format') == CORRIDORS_VERSION:
+            return pd.DataFrame(stored['corridors'], columns=CORRIDOR_COLUMNS)
+    except (OSError, ValueError):
+        pass
+    cache_miss()
+    corridors = corridor_gaps(read_roads(roads_path), dataset.stations)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".json.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump({'format': CORRIDORS_VERSION, 'corridors': corridors.to_dict('records')}, f)
+    os.replace(tmp, path)
+    for stale in path.parent.glob(f"{Path(dataset.source).stem}-*.corridors-*.json"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return corridors
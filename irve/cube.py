@@ -0,0 +1,188 @@
+"""Pre-aggregated cube behind the cross-filters.
+
+Stations are grouped once per dataset version on every filterable
+dimension (region, department, commune, operator, power class, install
+year), keeping the additive measures the sections need. A filter selection
+slices the cells of the cube, and the slice is rolled up into the same
+aggregates layout as the national summary, so the sections render a
+filtered view without touching the PDC rows. The cells are stored as a
+Parquet sidecar next to the station table.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import (
+    PAYMENT_METHODS,
+    PLUG_TYPES,
+    POWER_BINS,
+    POWER_LABELS,
+    YEAR_RANGE,
+    area_records,
+    commune_counts,
+    top_records,
+)
+from .cache import CACHE_DIR
+from .geo import UNKNOWN, departments_and_regions
+from .instrument import cache_miss, instrumented
+from .quality import sidecar_key
+from .schema import FLAG_COLUMNS, FLAGS_COLUMN, has_flags
+from .stations import station_keys
+
+# Bump when the cube layout changes
+CUBE_VERSION = 3
+
+# Dimension columns of the cube cells, from the coarsest to the finest
+DIMENSIONS = ['region', 'department', 'code_insee', 'commune', 'operator', 'power_class', 'year']
+
+POWER_CLASSES = POWER_LABELS + [UNKNOWN]
+
+# Speed tier counts of the charge points in each cell
+TIER_COLUMNS = {label: f'pdc_tier_{i}' for i, label in enumerate(POWER_LABELS)}
+
+
+@dataclass(frozen=True)
+class Cube:
+    """Cells of the cube, one row per combination of dimension values present in the data"""
+    cells: pd.DataFrame
+
+    def values(self, dimension):
+        """Distinct values of a dimension, sorted"""
+        return sorted(self.cells[dimension].dropna().unique().tolist())
+
+    def slice(self, regions=None, departments=None, operators=None, power_classes=None, years=None):
+        """Sub-cube of the cells matching every given filter (None or empty: no filter).
+
+        years is an inclusive (first, last) range; stations without an
+        installation date are dropped when a range is given.
+        """
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        for dimension, selected in (
+            ('region', regions),
+            ('department', departments),
+            ('operator', operators),
+            ('power_class', power_classes),
+        ):
+            if selected:
+                mask &= cells[dimension].isin(selected).to_numpy()
+        if years is not None:
+            year = cells['year']
+            mask &= ((year >= years[0]) & (year <= years[1])).fillna(False).to_numpy(dtype=bool)
+        return Cube(cells[mask]) if not mask.all() else self
+
+    def rollup(self, *dimensions):
+        """Measures summed over every dimension but the given ones"""
+        return self.cells.groupby(list(dimensions), observed=True, sort=False).sum(numeric_only=True)
+
+    def aggregates(self):
+        """The slice rolled up into the layout of the national aggregates"""
+        cells = self.cells
+        measures = cells.sum(numeric_only=True)
+        stations = int(measures['stations'])
+
+        def station_counts(dimension):
+            counts = cells.groupby(dimension, observed=True)['stations'].sum()
+            return {key: int(n) for key, n in counts[counts > 0].items()}
+
+        years = station_counts('year')
+        years = {year: n for year, n in years.items() if YEAR_RANGE[0] <= year <= YEAR_RANGE[1]}
+        communes = commune_counts(cells[['code_insee', 'commune', 'stations']])
+        operators = station_counts('operator')
+        return {
+            'totals': {
+                'stations': stations,
+                'charge_points': int(measures['charge_points']),
+                'pdc_rows': int(measures['pdc_rows']),
+                'power_kw': float(measures['power_kw']),
+                'operators': len(operators),
+            },
+            'yearly_installs': [
+                {'Year': int(year), 'New_Stations': n} for year, n in sorted(years.items())
+            ],
+            'top_communes': top_records(communes, 15, 'Commune'),
+            'top_operators': top_records(operators, 10, 'Operator'),
+            'regions': area_records(self.rollup('region'), 'Region'),
+            'departments': area_records(self.rollup('department'), 'Department'),
+            'power_tiers': [
+                {'Charging_Speed': label, 'Count': int(measures[col])}
+                for label, col in TIER_COLUMNS.items()
+            ],
+            'plug_types': {label: int(measures[col]) for label, col in PLUG_TYPES.items()},
+            'payment_methods': {label: int(measures[col]) for label, col in PAYMENT_METHODS.items()},
+            'reservation': {'has': int(measures['reservation']), 'total': stations},
+        }
+
+
+def _station_positions(frame, stations):
+    """Row of the station table each PDC row belongs to"""
+    keys = station_keys(frame)
+    index = pd.Index(stations.index.astype(str))
+    # Map each distinct key once, then expand by category code
+    positions = index.get_indexer(keys.cat.categories.astype(str))
+    return positions[keys.cat.codes.to_numpy()]
+
+
+def build_cube(frame, stations):
+    """Cube of a prepared PDC-level frame and its station table"""
+    if 'department' in stations.columns:
+        department, region = stations['department'], stations['region']
+    else:
+        department, region = departments_and_regions(stations['code_insee_commune'])
+    power_class = pd.cut(stations['puissance_max'], bins=POWER_BINS, labels=POWER_LABELS)
+    table = pd.DataFrame({
+        'region': region.to_numpy(),
+        'department': department.to_numpy(),
+        'code_insee': stations['code_insee_commune'].to_numpy(),
+        'commune': stations['commune'].to_numpy(),
+        'operator': stations['nom_operateur'].to_numpy(),
+        'power_class': power_class.cat.add_categories(UNKNOWN).fillna(UNKNOWN).to_numpy(),
+        'year': stations['year_installed'].to_numpy(),
+        'stations': np.ones(len(stations), dtype=np.int32),
+        'charge_points': stations['nbre_pdc'].to_numpy(dtype=np.int32, na_value=0),
+        'pdc_rows': stations['pdc_rows'].to_numpy(dtype=np.int32),
+    })
+    flags = stations[FLAGS_COLUMN].to_numpy()
+    for col in FLAG_COLUMNS:
+        table[col] = has_flags(flags, col).astype(np.int32)
+
+    # Charge point measures, summed per station in float64 like the national totals
+    positions = _station_positions(frame, stations)
+    power = frame['puissance_nominale'].to_numpy(dtype=np.float64, na_value=np.nan)
+    known = ~np.isnan(power)
+    table['power_kw'] = np.bincount(positions[known], weights=power[known], minlength=len(stations))
+    tiers = pd.cut(frame['puissance_nominale'], bins=POWER_BINS, labels=POWER_LABELS).cat.codes.to_numpy()
+    for i, col in enumerate(TIER_COLUMNS.values()):
+        table[col] = np.bincount(positions[tiers == i], minlength=len(stations)).astype(np.int32)
+
+    cells = table.groupby(DIMENSIONS, observed=True, dropna=False, sort=False).sum().reset_index()
+    for dimension in DIMENSIONS[:-1]:
+        cells[dimension] = cells[dimension].astype('category')
+    cells['year'] = cells['year'].astype('Int16')
+    return Cube(cells)
+
+
+def cube_path(source, version, cache_dir=CACHE_DIR):
+    """Path of the cached cube cells for a dataset version"""
+    return Path(cache_dir) / f"{Path(source).stem}-{sidecar_key(version)}.cube-v{CUBE_VERSION}.parquet"
+
+
+@instrumented(cached=True)
+def load_cube(dataset, cache_dir=CACHE_DIR):
+    """Cube of a dataset, read from its sidecar or built and persisted"""
+    path = cube_path(dataset.source, dataset.version, cache_dir)
+    if path.exists():
+        return Cube(pd.read_parquet(path))
+    cache_miss()
+    cube = build_cube(dataset.frame, dataset.stations)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".parquet.{os.getpid()}.tmp")
+    cube.cells.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    for stale in path.parent.glob(f"{Path(dataset.source).stem}-*.cube-*.parquet"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return cube
@@ -0,0 +1,173 @@
+"""Prepared IRVE dataset, loaded part by part once per source file version.
+
+The prepared frame is written once per version as an uncompressed Arrow
+IPC file and memory-mapped read-only by every process that needs it:
+the numeric columns are views on the mapped file, so replicas serving
+the same release share its pages through the page cache instead of each
+holding a private copy.
+"""
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from .cache import CACHE_DIR, load_table, source_identity
+from .instrument import cache_miss, instrumented, span
+from .quality import save_report, sidecar_key, validate
+from .stations import load_stations
+
+
+class SourceChanged(Exception):
+    """The source file no longer holds the dataset version asked for"""
+
+
+class Dataset:
+    """Prepared IRVE frame and station table of one version of a source file.
+
+    frame has one row per charge point, stations one row per station. Each
+    is materialized on first access: the station table is read from its
+    sidecar, and the PDC frame is only loaded (from the Parquet cache) when
+    a sidecar has to be built or a view needs the rows. Both are shared
+    between sessions: treat them as read-only and derive new frames instead
+    of assigning columns on them.
+    """
+
+    def __init__(self, source, version, cache_dir=CACHE_DIR, frame=None, stations=None):
+        self.source = str(source)
+        self.version = version
+        self.cache_dir = cache_dir
+        self._parts = {name: part for name, part in (('frame', frame), ('stations', stations)) if part is not None}
+        # Re-entrant: building the station table loads the frame
+        self._lock = threading.RLock()
+
+    def _part(self, name, load):
+        if name not in self._parts:
+            with self._lock:
+                if name not in self._parts:
+                    self._parts[name] = load()
+        return self._parts[name]
+
+    def loaded(self, name):
+        """Whether a part ('frame' or 'stations') has been materialized"""
+        return name in self._parts
+
+    def load(self, name):
+        """Materialize a part ('frame' or 'stations') now and return it"""
+        return getattr(self, name)
+
+    @property
+    def frame(self):
+        return self._part('frame', self._load_frame)
+
+    @property
+    def stations(self):
+        return self._part('stations', lambda: load_stations(
+            lambda: self.frame, self.source, self.version, self.cache_dir
+        ))
+
+    def _load_frame(self):
+        return load_prepared(self.source, self.version, self.cache_dir)
+
+
+def prepare(df, with_report=False):
+    """Return a new frame passed through the quality rules and with the analysis columns.
+
+    With with_report, returns the frame and the quality report of df.
+    """
+    df, report = validate(df)
+    derived = {}
+    if 'date_mise_en_service' in df.columns:
+        derived['year_installed'] = df['date_mise_en_service'].dt.year.astype('Int16')
+    if 'consolidated_commune' in df.columns:
+        derived['commune'] = df['consolidated_commune']
+    frame = df.assign(**derived)
+    return (frame, report) if with_report else frame
+
+
+# Bump when the layout of the prepared frame file changes
+PREPARED_VERSION = 1
+
+
+def prepared_path(source, version, cache_dir=CACHE_DIR):
+    """Path of the memory-mappable prepared frame of a dataset version"""
+    return Path(cache_dir) / f"{Path(source).stem}-{sidecar_key(version)}.prepared-v{PREPARED_VERSION}.arrow"
+
+
+def _arrow_table(frame):
+    """Arrow table of a prepared frame, laid out to be read back without copies.
+
+    Arrow stores NaN and NaT as nulls, and a column with nulls is copied
+    to fill them in when converted to pandas: float and date columns keep
+    their NaN and NaT as values instead.
+    """
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        values = frame[field.name]
+        if values.dtype.kind == 'f':
+            table = table.set_column(i, field, pa.array(values.to_numpy()))
+        elif values.dtype.kind == 'M':
+            # NaT is the smallest int64: viewed as a timestamp it reads back as NaT
+            ints = pa.array(values.to_numpy().view(np.int64))
+            table = table.set_column(i, field, ints.view(field.type))
+    return table
+
+
+def save_prepared(frame, source, version, cache_dir=CACHE_DIR):
+    """Write the prepared frame of a dataset version as an uncompressed Arrow IPC file"""
+    path = prepared_path(source, version, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".arrow.{os.getpid()}.tmp")
+    table = _arrow_table(frame)
+    # One record batch: every column maps to a single contiguous buffer
+    with pa.OSFile(str(tmp), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(len(table), 1))
+    os.replace(tmp, path)
+    for stale in path.parent.glob(f"{Path(source).stem}-*.prepared-*.arrow"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def read_prepared(path):
+    """Prepared frame memory-mapped from its Arrow file.
+
+    Numeric columns are read-only views on the mapping; categories and
+    nullable integer columns are materialized.
+    """
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _check_version(source, version, cache_dir):
+    if source_identity(source, cache_dir)[2] != version:
+        raise SourceChanged(f"{source} no longer holds version {version[:16]}")
+
+
+@instrumented(cached=True)
+def load_prepared(source, version, cache_dir=CACHE_DIR):
+    """Prepared frame of a dataset version, built and written on first use then memory-mapped.
+
+    Building it reads the source file: raises SourceChanged if the file was
+    replaced by another version since the dataset was opened.
+    """
+    path = prepared_path(source, version, cache_dir)
+    if not path.exists():
+        cache_miss()
+        _check_version(source, version, cache_dir)
+        df = load_table(source, cache_dir)
+        # The file may also have been replaced while it was read
+        _check_version(source, version, cache_dir)
+        with span('prepare'):
+            frame, report = prepare(df, with_report=True)
+        save_report(source, version, report, cache_dir)
+        save_prepared(frame, source, version, cache_dir)
+        # The built frame is dropped: this process maps the file like the others
+        del df, frame
+    return read_prepared(path)
+
+
+def open_dataset(source, cache_dir=CACHE_DIR):
+    """Dataset of the current version of source; nothing is loaded until a part is accessed"""
+    _, _, sha256 = source_identity(source, cache_dir)
+    return Dataset(source, sha256, cache_dir)
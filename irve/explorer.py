@@ -0,0 +1,149 @@
+"""Server-side filtering, sorting and paging of the charge point rows.
+
+The raw data view never sends the table to the browser: a query is
+evaluated on the prepared frame, mostly on the category codes and the
+packed flags, into the positions of the matching rows in display order.
+Only the rows of the page shown are then taken from the frame, and an
+export writes the matching rows chunk by chunk, so no copy of the whole
+selection is ever built as a frame. The exported file itself is held in
+memory until it is downloaded, which is why exports are capped at
+EXPORT_MAX_ROWS rows.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .schema import FLAGS_COLUMN, has_any_flag, unpack_flags
+
+PAGE_SIZES = (50, 100, 500)
+
+# Rows taken from the frame at a time by an export
+EXPORT_CHUNK_ROWS = 100_000
+
+# Largest selection that can be exported: about 100 MB of CSV
+EXPORT_MAX_ROWS = 500_000
+
+
+@dataclass(frozen=True)
+class RowQuery:
+    """Selection and order of the rows shown by the explorer.
+
+    Empty filters select every row. commune is matched as a
+    case-insensitive substring of the commune name; power is an inclusive
+    (min, max) range in kW, which excludes rows without a power; plugs are
+    flag columns, of which a row must have at least one.
+    """
+    operators: tuple = ()
+    commune: str = ''
+    power: tuple = None
+    plugs: tuple = ()
+    sort: str = None
+    descending: bool = False
+
+
+def _category_mask(values, keep):
+    """Rows of a categorical column whose category is kept (missing values are not)"""
+    # Code -1 (missing) indexes the trailing False
+    return np.append(np.asarray(keep, dtype=bool), False)[values.cat.codes.to_numpy()]
+
+
+def present_categories(values):
+    """Categories of a categorical column that occur in it, sorted"""
+    codes = values.cat.codes.to_numpy()
+    return sorted(values.cat.categories[np.unique(codes[codes >= 0])].tolist())
+
+
+def query_mask(frame, query):
+    """Rows of the prepared frame matching the filters of query"""
+    mask = np.ones(len(frame), dtype=bool)
+    if query.operators and 'nom_operateur' in frame.columns:
+        operators = frame['nom_operateur']
+        mask &= _category_mask(operators, operators.cat.categories.isin(query.operators))
+    if query.commune and 'commune' in frame.columns:
+        communes = frame['commune']
+        mask &= _category_mask(
+            communes, communes.cat.categories.str.contains(query.commune, case=False, regex=False),
+        )
+    if query.power is not None and 'puissance_nominale' in frame.columns:
+        power = frame['puissance_nominale'].to_numpy()
+        mask &= (power >= query.power[0]) & (power <= query.power[1])
+    if query.plugs:
+        mask &= has_any_flag(frame[FLAGS_COLUMN].to_numpy(), *query.plugs)
+    return mask
+
+
+def _sort_key(values):
+    """Float key ordering a column, NaN where the value is missing"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = np.asarray(values.cat.categories.astype(str))
+        rank = np.empty(len(categories) + 1, dtype=np.float64)
+        rank[np.argsort(categories, kind='stable')] = np.arange(len(categories))
+        rank[-1] = np.nan
+        return rank[values.cat.codes.to_numpy()]
+    if values.dtype.kind == 'M':
+        key = values.to_numpy().view(np.int64).astype(np.float64)
+        key[values.isna().to_numpy()] = np.nan
+        return key
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def query_rows(frame, query):
+    """Positions of the rows matching query, in display order.
+
+    Rows without a value in the sort column come last in both orders.
+    """
+    positions = np.flatnonzero(query_mask(frame, query))
+    if query.sort:
+        key = _sort_key(frame[query.sort])[positions]
+        if query.descending:
+            key = -key
+        # argsort puts NaN last
+        positions = positions[np.argsort(key, kind='stable')]
+    return positions
+
+
+def take_rows(frame, positions):
+    """Rows of the frame at positions, as plain values for display or export.
+
+    The categories are turned into strings: a categorical slice would carry
+    the full category list of the frame along with the few rows taken.
+    """
+    rows = frame.take(positions)
+    categorical = [col for col, dtype in rows.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    return unpack_flags(rows.astype({col: str for col in categorical})).reset_index(drop=True)
+
+
+def page_rows(frame, positions, page, size):
+    """Rows of one page of a query result, pages numbered from 0"""
+    return take_rows(frame, positions[page * size:(page + 1) * size])
+
+
+def _chunks(frame, positions, chunk_rows):
+    for start in range(0, max(len(positions), 1), chunk_rows):
+        yield take_rows(frame, positions[start:start + chunk_rows])
+
+
+def write_csv(frame, positions, sink, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write the rows at positions as CSV to a binary file-like sink, chunk by chunk"""
+    for i, chunk in enumerate(_chunks(frame, positions, chunk_rows)):
+        sink.write(chunk.to_csv(index=False, header=i == 0).encode('utf-8'))
+
+
+def write_parquet(frame, positions, sink, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write the rows at positions as Parquet to a binary file-like sink, one row group per chunk"""
+    writer = None
+    for chunk in _chunks(frame, positions, chunk_rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table.cast(writer.schema))
+    writer.close()
+
+
+EXPORTS = {
+    'csv': (write_csv, 'text/csv'),
+    'parquet': (write_parquet, 'application/vnd.apache.parquet'),
+}
@@ -0,0 +1,109 @@
+"""French administrative geography derived from INSEE commune codes.
+
+The department of a commune is the prefix of its INSEE code (three
+digits overseas), so the commune -> department -> region lookup needs no
+commune list: the tables below are bundled and the app works offline.
+Population is not bundled; a department population file can be given to
+the app to compute densities.
+"""
+import pandas as pd
+
+# Departments of each region (2016 regions, overseas departments included)
+REGIONS = {
+    'Auvergne-Rhône-Alpes': ['01', '03', '07', '15', '26', '38', '42', '43', '63', '69', '73', '74'],
+    'Bourgogne-Franche-Comté': ['21', '25', '39', '58', '70', '71', '89', '90'],
+    'Bretagne': ['22', '29', '35', '56'],
+    'Centre-Val de Loire': ['18', '28', '36', '37', '41', '45'],
+    'Corse': ['2A', '2B'],
+    'Grand Est': ['08', '10', '51', '52', '54', '55', '57', '67', '68', '88'],
+    'Hauts-de-France': ['02', '59', '60', '62', '80'],
+    'Île-de-France': ['75', '77', '78', '91', '92', '93', '94', '95'],
+    'Normandie': ['14', '27', '50', '61', '76'],
+    'Nouvelle-Aquitaine': ['16', '17', '19', '23', '24', '33', '40', '47', '64', '79', '86', '87'],
+    'Occitanie': ['09', '11', '12', '30', '31', '32', '34', '46', '48', '65', '66', '81', '82'],
+    'Pays de la Loire': ['44', '49', '53', '72', '85'],
+    "Provence-Alpes-Côte d'Azur": ['04', '05', '06', '13', '83', '84'],
+    'Guadeloupe': ['971'],
+    'Martinique': ['972'],
+    'Guyane': ['973'],
+    'La Réunion': ['974'],
+    'Mayotte': ['976'],
+    # Overseas collectivities with public charge points, not part of any region
+    "Collectivités d'outre-mer": ['975', '977', '978'],
+}
+
+DEPARTMENT_NAMES = {
+    '01': 'Ain', '02': 'Aisne', '03': 'Allier', '04': 'Alpes-de-Haute-Provence', '05': 'Hautes-Alpes',
+    '06': 'Alpes-Maritimes', '07': 'Ardèche', '08': 'Ardennes', '09': 'Ariège', '10': 'Aube',
+    '11': 'Aude', '12': 'Aveyron', '13': 'Bouches-du-Rhône', '14': 'Calvados', '15': 'Cantal',
+    '16': 'Charente', '17': 'Charente-Maritime', '18': 'Cher', '19': 'Corrèze', '2A': 'Corse-du-Sud',
+    '2B': 'Haute-Corse', '21': "Côte-d'Or", '22': "Côtes-d'Armor", '23': 'Creuse', '24': 'Dordogne',
+    '25': 'Doubs', '26': 'Drôme', '27': 'Eure', '28': 'Eure-et-Loir', '29': 'Finistère',
+    '30': 'Gard', '31': 'Haute-Garonne', '32': 'Gers', '33': 'Gironde', '34': 'Hérault',
+    '35': 'Ille-et-Vilaine', '36': 'Indre', '37': 'Indre-et-Loire', '38': 'Isère', '39': 'Jura',
+    '40': 'Landes', '41': 'Loir-et-Cher', '42': 'Loire', '43': 'Haute-Loire', '44': 'Loire-Atlantique',
+    '45': 'Loiret', '46': 'Lot', '47': 'Lot-et-Garonne', '48': 'Lozère', '49': 'Maine-et-Loire',
+    '50': 'Manche', '51': 'Marne', '52': 'Haute-Marne', '53': 'Mayenne', '54': 'Meurthe-et-Moselle',
+    '55': 'Meuse', '56': 'Morbihan', '57': 'Moselle', '58': 'Nièvre', '59': 'Nord',
+    '60': 'Oise', '61': 'Orne', '62': 'Pas-de-Calais', '63': 'Puy-de-Dôme', '64': 'Pyrénées-Atlantiques',
+    '65': 'Hautes-Pyrénées', '66': 'Pyrénées-Orientales', '67': 'Bas-Rhin', '68': 'Haut-Rhin', '69': 'Rhône',
+    '70': 'Haute-Saône', '71': 'Saône-et-Loire', '72': 'Sarthe', '73': 'Savoie', '74': 'Haute-Savoie',
+    '75': 'Paris', '76': 'Seine-Maritime', '77': 'Seine-et-Marne', '78': 'Yvelines', '79': 'Deux-Sèvres',
+    '80': 'Somme', '81': 'Tarn', '82': 'Tarn-et-Garonne', '83': 'Var', '84': 'Vaucluse',
+    '85': 'Vendée', '86': 'Vienne', '87': 'Haute-Vienne', '88': 'Vosges', '89': 'Yonne',
+    '90': 'Territoire de Belfort', '91': 'Essonne', '92': 'Hauts-de-Seine', '93': 'Seine-Saint-Denis',
+    '94': 'Val-de-Marne', '95': "Val-d'Oise",
+    '971': 'Guadeloupe', '972': 'Martinique', '973': 'Guyane', '974': 'La Réunion', '975': 'Saint-Pierre-et-Miquelon',
+    '976': 'Mayotte', '977': 'Saint-Barthélemy', '978': 'Saint-Martin',
+}
+
+DEPARTMENT_REGION = {dep: region for region, deps in REGIONS.items() for dep in deps}
+
+UNKNOWN = 'Unknown'
+
+
+def department_codes(insee_codes):
+    """Department code of each INSEE commune code: 3 digits overseas (97x), 2 otherwise"""
+    codes = pd.Series(insee_codes, dtype='string').str.strip().str.zfill(5)
+    overseas = codes.str.startswith('97').fillna(False)
+    return codes.str[:2].where(~overseas, codes.str[:3])
+
+
+def departments_and_regions(insee):
+    """Categorical department and region columns for a categorical INSEE code column.
+
+    Codes are mapped once per distinct value, then expanded by category code.
+    """
+    if not isinstance(insee.dtype, pd.CategoricalDtype):
+        insee = insee.astype('category')
+    categories = pd.Series(insee.cat.categories.astype(str))
+    departments = department_codes(categories).fillna(UNKNOWN).to_numpy(dtype=object)
+    regions = pd.Series(departments).map(DEPARTMENT_REGION).fillna(UNKNOWN).to_numpy(dtype=object)
+    codes = insee.cat.codes.to_numpy()
+    department = pd.Categorical(pd.Series(list(departments) + [UNKNOWN]).to_numpy()[codes])
+    region = pd.Categorical(pd.Series(list(regions) + [UNKNOWN]).to_numpy()[codes])
+    return (
+        pd.Series(department, index=insee.index, name='department'),
+        pd.Series(region, index=insee.index, name='region'),
+    )
+
+
+def department_label(code):
+    """Department code followed by its name, when known"""
+    name = DEPARTMENT_NAMES.get(code)
+    return f"{code} {name}" if name else code
+
+
+def read_department_population(path):
+    """Population of each department from a CSV with department and population columns"""
+    table = pd.read_csv(path, dtype={'department': str})
+    table['department'] = table['department'].str.strip().str.zfill(2)
+    return dict(zip(table['department'], table['population'].astype(float)))
+
+
+def region_population(department_population):
+    """Population of each region, summed from a complete set of its departments"""
+    return {
+        region: sum(department_population[dep] for dep in deps)
+        for region, deps in REGIONS.items() if all(dep in department_population for dep in deps)
+    }
@@ -0,0 +1,270 @@
+"""Station-level history of the consolidation releases.
+
+Each release only describes the network at its date, and the
+installation dates it carries are often missing and forget the stations
+that were decommissioned. The history keeps one station snapshot per
+release instead, in an append-only store under <cache_dir>/history:
+
+- one Parquet segment per release. A segment holds the stations added or
+  changed since the previous release and the keys of the removed ones,
+  so unchanged stations are stored once. Every KEYFRAME_INTERVAL releases
+  the segment is a full snapshot instead, which bounds the number of
+  segments replayed to rebuild any snapshot;
+- index.json, listing the releases in date order with the network totals
+  of each snapshot, so the size of the network over time is read without
+  opening any segment.
+
+Stations without an id cannot be matched between releases by key: they
+are keyed by a hash of their content, so an unchanged one keeps its key.
+A release file replaced in place is told apart from the stored one by its
+content hash, checked when its size or modification time changed.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR, source_identity
+from .dataset import prepare
+from .instrument import instrumented
+from .releases import find_releases
+from .schema import FLAGS_COLUMN, STATION_KEY, read_irve_csv
+from .stations import build_stations
+
+# Bump when the segment layout changes: the store is then rebuilt
+HISTORY_VERSION = 3
+
+# A full snapshot is stored every KEYFRAME_INTERVAL releases
+KEYFRAME_INTERVAL = 8
+
+# Station columns kept in the snapshots
+SNAPSHOT_COLUMNS = [
+    'nom_operateur', 'code_insee_commune', 'commune', 'nbre_pdc', 'puissance_max',
+    'puissance_totale', 'longitude', 'latitude', 'year_installed', FLAGS_COLUMN,
+]
+
+# Segment column telling removed stations apart from added or changed ones
+REMOVED = 'removed'
+
+
+def history_dir(cache_dir=CACHE_DIR):
+    return Path(cache_dir) / 'history'
+
+
+def _read_index(store):
+    try:
+        with open(store / 'index.json') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('format') == HISTORY_VERSION else None
+
+
+def _write_index(store, index):
+    path = store / 'index.json'
+    tmp = path.with_suffix(f".json.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, path)
+
+
+def snapshot_of(stations):
+    """History snapshot of a station table: stable string keys and the snapshot columns"""
+    snapshot = stations[[col for col in SNAPSHOT_COLUMNS if col in stations.columns]]
+    keys = stations.index.astype(str)
+    anonymous = np.asarray(keys.str.startswith('#'), dtype=bool)
+    if anonymous.any():
+        # Row-number keys change from one release to the next: key these
+        # stations on their content, numbered when several are identical
+        content = pd.Series(
+            pd.util.hash_pandas_object(snapshot[anonymous], index=False).to_numpy(),
+        )
+        rank = content.groupby(content).cumcount().to_numpy()
+        keys = keys.to_numpy(dtype=object)
+        keys[anonymous] = [f'#{h:016x}:{n}' for h, n in zip(content.to_numpy(), rank)]
+    snapshot = snapshot.set_axis(pd.Index(keys, name=STATION_KEY))
+    return snapshot[~snapshot.index.duplicated()]
+
+
+def _totals(snapshot):
+    return {
+        'stations': len(snapshot),
+        'charge_points': int(snapshot['nbre_pdc'].sum()) if 'nbre_pdc' in snapshot.columns else None,
+        'power_kw': float(np.nansum(snapshot['puissance_totale'].to_numpy(), dtype=np.float64))
+        if 'puissance_totale' in snapshot.columns else None,
+        'operators': int(snapshot['nom_operateur'].nunique()) if 'nom_operateur' in snapshot.columns else None,
+    }
+
+
+def _diff(previous, snapshot):
+    """Stations of snapshot added or changed since previous, and the keys of the removed ones"""
+    position = previous.index.get_indexer(snapshot.index)
+    known = position >= 0
+    same = np.zeros(len(snapshot), dtype=bool)
+    # A change of columns between releases marks every station as changed
+    if list(previous.columns) == list(snapshot.columns):
+        same[known] = (
+            pd.util.hash_pandas_object(snapshot[known], index=False).to_numpy()
+            == pd.util.hash_pandas_object(previous.iloc[position[known]], index=False).to_numpy()
+        )
+    removed = previous.index[~previous.index.isin(snapshot.index)]
+    return snapshot[~same], removed, {
+        'added': int((~known).sum()),
+        'changed': int((known & ~same).sum()),
+        'removed': len(removed),
+    }
+
+
+def _apply(snapshot, segment):
+    """Snapshot after the changes of a delta segment"""
+    touched = snapshot.index.isin(segment.index)
+    upserts = segment[~segment[REMOVED]].drop(columns=REMOVED)
+    return pd.concat([snapshot[~touched], upserts])
+
+
+def _read_segment(store, entry):
+    segment = pd.read_parquet(store / entry['segment'])
+    return segment.set_index(STATION_KEY)
+
+
+class History:
+    """Append-only store of the station snapshots of successive releases"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.store = history_dir(cache_dir)
+        self.index = _read_index(self.store) or {'format': HISTORY_VERSION, 'releases': []}
+
+    @property
+    def releases(self):
+        return self.index['releases']
+
+    def names(self):
+        return [entry['name'] for entry in self.releases]
+
+    def snapshot(self, position=-1):
+        """Station snapshot of a stored release (the latest by default)"""
+        position = range(len(self.releases))[position]
+        start = max(i for i in range(position + 1) if self.releases[i]['keyframe'])
+        snapshot = _read_segment(self.store, self.releases[start]).drop(columns=REMOVED)
+        dtypes = snapshot.dtypes
+        for entry in self.releases[start + 1:position + 1]:
+            snapshot = _apply(snapshot, _read_segment(self.store, entry))
+        # The removed rows of the deltas leave their columns empty, and the
+        # segments do not share their categories: restore the keyframe dtypes
+        return snapshot.astype({
+            col: 'category' if isinstance(dtype, pd.CategoricalDtype) else dtype
+            for col, dtype in dtypes.items() if col in snapshot.columns
+        })
+
+    def network_size(self):
+        """Network totals of every stored release, one row per release date"""
+        frame = pd.DataFrame(
+            [{'date': entry['date'], **entry['totals'], **entry['delta']} for entry in self.releases],
+            columns=['date', 'stations', 'charge_points', 'power_kw', 'operators', 'added', 'changed', 'removed'],
+        )
+        frame['date'] = pd.to_datetime(frame['date'])
+        return frame
+
+    @instrumented('history_append')
+    def append(self, release, version, stations):
+        """Add the snapshot of a release newer than every stored one"""
+        if self.releases and release.date.strftime('%Y-%m-%d') <= self.releases[-1]['date']:
+            raise ValueError(f"{release.path.name} is not newer than the last stored release")
+        snapshot = snapshot_of(stations)
+        keyframe = len(self.releases) % KEYFRAME_INTERVAL == 0
+        if self.releases:
+            upserts, removed, delta = _diff(self.snapshot(), snapshot)
+        else:
+            delta = {'added': len(snapshot), 'changed': 0, 'removed': 0}
+        if keyframe:
+            segment = snapshot.assign(**{REMOVED: False})
+        else:
+            segment = pd.concat([
+                upserts.assign(**{REMOVED: False}),
+                pd.DataFrame({REMOVED: True}, index=removed),
+            ])
+        name = f"{release.date:%Y%m%d}-{version[:16]}.parquet"
+        stat = os.stat(release.path)
+        self.store.mkdir(parents=True, exist_ok=True)
+        tmp = self.store / f"{name}.{os.getpid()}.tmp"
+        segment.rename_axis(STATION_KEY).reset_index().to_parquet(tmp, index=False)
+        os.replace(tmp, self.store / name)
+        self.releases.append({
+            'name': release.path.name,
+            'date': release.date.strftime('%Y-%m-%d'),
+            'version': version,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'segment': name,
+            'keyframe': keyframe,
+            'totals': _totals(snapshot),
+            'delta': delta,
+        })
+        _write_index(self.store, self.index)
+
+    def truncate(self, count):
+        """Drop every stored release after the first count ones"""
+        if count >= len(self.releases):
+            return
+        for entry in self.releases[count:]:
+            (self.store / entry['segment']).unlink(missing_ok=True)
+        del self.releases[count:]
+        _write_index(self.store, self.index)
+
+
+def _release_stations(path):
+    """Station table of a release that is not served, built without touching the caches"""
+    return build_stations(prepare(read_irve_csv(path)))
+
+
+@instrumented()
+def sync_history(data_dir='.', cache_dir=CACHE_DIR, current=None):
+    """Append the releases of data_dir missing from the history, oldest first.
+
+    current is the dataset being served, whose station table is reused.
+    A release older than the last stored one (a back-filled file) cannot
+    be appended, nor can a stored release whose file was replaced: the
+    history is rewritten from that release on. Returns the names of the
+    releases added.
+    """
+    store = history_dir(cache_dir)
+    if store.exists() and _read_index(store) is None:
+        # Unreadable index or older layout
+        shutil.rmtree(store)
+    history = History(cache_dir)
+    # One snapshot per date: of two files of the same day, the newer schema
+    releases = list({release.date: release for release in find_releases(data_dir)}.values())
+    stored = {entry['name']: entry for entry in history.releases}
+    missing, touched = [], False
+    for release in releases:
+        entry = stored.get(release.path.name)
+        stat = os.stat(release.path)
+        if entry is not None and (entry['size'], entry['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            if source_identity(release.path, cache_dir)[2] == entry['version']:
+                # Same content: remember the new identity to skip hashing it again
+                entry['size'], entry['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+                touched = True
+            else:
+                entry = None
+        if entry is None:
+            missing.append(release)
+    if touched:
+        _write_index(history.store, history.index)
+    if not missing:
+        return []
+    first = missing[0].date.strftime('%Y-%m-%d')
+    history.truncate(sum(entry['date'] < first for entry in history.releases))
+
+    added = []
+    for release in releases[releases.index(missing[0]):]:
+        if current is not None and Path(current.source).resolve() == release.path.resolve():
+            version, stations = current.version, current.stations
+        else:
+            version = source_identity(release.path, cache_dir)[2]
+            stations = _release_stations(release.path)
+        history.append(release, version, stations)
+        added.append(release.path.name)
+    return added
@@ -0,0 +1,170 @@
+"""Opt-in timing and memory instrumentation.
+
+A Recorder collects the spans of one script run: the wall time of each
+step, how much it raised the peak resident memory of the process, and for
+steps backed by a cache, whether the cache answered (hit) or the step had
+to be computed (miss). Each finished span is also logged as one JSON line
+on the 'irve.instrument' logger.
+
+Nothing is recorded unless a recorder was started on the current thread,
+so the spans left in the data layer cost a thread-local lookup when the
+instrumentation is off.
+"""
+import functools
+import json
+import logging
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+logger = logging.getLogger('irve.instrument')
+
+_local = threading.local()
+
+
+def peak_rss_mb():
+    """Peak resident memory of the process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+@dataclass
+class Span:
+    """One timed step; depth is its nesting level within the run"""
+    name: str
+    depth: int
+    cached: bool = False
+    seconds: float = 0.0
+    # Growth of the process peak RSS while the step ran: only steps that
+    # push the peak up report a non-zero value
+    peak_rss_delta_mb: float = 0.0
+    cache: str | None = None
+    _start: float = field(default=0.0, repr=False)
+    _start_rss: float = field(default=0.0, repr=False)
+
+    def record(self):
+        """The span as a plain dict, for the logs and the debug panel"""
+        record = {key: value for key, value in asdict(self).items() if not key.startswith('_')}
+        del record['cached']
+        return record
+
+
+class Recorder:
+    """Spans of one script run, plus context fields added to every log line"""
+
+    def __init__(self, **context):
+        self.context = context
+        self.spans = []
+        self.open = []
+        self.started = time.perf_counter()
+        self.start_rss = peak_rss_mb()
+
+    def begin(self, name, cached=False):
+        span = Span(name, depth=len(self.open), cached=cached, cache='hit' if cached else None)
+        span._start_rss = peak_rss_mb()
+        span._start = time.perf_counter()
+        self.spans.append(span)
+        self.open.append(span)
+        return span
+
+    def end(self, span):
+        span.seconds = round(time.perf_counter() - span._start, 4)
+        span.peak_rss_delta_mb = round(peak_rss_mb() - span._start_rss, 1)
+        # Spans left open by an exception in a nested step are closed with it
+        while self.open and self.open.pop() is not span:
+            pass
+        logger.info(json.dumps({'event': 'span', **self.context, **span.record()}, ensure_ascii=False))
+
+    def cache_miss(self):
+        """Mark the innermost open cached span as computed rather than served from cache"""
+        for span in reversed(self.open):
+            if span.cached:
+                span.cache = 'miss'
+                return
+
+    def records(self):
+        return [span.record() for span in self.spans]
+
+
+def start(**context):
+    """Start recording the spans of the current thread"""
+    _local.recorder = Recorder(**context)
+    return _local.recorder
+
+
+def stop():
+    """Stop recording on the current thread, log the run totals and return the recorder"""
+    recorder = active()
+    _local.recorder = None
+    if recorder is not None:
+        recorder.seconds = round(time.perf_counter() - recorder.started, 4)
+        logger.info(json.dumps({
+            'event': 'run',
+            **recorder.context,
+            'seconds': recorder.seconds,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'peak_rss_delta_mb': round(peak_rss_mb() - recorder.start_rss, 1),
+            'spans': len(recorder.spans),
+        }, ensure_ascii=False))
+    return recorder
+
+
+def active():
+    return getattr(_local, 'recorder', None)
+
+
+def begin(name, cached=False):
+    """Open a span on the active recorder; returns None when not recording"""
+    recorder = active()
+    return recorder.begin(name, cached) if recorder is not None else None
+
+
+def end(span):
+    recorder = active()
+    if span is not None and recorder is not None:
+        recorder.end(span)
+
+
+@contextmanager
+def span(name, cached=False):
+    """Time the enclosed block as one span"""
+    opened = begin(name, cached)
+    try:
+        yield opened
+    finally:
+        end(opened)
+
+
+def cache_miss():
+    """Called from the body of a cached function: the enclosing cached span was computed"""
+    recorder = active()
+    if recorder is not None:
+        recorder.cache_miss()
+
+
+def instrumented(name=None, cached=False):
+    """Decorator timing every call of a function as a span"""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label, cached):
+                return fn(*args, **kwargs)
+
+        return wrapper
+    return decorate
+
+
+def configure_logging(level=logging.INFO):
+    """Send the span logs to stderr, once per process"""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
@@ -0,0 +1,57 @@
+"""Numbers quoted in the section narratives.
+
+The insight boxes quote the same figures as the charts: they are read
+from the aggregates here instead of being written into the text, so a new
+release updates the prose along with the charts.
+"""
+from .aggregates import POWER_LABELS
+
+# The narrative's "acceleration phase"
+ACCELERATION_START = 2020
+
+# National target of 15 million EVs on the road by 2030, and the industry
+# rule of one public charge point per 10 vehicles
+TARGET_YEAR = 2030
+TARGET_EVS = 15_000_000
+EVS_PER_CHARGE_POINT = 10
+TARGET_CHARGE_POINTS = TARGET_EVS // EVS_PER_CHARGE_POINT
+
+
+def _share(part, total):
+    return 100 * part / total if total else 0.0
+
+
+def narrative_facts(aggregates):
+    """Figures of the narrative, from the aggregates of a dataset (or of a filtered view)"""
+    totals = aggregates['totals']
+    installs = {row['Year']: row['New_Stations'] for row in aggregates['yearly_installs']}
+    recent = [n for year, n in installs.items() if year >= ACCELERATION_START]
+    peak_year = max(installs, key=lambda year: (installs[year], year)) if installs else None
+    operators = aggregates['top_operators']
+    communes = aggregates['top_communes']
+    tiers = {row['Charging_Speed']: row['Count'] for row in aggregates['power_tiers']}
+    rated = sum(tiers.values())
+    plugs = aggregates['plug_types']
+    reservation = aggregates['reservation'] or {'has': 0, 'total': 0}
+    return {
+        'stations': totals['stations'],
+        'charge_points': totals['charge_points'],
+        'power_mw': totals['power_kw'] / 1000,
+        'operators': totals['operators'],
+        'target_ratio': TARGET_CHARGE_POINTS / totals['charge_points'] if totals['charge_points'] else 0.0,
+        'recent_years': len(recent),
+        'avg_recent_installs': sum(recent) / len(recent) if recent else 0.0,
+        'peak_year': peak_year,
+        'peak_installs': installs.get(peak_year, 0),
+        'top_operator': operators[0]['Operator'] if operators else None,
+        'top_operator_stations': operators[0]['Stations'] if operators else 0,
+        'runner_up_operator': operators[1]['Operator'] if len(operators) > 1 else None,
+        'top_commune': communes[0]['Commune'] if communes else None,
+        'top_commune_stations': communes[0]['Stations'] if communes else 0,
+        'slow_share': _share(tiers.get(POWER_LABELS[0], 0), rated),
+        'fast_share': _share(sum(tiers.get(label, 0) for label in POWER_LABELS[2:]), rated),
+        'type2_stations': plugs.get('Type 2 (AC standard)', 0),
+        'ccs_stations': plugs.get('CCS Combo (DC fast)', 0),
+        'chademo_stations': plugs.get('CHAdeMO (DC)', 0),
+        'reservation_share': _share(reservation['has'], reservation['total']),
+    }
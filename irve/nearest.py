@@ -0,0 +1,108 @@
+"""Nearest-charger and coverage queries over the station coordinates.
+
+Stations are indexed in a KD-tree of 3D unit vectors: the straight-line
+(chord) distance between two unit vectors grows with the great-circle
+distance, so nearest neighbours and radius queries on the tree are exact
+on the sphere. One tree is built per power threshold, on first use.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Minimum power of a DC fast charger, in kW
+DC_FAST_KW = 50
+
+
+def unit_vectors(lon, lat):
+    """3D unit vectors of lon/lat coordinates in degrees"""
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def km_to_chord(km):
+    return 2 * np.sin(np.asarray(km) / (2 * EARTH_RADIUS_KM))
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+class ChargerIndex:
+    """KD-tree queries over the geolocated stations of a station table"""
+
+    def __init__(self, stations):
+        lon = stations['longitude'].to_numpy(dtype=np.float64)
+        lat = stations['latitude'].to_numpy(dtype=np.float64)
+        valid = np.isfinite(lon) & np.isfinite(lat)
+        self.stations = stations[valid]
+        self.vectors = unit_vectors(lon[valid], lat[valid])
+        if 'puissance_max' in stations.columns:
+            self.power = self.stations['puissance_max'].to_numpy(dtype=np.float64, na_value=0)
+        else:
+            self.power = np.zeros(len(self.stations))
+        self._trees = {}
+        self._lock = threading.Lock()
+
+    def _tree(self, min_power_kw):
+        """Tree over the stations of at least min_power_kw, and their positions"""
+        with self._lock:
+            if min_power_kw not in self._trees:
+                # scipy.spatial takes longer to import than the rest of the
+                # package: only pay for it once a tree is needed
+                from scipy.spatial import cKDTree
+
+                positions = np.flatnonzero(self.power >= min_power_kw)
+                self._trees[min_power_kw] = (cKDTree(self.vectors[positions]), positions)
+            return self._trees[min_power_kw]
+
+    def nearest(self, lon, lat, k=5, min_power_kw=DC_FAST_KW):
+        """The k stations of at least min_power_kw closest to a point, with their distance"""
+        tree, positions = self._tree(min_power_kw)
+        k = min(k, len(positions))
+        if k == 0:
+            return self.stations.iloc[:0].assign(distance_km=[])
+        chords, found = tree.query(unit_vectors([lon], [lat])[0], k=k)
+        chords, found = np.atleast_1d(chords), np.atleast_1d(found)
+        return self.stations.iloc[positions[found]].assign(distance_km=chord_to_km(chords))
+
+    def distance_to_nearest(self, lon, lat, min_power_kw=0, max_km=np.inf):
+        """Distance (km) from each point to its closest station, inf beyond max_km"""
+        tree, positions = self._tree(min_power_kw)
+        if len(positions) == 0:
+            return np.full(len(np.atleast_1d(lon)), np.inf)
+        bound = np.inf if np.isinf(max_km) else km_to_chord(max_km) * (1 + 1e-9)
+        chords, _ = tree.query(unit_vectors(lon, lat), k=1, distance_upper_bound=bound)
+        distances = np.full(len(chords), np.inf)
+        found = np.isfinite(chords)
+        distances[found] = chord_to_km(chords[found])
+        return distances
+
+    def uncovered_share(self, lon, lat, radius_km, min_power_kw=0):
+        """Share of points with no station of at least min_power_kw within radius_km"""
+        if len(np.atleast_1d(lon)) == 0:
+            return 0.0
+        distances = self.distance_to_nearest(lon, lat, min_power_kw, max_km=radius_km)
+        return float(np.mean(distances > radius_km))
+
+
+def commune_points(stations):
+    """One reference point per commune of the station table: the centroid of its stations"""
+    key = 'code_insee_commune' if 'code_insee_commune' in stations.columns else 'commune'
+    located = stations.dropna(subset=['longitude', 'latitude', key])
+    points = located.groupby(key, observed=True).agg(
+        nom=('commune', 'first'), longitude=('longitude', 'mean'), latitude=('latitude', 'mean'),
+    )
+    points.index = points.index.astype(str)
+    points.index.name = 'code_insee'
+    return points
+
+
+def read_commune_points(path):
+    """Commune reference points from a CSV with code_insee, nom, longitude and latitude columns"""
+    points = pd.read_csv(path, dtype={'code_insee': str}).set_index('code_insee')
+    return points[['nom', 'longitude', 'latitude']].dropna(subset=['longitude', 'latitude'])
@@ -0,0 +1,90 @@
+"""Per-operator rollup and market concentration.
+
+The rollup is one row per operator, summed from the cells of the filter
+cube, so it is computed once per dataset version (or filter selection)
+without touching the station table. The concentration metrics and the
+drill-down of an operator only read the rollup.
+"""
+import numpy as np
+import pandas as pd
+
+from .aggregates import PAYMENT_METHODS, PLUG_TYPES
+from .cube import TIER_COLUMNS
+from .geo import UNKNOWN
+
+# Speed tiers counted as DC fast charging (above 50 kW)
+DC_TIERS = list(TIER_COLUMNS.values())[2:]
+
+# Herfindahl-Hirschman index thresholds of the US merger guidelines (2010)
+HHI_LEVELS = [(1500, 'unconcentrated'), (2500, 'moderately concentrated'), (np.inf, 'highly concentrated')]
+
+
+def operator_rollup(cube):
+    """One row per operator of the cube cells, by decreasing station count.
+
+    Holds the station, charge point and power totals, the share of the
+    stations in the selection, the share of the rated charge points that
+    are DC fast, the share of the operator's stations offering each
+    connector and payment method, and the number of departments served.
+    """
+    cells = cube.cells[cube.cells['operator'].notna()]
+    grouped = cells.groupby('operator', observed=True, sort=False)
+    sums = grouped.sum(numeric_only=True)
+    stations = sums['stations'].to_numpy(dtype=np.float64)
+    rated = sums[list(TIER_COLUMNS.values())].sum(axis=1).to_numpy(dtype=np.float64)
+
+    def share(part, total):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total > 0, 100 * np.asarray(part, dtype=np.float64) / total, np.nan)
+
+    known = cells[cells['department'] != UNKNOWN]
+    departments = known.groupby('operator', observed=True)['department'].nunique()
+    rollup = pd.DataFrame({
+        'stations': sums['stations'].astype(np.int64),
+        'charge_points': sums['charge_points'].astype(np.int64),
+        'power_kw': sums['power_kw'],
+        'station_share': share(stations, stations.sum()),
+        'dc_share': share(sums[DC_TIERS].sum(axis=1), rated),
+        **{label: share(sums[col], stations) for label, col in PLUG_TYPES.items()},
+        **{label: share(sums[col], stations) for label, col in PAYMENT_METHODS.items()},
+        'departments': departments.reindex(sums.index, fill_value=0).astype(np.int64),
+    }, index=sums.index.astype(str).rename('operator'))
+    return rollup.sort_values(['stations', 'charge_points'], ascending=False, kind='stable')
+
+
+def concentration(rollup, measure='stations'):
+    """Concentration of a rollup measure across operators.
+
+    hhi is the Herfindahl-Hirschman index on percentage shares (0 to
+    10,000), gini the Gini coefficient of the operators' values and
+    top4_share the percentage held by the four largest operators.
+    """
+    values = np.sort(rollup[measure].to_numpy(dtype=np.float64))
+    total = values.sum()
+    if total <= 0:
+        return {'operators': len(values), 'hhi': 0.0, 'gini': 0.0, 'top4_share': 0.0, 'level': HHI_LEVELS[0][1]}
+    shares = 100 * values / total
+    n = len(values)
+    gini = 2 * np.sum(np.arange(1, n + 1) * values) / (n * total) - (n + 1) / n
+    hhi = float(np.sum(shares ** 2))
+    return {
+        'operators': n,
+        'hhi': hhi,
+        'gini': float(gini),
+        'top4_share': float(shares[-4:].sum()),
+        'level': next(level for bound, level in HHI_LEVELS if hhi < bound),
+    }
+
+
+def lorenz_curve(rollup, measure='stations'):
+    """Cumulative shares of operators and of the measure, smallest operators first"""
+    values = np.sort(rollup[measure].to_numpy(dtype=np.float64))
+    operators = np.arange(len(values) + 1) / max(len(values), 1)
+    held = np.concatenate([[0.0], np.cumsum(values)]) / max(values.sum(), 1.0)
+    return 100 * operators, 100 * held
+
+
+def operator_profile(rollup, operator):
+    """Row of one operator in the rollup with its rank, as a dict"""
+    row = rollup.loc[[operator]].to_dict('records')[0]
+    return {'operator': operator, 'rank': int(rollup.index.get_loc(operator)) + 1, **row}
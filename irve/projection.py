@@ -0,0 +1,186 @@
+"""Growth trends fitted on the yearly installations.
+
+The cumulative number of stations installed by the end of each year is
+fitted with three trend models, all on the log scale so that early and
+recent years weigh by their relative error:
+
+- exponential: constant annual growth rate;
+- logistic: growth slowing down towards a saturation level;
+- piecewise: exponential with a change of rate at a breakpoint year.
+
+Every model reduces to linear least squares (the logistic one for each
+saturation level of a grid, the piecewise one for each breakpoint), so
+fits are matrix products and a whole bootstrap is fitted at once: the
+log residuals are resampled into n_boot synthetic histories, every model
+is refitted on all of them in one batch, and the spread of their
+projections gives the confidence band.
+
+Projections are growth factors relative to the last observed year, to
+be applied to the current size of the network.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+MODELS = {
+    'exponential': 'Exponential',
+    'logistic': 'Logistic',
+    'piecewise': 'Piecewise exponential',
+}
+
+# Saturation levels tried by the logistic fit, as multiples of the largest cumulative count
+SATURATION_GRID = np.geomspace(1.05, 50, 96)
+
+# Breakpoints of the piecewise fit keep at least this many years on each side
+MIN_SEGMENT_YEARS = 3
+
+# Fits need at least this many years with installations
+MIN_YEARS = 5
+
+BAND = (5, 95)
+
+
+@dataclass(frozen=True)
+class Trend:
+    """Projection of one fitted model: growth factors over the last observed year"""
+    model: str
+    params: dict
+    rmse: float  # of the log cumulative counts, in sample
+    years: np.ndarray
+    factor: np.ndarray
+    low: np.ndarray
+    high: np.ndarray
+
+    @property
+    def annual_rate(self):
+        """Average annual growth of the central projection, in %"""
+        periods = self.years[-1] - self.years[0]
+        return 100 * (self.factor[-1] ** (1 / periods) - 1) if periods else 0.0
+
+
+def _lstsq(X, y):
+    """Least squares coefficients of y (..., n) on the design X (..., n, k), batched"""
+    return np.einsum('...kn,...n->...k', np.linalg.pinv(X), y)
+
+
+def _fit_exponential(t, logy):
+    X = np.stack([np.ones_like(t), t], axis=-1)
+    coef = _lstsq(X, logy)
+    return {'intercept': coef[..., 0], 'rate': coef[..., 1]}
+
+
+def _predict_exponential(params, t):
+    return params['intercept'][..., None] + params['rate'][..., None] * t
+
+
+def _fit_logistic(t, logy):
+    # For a saturation level K, logit(N / K) = slope * t + intercept is linear
+    y = np.exp(logy)
+    levels = SATURATION_GRID.reshape((-1,) + (1,) * y.ndim) * y.max(axis=-1, keepdims=True)  # (grid, ..., 1)
+    logit = np.log(y[None] / (levels - y[None]))
+    X = np.stack([np.ones_like(t), t], axis=-1)
+    coef = _lstsq(X, logit)
+    fitted = np.log(levels) - np.log1p(np.exp(-(coef[..., :1] + coef[..., 1:] * t)))
+    best = np.argmin(((fitted - logy[None]) ** 2).sum(axis=-1), axis=0)
+
+    def pick(values):
+        return np.take_along_axis(values, best[None], axis=0)[0]
+
+    return {
+        'saturation': pick(levels[..., 0]),
+        'intercept': pick(coef[..., 0]),
+        'rate': pick(coef[..., 1]),
+    }
+
+
+def _predict_logistic(params, t):
+    return np.log(params['saturation'][..., None]) - np.log1p(
+        np.exp(-(params['intercept'][..., None] + params['rate'][..., None] * t))
+    )
+
+
+def _fit_piecewise(t, logy):
+    breaks = t[MIN_SEGMENT_YEARS - 1:len(t) - MIN_SEGMENT_YEARS]
+    X = np.stack([
+        np.broadcast_to(np.ones_like(t), (len(breaks), len(t))),
+        np.broadcast_to(t, (len(breaks), len(t))),
+        np.maximum(0, t[None] - breaks[:, None]),
+    ], axis=-1)  # (break, n, 3)
+    X = X.reshape(X.shape[:1] + (1,) * (logy.ndim - 1) + X.shape[1:])
+    coef = _lstsq(X, logy[None])
+    fitted = np.einsum('...nk,...k->...n', X, coef)
+    best = np.argmin(((fitted - logy[None]) ** 2).sum(axis=-1), axis=0)
+
+    def pick(values):
+        return np.take_along_axis(values, best[None], axis=0)[0]
+
+    return {
+        'breakpoint': breaks[best],
+        'intercept': pick(coef[..., 0]),
+        'rate': pick(coef[..., 1]),
+        'rate_change': pick(coef[..., 2]),
+    }
+
+
+def _predict_piecewise(params, t):
+    return (params['intercept'][..., None] + params['rate'][..., None] * t
+            + params['rate_change'][..., None] * np.maximum(0, t - params['breakpoint'][..., None]))
+
+
+FITS = {
+    'exponential': (_fit_exponential, _predict_exponential),
+    'logistic': (_fit_logistic, _predict_logistic),
+    'piecewise': (_fit_piecewise, _predict_piecewise),
+}
+
+
+def cumulative_installs(yearly_installs):
+    """Years and cumulative station counts from the yearly_installs aggregate, from the first install"""
+    years = np.array([row['Year'] for row in yearly_installs], dtype=np.float64)
+    counts = np.cumsum([row['New_Stations'] for row in yearly_installs]).astype(np.float64)
+    started = counts > 0
+    return years[started], counts[started]
+
+
+def fit_trends(yearly_installs, horizon=2030, n_boot=1000, seed=0):
+    """Fit every model on the yearly installs and project it to horizon.
+
+    Returns {model: Trend}, empty when there are fewer than MIN_YEARS
+    years to fit.
+    """
+    years, counts = cumulative_installs(yearly_installs)
+    if len(years) < MIN_YEARS:
+        return {}
+    # Fit on years counted from the last observation: the projections are
+    # then growth factors over the last cumulative count
+    t = years - years[-1]
+    logy = np.log(counts)
+    ahead = np.arange(0, max(horizon - years[-1], 0) + 1, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, len(t), (n_boot, len(t)))
+
+    trends = {}
+    for model, (fit, predict) in FITS.items():
+        params = fit(t, logy)
+        fitted = predict(params, t)
+        residuals = logy - fitted
+        # Residual bootstrap: synthetic histories around the fitted curve, all refitted at once
+        boot_params = fit(t, fitted + residuals[draws])
+        boot = predict(boot_params, ahead) - predict(boot_params, np.zeros(1))
+        central = np.exp(predict(params, ahead) - predict(params, np.zeros(1)))
+        low, high = np.exp(np.percentile(boot, BAND, axis=0))
+        trends[model] = Trend(
+            model=model,
+            params={name: float(value) for name, value in params.items()},
+            rmse=float(np.sqrt(np.mean(residuals ** 2))),
+            years=(years[-1] + ahead).astype(int),
+            factor=central,
+            low=low,
+            high=high,
+        )
+    return trends
+
+
+def best_trend(trends):
+    """The trend with the smallest in-sample error"""
+    return min(trends.values(), key=lambda trend: trend.rmse) if trends else None
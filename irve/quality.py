@@ -0,0 +1,285 @@
+"""Data quality rules applied to the consolidation before any metric.
+
+The consolidation mixes units and carries values no charge point can
+have: powers declared in watts instead of kW, commissioning dates in the
+future or before public charging existed, charge points listed twice,
+coordinates outside France or with longitude and latitude swapped.
+Parsing only coerces what cannot be read at all, so these values would
+go straight into the totals.
+
+Each rule checks one defect over whole columns and either fixes the
+value, clears it (the row is kept, the value counts as missing) or
+quarantines the row. validate() evaluates every rule on the table as
+read, then applies the corrections in one pass; the rules hit by each
+kept row are recorded as bits of QUALITY_COLUMN. It runs when a dataset
+version is prepared, so the station table, aggregates and cube built
+from the prepared frame already hold the corrected figures, and the
+report of what was corrected is stored as a JSON sidecar per version.
+"""
+import json
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR, load_table
+from .instrument import cache_miss, instrumented
+from .schema import PDC_KEY
+from .spatial import VIEWS
+
+# Bump when the rules change: every sidecar built from the prepared frame
+# must then be rebuilt too
+QUALITY_VERSION = 1
+
+# Bit of each rule hit by a kept row
+QUALITY_COLUMN = 'quality_bits'
+
+# Commissioning years accepted: public charging starts in 2010, and no
+# release lists a charge point commissioned after the current year
+SERVICE_YEARS = (2010, date.today().year)
+
+
+# Rated power of a single charge point, in kW
+MIN_POWER_KW = 1.0
+MAX_POWER_KW = 1000.0
+
+# Areas of France with public charge points: (lon_min, lat_min, lon_max, lat_max)
+FRANCE_AREAS = [
+    VIEWS[name] for name in
+    ('Metropolitan France', 'Guadeloupe', 'Martinique', 'French Guiana', 'La Réunion', 'Mayotte')
+] + [
+    (-63.2, 17.8, -62.7, 18.2),  # Saint-Martin and Saint-Barthélemy
+    (-56.5, 46.7, -56.1, 47.2),  # Saint-Pierre-et-Miquelon
+]
+# Tolerance around the areas, in degrees
+AREA_MARGIN = 0.1
+
+# Offending values quoted per rule in the report
+REPORT_EXAMPLES = 5
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One data quality check.
+
+    check returns the mask of the offending rows of the frame; repair
+    updates the column arrays in place for those rows ('fix' and 'clear'
+    rules). 'drop' rules quarantine the rows instead.
+    """
+    name: str
+    description: str
+    action: str
+    columns: tuple
+    check: Callable
+    repair: Callable = None
+
+
+def _in_france(lon, lat):
+    inside = np.zeros(len(lon), dtype=bool)
+    for x0, y0, x1, y1 in FRANCE_AREAS:
+        inside |= ((lon >= x0 - AREA_MARGIN) & (lon <= x1 + AREA_MARGIN)
+                   & (lat >= y0 - AREA_MARGIN) & (lat <= y1 + AREA_MARGIN))
+    return inside
+
+
+def _power(df):
+    return df['puissance_nominale'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _power_in_watts(df):
+    power = _power(df)
+    return (power > MAX_POWER_KW) & (power / 1000 >= MIN_POWER_KW) & (power / 1000 <= MAX_POWER_KW)
+
+
+def _power_out_of_range(df):
+    power = _power(df)
+    return ((power <= 0) | (power > MAX_POWER_KW)) & ~_power_in_watts(df)
+
+
+def _date_out_of_range(df):
+    years = df['date_mise_en_service'].dt.year.to_numpy(dtype=np.float64, na_value=np.nan)
+    return (years < SERVICE_YEARS[0]) | (years > SERVICE_YEARS[1])
+
+
+def _coordinates(df):
+    return (df['consolidated_longitude'].to_numpy(dtype=np.float64, na_value=np.nan),
+            df['consolidated_latitude'].to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def _swapped_coordinates(df):
+    lon, lat = _coordinates(df)
+    return ~_in_france(lon, lat) & _in_france(lat, lon)
+
+
+def _outside_france(df):
+    lon, lat = _coordinates(df)
+    known = ~np.isnan(lon) & ~np.isnan(lat)
+    return known & ~_in_france(lon, lat) & ~_in_france(lat, lon)
+
+
+def _duplicate_pdc(df):
+    ids = df[PDC_KEY]
+    return (ids.duplicated() & ids.notna()).to_numpy()
+
+
+def _divide(column, divisor):
+    def repair(values, mask):
+        values[column][mask] = values[column][mask] / divisor
+    return repair
+
+
+def _clear(*columns):
+    def repair(values, mask):
+        for column in columns:
+            values[column][mask] = np.datetime64('NaT') if values[column].dtype.kind == 'M' else np.nan
+    return repair
+
+
+def _swap(values, mask):
+    lon = values['consolidated_longitude'][mask].copy()
+    values['consolidated_longitude'][mask] = values['consolidated_latitude'][mask]
+    values['consolidated_latitude'][mask] = lon
+
+
+RULES = [
+    Rule('duplicate_pdc', 'Charge point id listed more than once', 'drop',
+         (PDC_KEY,), _duplicate_pdc),
+    Rule('power_in_watts', f'Power above {MAX_POWER_KW:g} kW that reads as watts: divided by 1000', 'fix',
+         ('puissance_nominale',), _power_in_watts, _divide('puissance_nominale', 1000)),
+    Rule('power_out_of_range', f'Power not above 0 or above {MAX_POWER_KW:g} kW: cleared', 'clear',
+         ('puissance_nominale',), _power_out_of_range, _clear('puissance_nominale')),
+    Rule('date_out_of_range',
+         f'Commissioning date outside {SERVICE_YEARS[0]}-{SERVICE_YEARS[1]}: cleared', 'clear',
+         ('date_mise_en_service',), _date_out_of_range, _clear('date_mise_en_service')),
+    Rule('swapped_coordinates', 'Longitude and latitude swapped: swapped back', 'fix',
+         ('consolidated_longitude', 'consolidated_latitude'), _swapped_coordinates, _swap),
+    Rule('outside_france', 'Coordinates outside France: cleared', 'clear',
+         ('consolidated_longitude', 'consolidated_latitude'), _outside_france,
+         _clear('consolidated_longitude', 'consolidated_latitude')),
+]
+
+# Rules that keep the row, each with its bit in QUALITY_COLUMN
+QUALITY_BITS = {
+    rule.name: np.uint8(1 << i) for i, rule in enumerate(r for r in RULES if r.action != 'drop')
+}
+
+
+def _format(value):
+    if isinstance(value, pd.Timestamp):
+        return value.date().isoformat()
+    return f'{value:.6g}' if isinstance(value, float) else str(value)
+
+
+def _examples(df, rule, mask):
+    rows = df.loc[mask, list(rule.columns)].head(REPORT_EXAMPLES)
+    return [', '.join(_format(value) for value in row) for row in rows.itertuples(index=False)]
+
+
+@instrumented()
+def validate(df):
+    """Apply the quality rules to a typed frame.
+
+    Returns the corrected frame, with the rules hit by each row in
+    QUALITY_COLUMN, and the report: rows read, rows kept and, per rule,
+    the number of rows hit and a few of the offending values.
+    """
+    rules = [rule for rule in RULES if all(col in df.columns for col in rule.columns)]
+    # Every rule looks at the values as read
+    masks = {rule.name: np.asarray(rule.check(df), dtype=bool) for rule in rules}
+
+    values = {}
+    for rule in rules:
+        if rule.repair is not None and masks[rule.name].any():
+            for col in rule.columns:
+                if col not in values:
+                    values[col] = df[col].to_numpy(copy=True)
+            rule.repair(values, masks[rule.name])
+    bits = np.zeros(len(df), dtype=np.uint8)
+    for name, bit in QUALITY_BITS.items():
+        if name in masks:
+            bits[masks[name]] |= bit
+    corrected = df.assign(**{
+        col: pd.Series(array, index=df.index).astype(df[col].dtype) for col, array in values.items()
+    }, **{QUALITY_COLUMN: bits})
+
+    dropped = np.zeros(len(df), dtype=bool)
+    for rule in rules:
+        if rule.action == 'drop':
+            dropped |= masks[rule.name]
+    if dropped.any():
+        corrected = corrected[~dropped]
+
+    report = {
+        'rows': len(df),
+        'kept': len(corrected),
+        'rules': [
+            {
+                'rule': rule.name,
+                'description': rule.description,
+                'action': rule.action,
+                'rows': int(masks[rule.name].sum()),
+                'examples': _examples(df, rule, masks[rule.name]),
+            }
+            for rule in rules
+        ],
+    }
+    return corrected, report
+
+
+def sidecar_key(version):
+    """Version part of the name of the sidecars built from the corrected rows.
+
+    Those also depend on the last commissioning year accepted, so they are
+    rebuilt once the calendar moves past it.
+    """
+    return f"{version[:16]}-{SERVICE_YEARS[1]}"
+
+
+def report_path(source, version, cache_dir=CACHE_DIR):
+    """Path of the quality report sidecar for a dataset version"""
+    return Path(cache_dir) / f"{Path(source).stem}-{sidecar_key(version)}.quality.json"
+
+
+def _read_report(path, version):
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored.get('format') != QUALITY_VERSION or stored.get('dataset') != version:
+        return None
+    return stored['report']
+
+
+def save_report(source, version, report, cache_dir=CACHE_DIR):
+    """Persist the quality report of a dataset version as its sidecar"""
+    path = report_path(source, version, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".json.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump({'format': QUALITY_VERSION, 'dataset': version, 'report': report}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    for stale in path.parent.glob(f"{Path(source).stem}-*.quality.json"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+@instrumented('load_quality_report', cached=True)
+def load_quality_report(dataset, cache_dir=CACHE_DIR):
+    """Quality report of a dataset, read from its sidecar or written by preparing its frame"""
+    path = report_path(dataset.source, dataset.version, cache_dir)
+    report = _read_report(path, dataset.version)
+    if report is None:
+        cache_miss()
+        if not dataset.loaded('frame'):
+            # Preparing the frame writes the sidecar
+            dataset.load('frame')
+            report = _read_report(path, dataset.version)
+    if report is None:
+        _, report = validate(load_table(dataset.source, cache_dir))
+        save_report(dataset.source, dataset.version, report, cache_dir)
+    return report
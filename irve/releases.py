@@ -0,0 +1,199 @@
+"""Versioned IRVE releases and incremental refresh.
+
+data.gouv.fr publishes the consolidation as dated files named
+consolidation-etalab-schema-irve-statique-v-<schema>-<YYYYMMDD>.csv. The
+app serves the newest file of the data directory. When a new release is
+dropped in, it is diffed against the release being served on the PDC id,
+and only the stations touched by added, removed or changed charge points
+are rebuilt; the aggregates are updated from the same delta.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import (
+    has_aggregates,
+    load_aggregates,
+    pdc_totals,
+    save_aggregates,
+    summarize,
+)
+from .cache import CACHE_DIR, load_table, source_identity
+from .dataset import (
+    Dataset,
+    SourceChanged,
+    open_dataset,
+    prepare,
+    prepared_path,
+    read_prepared,
+    save_prepared,
+)
+from .instrument import instrumented
+from .quality import save_report
+from .schema import PDC_KEY, STATION_KEY, TABLE_COLUMNS
+from .stations import (
+    STATION_CATEGORIES,
+    build_stations,
+    save_stations,
+    station_keys,
+    stations_path,
+)
+
+RELEASE_PATTERN = re.compile(
+    r'^consolidation-etalab-schema-irve-statique-v-(?P<schema>[\d.]+)-(?P<date>\d{8})\.csv$'
+)
+
+# Above this share of changed rows, a full rebuild is cheaper than patching
+MAX_DELTA_SHARE = 0.5
+
+
+@dataclass(frozen=True)
+class Release:
+    """A dated consolidation file"""
+    path: Path
+    schema: str
+    date: datetime
+
+
+@dataclass(frozen=True)
+class ReleaseDelta:
+    """Row masks describing how a new release differs from the previous one"""
+    removed: np.ndarray  # old rows whose PDC is gone
+    added: np.ndarray    # new rows with a PDC that did not exist
+    changed_old: np.ndarray  # old version of rows whose content changed
+    changed_new: np.ndarray  # new version of the same rows
+
+    @property
+    def counts(self):
+        return {
+            'added': int(self.added.sum()),
+            'removed': int(self.removed.sum()),
+            'changed': int(self.changed_new.sum()),
+        }
+
+
+def find_releases(data_dir='.'):
+    """Consolidation files of a directory, oldest first (none if the directory is missing)"""
+    releases = []
+    if not Path(data_dir).is_dir():
+        return releases
+    for path in Path(data_dir).iterdir():
+        match = RELEASE_PATTERN.match(path.name)
+        if match:
+            date = datetime.strptime(match['date'], '%Y%m%d')
+            releases.append(Release(path, match['schema'], date))
+    return sorted(releases, key=lambda release: (release.date, release.schema))
+
+
+def latest_release(data_dir='.'):
+    """The newest consolidation file of a directory, or None"""
+    releases = find_releases(data_dir)
+    return releases[-1] if releases else None
+
+
+def _hashes(df, columns):
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+@instrumented()
+def diff_frames(old, new):
+    """Compare two prepared frames on their PDC id.
+
+    Rows are matched by PDC id through a hash table, and compared through a
+    hash of their other schema columns. Rows without a PDC id cannot be
+    matched: they count as removed from the old frame and added to the new.
+    """
+    columns = [col for col in TABLE_COLUMNS if col != PDC_KEY and col in old.columns and col in new.columns]
+    new_known = np.flatnonzero(new[PDC_KEY].notna().to_numpy())
+    lookup = pd.Index(_hashes(new, [PDC_KEY])[new_known])
+    match = lookup.get_indexer(_hashes(old, [PDC_KEY]))
+    match[old[PDC_KEY].isna().to_numpy()] = -1
+
+    in_new = match >= 0
+    matched = new_known[match[in_new]]
+    in_old = np.zeros(len(new), dtype=bool)
+    in_old[matched] = True
+
+    differs = _hashes(old, columns)[in_new] != _hashes(new, columns)[matched]
+    changed_old = np.zeros(len(old), dtype=bool)
+    changed_old[np.flatnonzero(in_new)[differs]] = True
+    changed_new = np.zeros(len(new), dtype=bool)
+    changed_new[matched[differs]] = True
+    return ReleaseDelta(removed=~in_new, added=~in_old, changed_old=changed_old, changed_new=changed_new)
+
+
+@instrumented()
+def refresh_dataset(previous, previous_aggregates, source, cache_dir=CACHE_DIR):
+    """Move from the dataset being served to the release in source.
+
+    The new release is read through the Parquet cache like any other, then
+    the station table and aggregates of the previous release are patched
+    with the delta instead of being recomputed. Returns the new dataset,
+    its aggregates and the delta (None when a full load was done).
+    """
+    _, _, version = source_identity(source, cache_dir)
+    if version == previous.version or (
+            stations_path(source, version, cache_dir).exists()
+            and has_aggregates(source, version, cache_dir)):
+        # Already built, by this process or another replica
+        dataset = open_dataset(source, cache_dir)
+        return dataset, load_aggregates(dataset, cache_dir), None
+
+    try:
+        # Both parts of the previous release are loaded before any cache of
+        # the new one is written: writing it removes the previous files of a
+        # release replaced in place
+        previous_frame, previous_stations = previous.frame, previous.stations
+    except SourceChanged:
+        # Replaced in place and no longer cached: there is nothing to diff against
+        dataset = open_dataset(source, cache_dir)
+        return dataset, load_aggregates(dataset, cache_dir), None
+
+    frame, report = prepare(load_table(source, cache_dir), with_report=True)
+    save_report(source, version, report, cache_dir)
+    # Serve the new frame from its shared mapping, like a full load would
+    save_prepared(frame, source, version, cache_dir)
+    frame = read_prepared(prepared_path(source, version, cache_dir))
+    delta = diff_frames(previous_frame, frame)
+    touched_old = delta.removed | delta.changed_old
+    touched_new = delta.added | delta.changed_new
+    if touched_new.sum() + touched_old.sum() > MAX_DELTA_SHARE * len(frame):
+        dataset = open_dataset(source, cache_dir)
+        return dataset, load_aggregates(dataset, cache_dir), delta
+
+    # Stations losing or gaining a PDC are rebuilt from the new rows. Rows
+    # without a station id are keyed by row number, so those are always rebuilt
+    old_keys = station_keys(previous_frame).astype(str)
+    new_keys = station_keys(frame).astype(str)
+    kept_keys = previous_stations.index.astype(str)
+    affected = pd.Index(old_keys[touched_old]).union(pd.Index(new_keys[touched_new]))
+    kept = previous_stations[~(kept_keys.isin(affected) | kept_keys.str.startswith('#'))]
+    rebuild = new_keys.isin(affected) | new_keys.str.startswith('#')
+    stations = pd.concat([kept, build_stations(frame[rebuild.to_numpy()])])
+    stations.index = stations.index.astype(str).astype('category').rename(STATION_KEY)
+    for col in STATION_CATEGORIES:
+        if col in stations.columns:
+            stations[col] = stations[col].astype('category')
+    save_stations(stations, source, version, cache_dir)
+
+    removed_kw, removed_tiers = pdc_totals(previous_frame[touched_old])
+    added_kw, added_tiers = pdc_totals(frame[touched_new])
+    previous_tiers = {row['Charging_Speed']: row['Count'] for row in previous_aggregates['power_tiers']}
+    tiers = {
+        label: previous_tiers.get(label, 0) - removed_tiers.get(label, 0) + added_tiers.get(label, 0)
+        for label in set(previous_tiers) | set(added_tiers)
+    }
+    aggregates = summarize(
+        stations,
+        pdc_rows=len(frame),
+        power_kw=previous_aggregates['totals']['power_kw'] - removed_kw + added_kw,
+        tiers=tiers,
+        has_power='puissance_nominale' in frame.columns,
+    )
+    save_aggregates(source, version, aggregates, cache_dir)
+    dataset = Dataset(source, version, cache_dir, frame=frame, stations=stations)
+    return dataset, aggregates, delta
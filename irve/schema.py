@@ -0,0 +1,173 @@
+"""Declared schema for the IRVE static consolidation (schema v2.3.1).
+
+Only the columns used by the app are read. Each one gets a compact dtype
+at ingest time, so the cache stores typed data and prepare_data() does not
+have to parse strings again. The eight boolean columns are packed into a
+single uint8 bitmask, queried with has_flags() and has_any_flag().
+"""
+import numpy as np
+import pandas as pd
+
+# Bump when the declared columns or dtypes change, to invalidate caches
+SCHEMA_VERSION = 5
+
+TRUE_VALUES = ('true', '1', 'yes')
+
+FLAG_COLUMNS = [
+    'prise_type_ef', 'prise_type_2', 'prise_type_combo_ccs', 'prise_type_chademo',
+    'gratuit', 'paiement_acte', 'paiement_cb', 'reservation',
+]
+
+# The flag columns are packed into one uint8 column, one bit per flag
+FLAGS_COLUMN = 'flag_bits'
+FLAG_BITS = {col: np.uint8(1 << i) for i, col in enumerate(FLAG_COLUMNS)}
+
+# One row of the consolidation is one charge point (PDC) of a station
+STATION_KEY = 'id_station_itinerance'
+PDC_KEY = 'id_pdc_itinerance'
+
+CATEGORY_COLUMNS = [
+    'nom_operateur', 'consolidated_commune', 'code_insee_commune', STATION_KEY, PDC_KEY,
+]
+
+NUMERIC_COLUMNS = {
+    'puissance_nominale': 'float32',
+    'nbre_pdc': 'Int16',
+    'consolidated_longitude': 'float32',
+    'consolidated_latitude': 'float32',
+}
+
+# Raw "[lon, lat]" string, only used where the consolidated coordinates are missing
+COORDINATES_COLUMN = 'coordonneesXY'
+
+DATE_COLUMNS = ['date_mise_en_service']
+
+# Dtype of every column read from the CSV
+COLUMNS = {
+    **{col: 'category' for col in CATEGORY_COLUMNS},
+    **NUMERIC_COLUMNS,
+    **{col: 'datetime64' for col in DATE_COLUMNS},
+    **{col: 'bool' for col in FLAG_COLUMNS},
+    COORDINATES_COLUMN: 'category',
+}
+
+# Columns of the typed table once the schema is applied
+TABLE_COLUMNS = [
+    col for col in COLUMNS if col not in FLAG_COLUMNS and col != COORDINATES_COLUMN
+] + [FLAGS_COLUMN]
+
+
+def read_dtypes():
+    """dtype mapping handed to pd.read_csv.
+
+    Flags and raw coordinates are read as categories so they can be decoded
+    from their distinct values; numbers and dates are coerced after reading.
+    """
+    return {col: 'category' for col in CATEGORY_COLUMNS + FLAG_COLUMNS + [COORDINATES_COLUMN]}
+
+
+def parse_coordinates(series):
+    """Longitude and latitude arrays from a categorical "[lon, lat]" column"""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    xy = series.cat.categories.astype(str).str.extract(r'\[\s*(-?[\d.]+)\s*,\s*(-?[\d.]+)\s*\]')
+    codes = series.cat.codes.to_numpy()
+    # Code -1 (missing) picks the trailing NaN
+    lon = np.append(pd.to_numeric(xy[0], errors='coerce').to_numpy(), np.nan)[codes]
+    lat = np.append(pd.to_numeric(xy[1], errors='coerce').to_numpy(), np.nan)[codes]
+    return lon, lat
+
+
+def flag_bit_values(series, bit):
+    """bit where a boolean IRVE column ('true'/'false', '1'/'0', ...) is true, else 0"""
+    if series.dtype == bool:
+        return np.where(series.to_numpy(), bit, np.uint8(0))
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    is_true = series.cat.categories.astype(str).str.lower().isin(TRUE_VALUES)
+    # Code -1 (missing) picks the trailing 0
+    lookup = np.append(np.where(is_true, bit, np.uint8(0)), np.uint8(0)).astype(np.uint8)
+    return lookup[series.cat.codes.to_numpy()]
+
+
+def pack_flags(df):
+    """Replace the flag columns of df by the packed FLAGS_COLUMN bitmask"""
+    flags = np.zeros(len(df), dtype=np.uint8)
+    for col, bit in FLAG_BITS.items():
+        if col in df.columns:
+            flags |= flag_bit_values(df.pop(col), bit)
+    df[FLAGS_COLUMN] = flags
+    return df
+
+
+def flag_mask(*columns):
+    """Bitmask selecting the given flag columns"""
+    mask = np.uint8(0)
+    for col in columns:
+        mask |= FLAG_BITS[col]
+    return mask
+
+
+def has_flags(flags, *columns):
+    """Rows of a packed flags column where every given flag is set"""
+    mask = flag_mask(*columns)
+    return (np.asarray(flags) & mask) == mask
+
+
+def has_any_flag(flags, *columns):
+    """Rows of a packed flags column where at least one given flag is set"""
+    return (np.asarray(flags) & flag_mask(*columns)) != 0
+
+
+def unpack_flags(df):
+    """Copy of df with the packed flags expanded back to one bool column per flag"""
+    if FLAGS_COLUMN not in df.columns:
+        return df
+    flags = df[FLAGS_COLUMN].to_numpy()
+    expanded = {col: (flags & bit) != 0 for col, bit in FLAG_BITS.items()}
+    return df.drop(columns=FLAGS_COLUMN).assign(**expanded)
+
+
+def apply_schema(df):
+    """Coerce the columns of a freshly read IRVE frame to their declared dtypes"""
+    for col, dtype in NUMERIC_COLUMNS.items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce', format='ISO8601')
+    pack_flags(df)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    if COORDINATES_COLUMN in df.columns:
+        lon, lat = parse_coordinates(df.pop(COORDINATES_COLUMN))
+        for col, parsed in (('consolidated_longitude', lon), ('consolidated_latitude', lat)):
+            if col in df.columns:
+                df[col] = df[col].fillna(pd.Series(parsed, index=df.index).astype('float32'))
+            else:
+                df[col] = parsed.astype('float32')
+    return df
+
+
+def read_irve_csv(source, **kwargs):
+    """Read the declared columns of an IRVE CSV with their compact dtypes"""
+    df = pd.read_csv(
+        source,
+        usecols=lambda col: col in COLUMNS,
+        dtype=read_dtypes(),
+        **kwargs
+    )
+    return apply_schema(df)
+
+
+def iter_irve_csv(source, chunksize):
+    """Yield typed chunks of an IRVE CSV, chunksize rows at a time"""
+    with pd.read_csv(
+        source,
+        usecols=lambda col: col in COLUMNS,
+        dtype=read_dtypes(),
+        chunksize=chunksize
+    ) as reader:
+        for chunk in reader:
+            yield apply_schema(chunk)
@@ -0,0 +1,111 @@
+"""Grid index over the station coordinates, for the density map.
+
+Stations are binned once into square lon/lat cells at several levels of
+detail: level 0 uses BASE_CELL_DEG cells and each level halves the cell
+size. Every cell carries its station, charge point and power totals and
+the centroid of its stations, so a map view only ships the cells of its
+viewport at a level where they stay below a target count, instead of
+every station.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+BASE_CELL_DEG = 1.0
+LEVELS = 8
+
+# Map viewports offered by the app: (min lon, min lat, max lon, max lat)
+VIEWS = {
+    'Metropolitan France': (-5.5, 41.2, 9.9, 51.3),
+    'Île-de-France': (1.4, 48.1, 3.6, 49.3),
+    'Auvergne-Rhône-Alpes': (2.0, 44.1, 7.2, 46.8),
+    "Provence-Alpes-Côte d'Azur": (4.2, 42.9, 7.8, 45.2),
+    'Corsica': (8.5, 41.3, 9.6, 43.1),
+    'Guadeloupe': (-61.9, 15.8, -61.0, 16.6),
+    'Martinique': (-61.3, 14.3, -60.8, 14.9),
+    'French Guiana': (-54.7, 2.1, -51.5, 5.8),
+    'La Réunion': (55.2, -21.4, 55.9, -20.8),
+    'Mayotte': (44.9, -13.1, 45.3, -12.6),
+}
+
+
+def cell_size(level):
+    """Cell edge in degrees at a level of detail"""
+    return BASE_CELL_DEG / 2 ** level
+
+
+def _cell_key(lon, lat, level):
+    size = cell_size(level)
+    ix = np.floor(lon / size).astype(np.int64)
+    iy = np.floor(lat / size).astype(np.int64)
+    return (ix << 32) | (iy & 0xFFFFFFFF)
+
+
+@dataclass(frozen=True)
+class GridIndex:
+    """Per-level cell tables built from a station table"""
+    levels: tuple
+
+    def cells(self, level, bbox=None):
+        """Cells of a level, restricted to a (min lon, min lat, max lon, max lat) box"""
+        cells = self.levels[level]
+        if bbox is None:
+            return cells
+        min_lon, min_lat, max_lon, max_lat = bbox
+        inside = (
+            cells['lon'].between(min_lon, max_lon).to_numpy()
+            & cells['lat'].between(min_lat, max_lat).to_numpy()
+        )
+        return cells[inside]
+
+    def pick_level(self, bbox, max_cells=3000):
+        """Finest level whose cells in bbox stay below max_cells"""
+        level = 0
+        for candidate in range(len(self.levels)):
+            if len(self.cells(candidate, bbox)) > max_cells:
+                break
+            level = candidate
+        return level
+
+
+def build_grid_index(stations, levels=LEVELS):
+    """Bin the stations with valid coordinates into cells at every level"""
+    if 'longitude' not in stations.columns or 'latitude' not in stations.columns:
+        return GridIndex(levels=tuple(pd.DataFrame() for _ in range(levels)))
+    lon = stations['longitude'].to_numpy(dtype=np.float64)
+    lat = stations['latitude'].to_numpy(dtype=np.float64)
+    valid = np.isfinite(lon) & np.isfinite(lat) & (np.abs(lon) <= 180) & (np.abs(lat) <= 90)
+    lon, lat = lon[valid], lat[valid]
+    values = pd.DataFrame({
+        'lon': lon,
+        'lat': lat,
+        'stations': 1,
+        'charge_points': stations['nbre_pdc'].to_numpy(dtype=np.float64, na_value=0)[valid]
+        if 'nbre_pdc' in stations.columns else 1,
+        'power_kw': stations['puissance_totale'].to_numpy(dtype=np.float64, na_value=0)[valid]
+        if 'puissance_totale' in stations.columns else 0.0,
+    })
+
+    tables = []
+    for level in range(levels):
+        grouped = values.groupby(_cell_key(lon, lat, level), sort=False)
+        cells = grouped.agg(
+            lon=('lon', 'mean'), lat=('lat', 'mean'), stations=('stations', 'sum'),
+            charge_points=('charge_points', 'sum'), power_kw=('power_kw', 'sum'),
+        )
+        cells.index.name = 'cell'
+        tables.append(cells.astype({
+            'lon': np.float32, 'lat': np.float32, 'stations': np.int32,
+            'charge_points': np.int32, 'power_kw': np.float32,
+        }))
+    return GridIndex(levels=tuple(tables))
+
+
+def view_zoom(bbox):
+    """Map center and zoom level showing a bounding box"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    span = max(max_lon - min_lon, (max_lat - min_lat) * 1.6, 1e-3)
+    center = {'lon': (min_lon + max_lon) / 2, 'lat': (min_lat + max_lat) / 2}
+    return center, max(0.0, math.log2(360 / span) - 0.6)
@@ -0,0 +1,178 @@
+"""Station-level view of the IRVE consolidation.
+
+The consolidation has one row per charge point (PDC); a station appears
+once per PDC, and its station-level attributes (operator, commune,
+nbre_pdc, ...) are repeated on each row. This module collapses PDC rows to
+one row per id_station_itinerance; a station has a plug or payment flag if
+any of its PDCs has it. Rows without a station id are kept as
+stations of their own.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import CACHE_DIR
+from .geo import departments_and_regions
+from .instrument import cache_miss, instrumented
+from .quality import sidecar_key
+from .schema import FLAGS_COLUMN, PDC_KEY, STATION_KEY
+
+# Bump when the station table layout changes
+STATIONS_VERSION = 7
+
+# Text columns of the station table, stored as categories
+STATION_CATEGORIES = ['nom_operateur', 'commune', 'code_insee_commune', 'department', 'region']
+
+# How each PDC column is reduced to its station: (output column, source column, reduction)
+STATION_COLUMNS = [
+    ('nom_operateur', 'nom_operateur', 'first'),
+    ('commune', 'commune', 'first'),
+    ('code_insee_commune', 'code_insee_commune', 'first'),
+    ('nbre_pdc', 'nbre_pdc', 'max'),
+    ('puissance_max', 'puissance_nominale', 'max'),
+    ('puissance_totale', 'puissance_nominale', 'sum'),
+    ('date_mise_en_service', 'date_mise_en_service', 'min'),
+    ('longitude', 'consolidated_longitude', 'first'),
+    ('latitude', 'consolidated_latitude', 'first'),
+]
+
+
+class SeenPdc:
+    """Drops charge points already seen in earlier chunks of a streamed file.
+
+    PDC ids are remembered as 64-bit hashes, 8 bytes per charge point.
+    """
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def filter(self, df):
+        """Rows of a chunk whose PDC id did not appear in a previous chunk"""
+        if PDC_KEY not in df.columns:
+            return df
+        known = df[PDC_KEY].notna().to_numpy()
+        hashes = pd.util.hash_pandas_object(df[PDC_KEY], index=False).to_numpy()
+        repeated = known & np.isin(hashes, self.hashes)
+        self.hashes = np.union1d(self.hashes, hashes[known])
+        return df[~repeated] if repeated.any() else df
+
+
+def station_keys(df):
+    """Station id of each row, with a unique '#<row>' key for rows without one"""
+    if STATION_KEY not in df.columns:
+        return pd.Series('#' + df.index.astype(str), index=df.index, dtype='category')
+    keys = df[STATION_KEY]
+    missing = keys.isna().to_numpy()
+    if not missing.any():
+        return keys
+    fill = pd.Series('#' + df.index[missing].astype(str), index=df.index[missing])
+    keys = keys.cat.add_categories(fill.unique())
+    return keys.fillna(fill)
+
+
+def station_partials(df):
+    """One row per station of a frame (or chunk), plus its PDC row count"""
+    spec = {
+        out: (col, how) for out, col, how in STATION_COLUMNS if col in df.columns
+    }
+    grouped = df.groupby(station_keys(df).rename(STATION_KEY), sort=False, observed=True)
+    stations = grouped.agg(**spec) if spec else pd.DataFrame(index=grouped.size().index)
+    stations['pdc_rows'] = grouped.size()
+    if 'puissance_totale' in stations.columns:
+        # Summed in float64, like the national total, rather than in the
+        # float32 of the column: the area totals add these up
+        power = df['puissance_nominale'].to_numpy(dtype=np.float64, na_value=np.nan)
+        known = ~np.isnan(power)
+        stations['puissance_totale'] = np.bincount(
+            grouped.ngroup().to_numpy()[known], weights=power[known], minlength=len(stations),
+        )
+    if FLAGS_COLUMN in df.columns:
+        stations[FLAGS_COLUMN] = _or_by_group(grouped, df[FLAGS_COLUMN], len(stations))
+    return stations
+
+
+def _or_by_group(grouped, flags, n_groups):
+    """Bitwise OR of the packed flags of each group: a station has a flag if any PDC has it"""
+    combined = np.zeros(n_groups, dtype=np.uint8)
+    np.bitwise_or.at(combined, grouped.ngroup().to_numpy(), flags.to_numpy())
+    return combined
+
+
+def merge_partials(parts):
+    """Combine partial station tables built from different chunks"""
+    if len(parts) == 1:
+        return parts[0]
+    combined = pd.concat(parts)
+    spec = {out: how for out, _, how in STATION_COLUMNS if out in combined.columns}
+    spec['pdc_rows'] = 'sum'
+    grouped = combined.groupby(level=0, sort=False)
+    stations = grouped.agg(spec)
+    if FLAGS_COLUMN in combined.columns:
+        stations[FLAGS_COLUMN] = _or_by_group(grouped, combined[FLAGS_COLUMN], len(stations))
+    return stations
+
+
+def finalize_stations(stations):
+    """Compact dtypes and derive the installation year, department and region of a station table"""
+    stations = stations.copy()
+    stations.index = stations.index.astype('category')
+    for col in STATION_CATEGORIES:
+        if col in stations.columns:
+            stations[col] = stations[col].astype('category')
+    if 'nbre_pdc' in stations.columns:
+        # Stations that do not declare nbre_pdc count their PDC rows
+        stations['nbre_pdc'] = stations['nbre_pdc'].fillna(stations['pdc_rows']).astype('Int16')
+    stations['pdc_rows'] = stations['pdc_rows'].astype(np.int16)
+    if FLAGS_COLUMN in stations.columns:
+        stations[FLAGS_COLUMN] = stations[FLAGS_COLUMN].astype(np.uint8)
+    # Power totals stay in float64: they add up to the area and national totals
+    for col in ('puissance_max', 'longitude', 'latitude'):
+        if col in stations.columns:
+            stations[col] = stations[col].astype(np.float32)
+    if 'date_mise_en_service' in stations.columns:
+        stations['year_installed'] = stations['date_mise_en_service'].dt.year.astype('Int16')
+    if 'code_insee_commune' in stations.columns:
+        stations['department'], stations['region'] = (
+            series.to_numpy() for series in departments_and_regions(stations['code_insee_commune'])
+        )
+    return stations
+
+
+def build_stations(df):
+    """Station table of a prepared PDC-level frame"""
+    return finalize_stations(station_partials(df))
+
+
+def stations_path(source, version, cache_dir=CACHE_DIR):
+    """Path of the cached station table for a dataset version"""
+    return Path(cache_dir) / f"{Path(source).stem}-{sidecar_key(version)}.stations-v{STATIONS_VERSION}.parquet"
+
+
+@instrumented(cached=True)
+def load_stations(df, source, version, cache_dir=CACHE_DIR):
+    """Station table for a dataset version, read from the cache or built and persisted.
+
+    df is the prepared frame, or a function returning it: it is only
+    called when the table has to be built.
+    """
+    path = stations_path(source, version, cache_dir)
+    if path.exists():
+        return pd.read_parquet(path)
+    cache_miss()
+    stations = build_stations(df() if callable(df) else df)
+    save_stations(stations, source, version, cache_dir)
+    return stations
+
+
+def save_stations(stations, source, version, cache_dir=CACHE_DIR):
+    """Persist the station table of a dataset version"""
+    path = stations_path(source, version, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".parquet.{os.getpid()}.tmp")
+    stations.to_parquet(tmp)
+    os.replace(tmp, path)
+    for stale in path.parent.glob(f"{Path(source).stem}-*.stations-*.parquet"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
@@ -0,0 +1,67 @@
+"""Pre-build the caches of the newest release before the app takes traffic.
+
+Run at container start, before `streamlit run`:
+
+    python -m irve.warmup
+
+Builds the Parquet cache, the memory-mapped prepared frame, the station
+table, the aggregates sidecar and the filter cube of the release the app will serve, so the first visitor
+of a new replica reads sidecars instead of parsing the CSV, then records
+the releases of the data directory missing from the release history.
+With a roads file, the fast charging corridor gaps are computed too.
+Steps whose output already exists only cost a file check.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from .aggregates import load_aggregates
+from .cache import CACHE_DIR
+from .corridors import load_corridors
+from .cube import load_cube
+from .dataset import open_dataset
+from .history import sync_history
+from .releases import latest_release
+
+
+def warm(source, cache_dir=CACHE_DIR, log=print, roads_file=None):
+    """Build every cache of source that is missing; returns the dataset"""
+    def step(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        log(f"{name:<12} {time.perf_counter() - start:8.2f} s")
+        return result
+
+    dataset = step('version', lambda: open_dataset(source, cache_dir))
+    step('frame', lambda: dataset.frame)
+    step('aggregates', lambda: load_aggregates(dataset, cache_dir))
+    step('stations', lambda: dataset.stations)
+    step('cube', lambda: load_cube(dataset, cache_dir))
+    if roads_file:
+        step('corridors', lambda: load_corridors(dataset, roads_file, cache_dir))
+    step('history', lambda: sync_history(Path(source).parent, cache_dir, current=dataset))
+    return dataset
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default=os.environ.get('IRVE_DATA_DIR', '.'),
+                        help='directory of the consolidation CSVs (default: $IRVE_DATA_DIR or .)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='cache directory (default: $IRVE_CACHE_DIR)')
+    parser.add_argument('--roads-file', default=os.environ.get('IRVE_ROADS_FILE'),
+                        help='GeoJSON road lines of the corridor view (default: $IRVE_ROADS_FILE)')
+    args = parser.parse_args(argv)
+
+    release = latest_release(args.data_dir)
+    if release is None:
+        print(f"No IRVE consolidation CSV found in {os.path.abspath(args.data_dir)}", file=sys.stderr)
+        return 1
+    print(f"Warming {release.path.name}")
+    warm(release.path, args.cache_dir, roads_file=args.roads_file)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,53 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+# plotly.express is imported inside the figure builders: they only run on a
+# figure cache miss, so serving cached figures never pays for its import
 import plotly.graph_objects as go
+import plotly.io as pio
 import numpy as np
-from datetime import datetime
-import warnings
-warnings.filterwarnings('ignore')
+import io
+import json
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from irve.aggregates import PAYMENT_METHODS, PLUG_TYPES, YEAR_RANGE, load_aggregates, stream_aggregates
+from irve.cache import sample_rows
+from irve.corridors import SNAP_KM, TARGET_GAP_KM, load_corridors
+from irve.cube import POWER_CLASSES, load_cube
+from irve import instrument
+from irve.dataset import open_dataset
+from irve.explorer import EXPORT_MAX_ROWS, EXPORTS, PAGE_SIZES, RowQuery, page_rows, present_categories, query_rows
+from irve.geo import UNKNOWN, department_label, read_department_population, region_population
+from irve.history import History, sync_history
+from irve.instrument import instrumented
+from irve.narrative import EVS_PER_CHARGE_POINT, TARGET_CHARGE_POINTS, TARGET_EVS, TARGET_YEAR, narrative_facts
+from irve.operators import HHI_LEVELS, concentration, lorenz_curve, operator_profile, operator_rollup
+from irve.nearest import DC_FAST_KW, ChargerIndex, commune_points, read_commune_points
+from irve.projection import MODELS, best_trend, fit_trends
+from irve.quality import load_quality_report
+from irve.releases import latest_release, refresh_dataset
+from irve.schema import FLAG_COLUMNS, unpack_flags
+from irve.spatial import VIEWS, build_grid_index, cell_size, view_zoom
+
+# Directory holding the dated consolidation CSVs; the newest one is served
+DATA_DIR = os.environ.get('IRVE_DATA_DIR', '.')
+# Optional CSV of every commune's centroid (code_insee, nom, longitude, latitude)
+# used by the coverage view; without it, coverage is measured over the
+# communes that appear in the dataset
+COMMUNES_FILE = os.environ.get('IRVE_COMMUNES_FILE')
+# Optional CSV of department populations (department, population) for the
+# charger densities of section III
+POPULATION_FILE = os.environ.get('IRVE_POPULATION_FILE')
+# Optional GeoJSON of road lines ('ref' or 'name' property) for the fast
+# charging corridors of section IV
+ROADS_FILE = os.environ.get('IRVE_ROADS_FILE')
+# Streaming mode folds the CSV chunk by chunk into the section metrics and
+# never holds the full table, for containers too small to load it
+STREAMING = os.environ.get('IRVE_STREAMING', '') not in ('', '0')
+# Timing and memory instrumentation, also enabled per session with ?profile=1
+PROFILE = os.environ.get('IRVE_PROFILE', '') not in ('', '0')
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -17,6 +59,19 @@ st.set_page_config(
     layout="wide"
 )
 
+# Record the spans of this run when profiling: shown in the sidebar debug
+# panel at the end of the run and logged as JSON lines
+profile = None
+if PROFILE or st.query_params.get('profile', '') not in ('', '0'):
+    instrument.configure_logging()
+    st.session_state.setdefault('profile_session', uuid.uuid4().hex[:8])
+    st.session_state.profile_runs = st.session_state.get('profile_runs', 0) + 1
+    profile = instrument.start(
+        session=st.session_state.profile_session,
+        run=st.session_state.profile_runs,
+        section=st.session_state.get('current_section', "I"),
+    )
+
 # Custom css for dark mode
 st.markdown("""
 <style>
@@ -202,47 +257,208 @@ st.markdown("""
 # DATA LOADING
 # ============================================================================
 
-@st.cache_data
-def load_data():
-    """Load EV charging infrastructure data from local CSV"""
+@st.cache_resource(show_spinner=False)
+def _served_data():
+    """Dataset and metrics currently served to every session.
+
+    When a newer release (or a new version of the same file) shows up, the
+    served data is refreshed from the previous release's delta instead of
+    being rebuilt from scratch.
+    """
+    return {'lock': threading.Lock(), 'key': None, 'dataset': None, 'aggregates': None}
+
+
+def _serve(source, stat):
+    """Dataset and metrics for a source file, keyed on its path, size and mtime.
+
+    Reruns only compare this key, so they don't hash the frame.
+    """
+    served = _served_data()
+    key = (str(source), stat.st_size, stat.st_mtime_ns)
+    if served['key'] != key:
+        with served['lock']:
+            if served['key'] != key:
+                instrument.cache_miss()
+                if served['dataset'] is None:
+                    dataset = open_dataset(source)
+                    aggregates = load_aggregates(dataset)
+                else:
+                    dataset, aggregates, _ = refresh_dataset(served['dataset'], served['aggregates'], source)
+                    # Record the new release in the history of section II
+                    sync_history(Path(source).parent, current=dataset)
+                served.update(key=key, dataset=dataset, aggregates=aggregates)
+    return served['dataset'], served['aggregates']
+
+
+@instrumented('stream_aggregates', cached=True)
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _stream_aggregates(source, size, mtime_ns):
+    """Section metrics folded chunk by chunk from the CSV, in streaming mode"""
+    instrument.cache_miss()
+    return stream_aggregates(source)
+
+
+@instrumented('grid_index', cached=True)
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _grid_index(version, _stations):
+    """Spatial grid of the served stations, built once per dataset version"""
+    instrument.cache_miss()
+    return build_grid_index(_stations)
+
+
+@instrumented('charger_index', cached=True)
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _charger_index(version, _stations):
+    """Nearest-charger index of the served stations, built once per dataset version"""
+    instrument.cache_miss()
+    return ChargerIndex(_stations)
+
+
+@instrumented('commune_points', cached=True)
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _commune_points(version, _stations):
+    """Reference points of the coverage view, one per commune"""
+    instrument.cache_miss()
+    if COMMUNES_FILE:
+        return read_commune_points(COMMUNES_FILE)
+    return commune_points(_stations)
+
+
+@instrumented('filter_cube', cached=True)
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _filter_cube(version, _dataset):
+    """Filter cube of the served dataset, loaded once per dataset version"""
+    instrument.cache_miss()
+    return load_cube(_dataset)
+
+
+@instrumented('filtered_aggregates', cached=True)
+@st.cache_data(show_spinner=False, max_entries=64)
+def _filtered_aggregates(version, _cube, regions, departments, operators, power_classes, years):
+    """Section metrics of the stations matching a filter selection"""
+    instrument.cache_miss()
+    return _cube.slice(regions, departments, operators, power_classes, years).aggregates()
+
+
+@instrumented('population', cached=True)
+@st.cache_data(show_spinner=False, max_entries=1)
+def _population(path, mtime_ns):
+    """Department and region populations read from the population file"""
+    instrument.cache_miss()
+    departments = read_department_population(path)
+    return departments, region_population(departments)
+
+
+@instrumented('corridors', cached=True)
+@st.cache_data(show_spinner=False, max_entries=1)
+def _corridors(version, roads_path, roads_mtime_ns, _dataset):
+    """Fast charger gaps along the corridors of the roads file, once per dataset version"""
+    instrument.cache_miss()
+    return load_corridors(_dataset, roads_path)
+
+
+@instrumented('operator_rollup', cached=True)
+@st.cache_data(show_spinner=False, max_entries=64)
+def _operator_rollup(version, _cube, filters):
+    """Per-operator rollup of the stations matching a filter selection (None: all)"""
+    instrument.cache_miss()
+    return operator_rollup(_cube.slice(*filters) if filters else _cube)
+
+
+@instrumented('network_history', cached=True)
+@st.cache_data(show_spinner=False, max_entries=1)
+def _network_history(segments):
+    """Network totals of the recorded releases, re-read when a segment is added or replaced"""
+    instrument.cache_miss()
+    return History().network_size()
+
+
+@instrumented('growth_trends', cached=True)
+@st.cache_data(show_spinner=False, max_entries=4)
+def _growth_trends(version, _yearly_installs):
+    """Trend models fitted on the national yearly installs, once per dataset version"""
+    instrument.cache_miss()
+    return fit_trends(_yearly_installs)
+
+
+@instrumented('quality_report', cached=True)
+@st.cache_data(show_spinner=False, max_entries=1)
+def _quality_report(version, _dataset):
+    """Data quality report of the served dataset, read from its sidecar"""
+    instrument.cache_miss()
+    return load_quality_report(_dataset)
+
+
+@instrumented('explorer_options', cached=True)
+@st.cache_data(show_spinner=False, max_entries=1)
+def _explorer_options(version, _frame):
+    """Operators and highest power offered by the raw data explorer"""
+    instrument.cache_miss()
+    power = _frame['puissance_nominale'].to_numpy()
+    max_power = float(np.ceil(np.nanmax(power))) if np.isfinite(power).any() else 1.0
+    return present_categories(_frame['nom_operateur']), max_power
+
+
+@instrumented('explorer_rows', cached=True)
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _explorer_rows(version, query, _frame):
+    """Positions of the rows matching an explorer query, shared by every session"""
+    instrument.cache_miss()
+    return query_rows(_frame, query)
+
+
+@instrumented('load_sample', cached=True)
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_sample(source, size, mtime_ns, nrows=100):
+    """First rows of the table, for the raw data view"""
+    instrument.cache_miss()
+    return sample_rows(source, nrows)
+
+
+@instrumented(cached=True)
+def load_data(release):
+    """Load the prepared EV charging infrastructure dataset of a release and its section metrics.
+
+    In streaming mode only the metrics are loaded and the dataset is None.
+    """
     try:
-        df = pd.read_csv('consolidation-etalab-schema-irve-statique-v-2.3.1-20251024.csv')
-        return df
+        stat = os.stat(release.path)
+        if STREAMING:
+            return None, _stream_aggregates(str(release.path), stat.st_size, stat.st_mtime_ns)
+        return _serve(release.path, stat)
     except FileNotFoundError:
-        st.error("File not found: consolidation-etalab-schema-irve-statique-v-2.3.1-20251024.csv")
-        st.info("Make sure the CSV file is in the same directory as this script.")
-        return None
+        st.error(f"File not found: {release.path}")
+        return None, None
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return None
+        return None, None
 
-@st.cache_data
-def prepare_data(df):
-    """Clean and prepare data"""
-    if df is None:
-        return None
-    
-    if 'date_mise_en_service' in df.columns:
-        df['date_mise_en_service'] = pd.to_datetime(df['date_mise_en_service'], errors='coerce')
-        df['year_installed'] = df['date_mise_en_service'].dt.year
-    
-    if 'puissance_nominale' in df.columns:
-        df['puissance_nominale'] = pd.to_numeric(df['puissance_nominale'], errors='coerce')
-    
-    if 'nbre_pdc' in df.columns:
-        df['nbre_pdc'] = pd.to_numeric(df['nbre_pdc'], errors='coerce')
-    
-    bool_cols = ['prise_type_ef', 'prise_type_2', 'prise_type_combo_ccs', 
-                 'prise_type_chademo', 'gratuit', 'paiement_acte', 'paiement_cb', 
-                 'reservation']
-    for col in bool_cols:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.lower().isin(['true', '1', 'yes']).astype(int)
-    
-    if 'consolidated_commune' in df.columns:
-        df['commune'] = df['consolidated_commune']
-    
-    return df
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart, timed as a span when profiling (covers the figure serialization)"""
+    title = re.sub(r'<[^>]+>', '', fig.layout.title.text or '') or (fig.data[0].type if fig.data else 'figure')
+    with instrument.span(f"plotly_chart {title}"):
+        return st.plotly_chart(fig, **kwargs)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _figure_json(name, version, filters, extra, _build):
+    """Serialized figure, shared by every session showing the same data"""
+    instrument.cache_miss()
+    return pio.to_json(_build(), validate=False)
+
+
+def cached_figure(name, build, *extra, filtered=True):
+    """Figure returned by build(), cached per dataset version and filter state.
+
+    extra holds the other inputs of the figure (widget values); figures
+    that ignore the cross-filters pass filtered=False.
+    """
+    filters = filter_state if filtered and current_section in FILTERED_SECTIONS else None
+    with instrument.span(f"figure {name}", cached=True):
+        spec = _figure_json(name, data_version, filters, extra, build)
+    # The JSON was produced by a validated figure: skip validating it again
+    return go.Figure(json.loads(spec), _validate=False)
 
 
 # ============================================================================
@@ -277,6 +493,8 @@ with st.sidebar:
             st.session_state.current_section = section_key
             st.rerun()
     
+    st.markdown("---")
+    filter_panel = st.container()
     st.markdown("---")
     st.markdown("### About")
     st.caption("**Data Analysis and Visualization** : Final Project")
@@ -288,24 +506,137 @@ with st.sidebar:
 
 st.markdown('<h1 class="main-title">⚡ France\'s Electric Future </h1>', unsafe_allow_html=True)
 
+release = latest_release(DATA_DIR)
+if release is None:
+    st.error(f"No IRVE consolidation CSV found in {os.path.abspath(DATA_DIR)}")
+    st.info("Make sure the CSV file is in the same directory as this script.")
+    st.stop()
+
 with st.spinner("Loading charging station data..."):
-    df_raw = load_data()
+    dataset, aggs = load_data(release)
 
-if df_raw is None:
+if aggs is None:
     st.stop()
 
-df = prepare_data(df_raw)
+# Identity of the data behind the figures: the dataset version, or the
+# file identity in streaming mode
+if dataset is not None:
+    data_version = dataset.version
+else:
+    stat = os.stat(release.path)
+    data_version = f"{release.path.name}:{stat.st_size}:{stat.st_mtime_ns}"
 
-if df is None or len(df) == 0:
+if aggs['totals']['stations'] == 0:
     st.error("No valid data available after preprocessing.")
     st.stop()
 
 current_section = st.session_state.current_section
 
+# ============================================================================
+# SECTION DATA
+# ============================================================================
+# What each section reads besides the national metrics. Only the declared
+# parts are materialized, on first access: the station table and the filter
+# cube from their sidecars, the PDC frame from its memory-mapped file.
+SECTION_DATA = {
+    "I": (),
+    "II": ("cube", "history"),
+    "III": ("cube", "stations"),
+    "IV": ("cube", "corridors"),
+    "V": ("cube",),
+    "VI": ("cube",),
+    "VII": ("stations",),
+    "VIII": ("frame", "quality"),
+}
+
+
+def section_data(part):
+    """One data part of the served release, or None if unavailable in streaming mode"""
+    if part == "sample":
+        stat = os.stat(release.path)
+        return _load_sample(str(release.path), stat.st_size, stat.st_mtime_ns)
+    if part == "history":
+        # One segment per recorded release and content version
+        segments = tuple(entry['segment'] for entry in History().releases)
+        return _network_history(segments) if segments else None
+    if dataset is None:
+        return None
+    if part == "frame":
+        return dataset.frame
+    if part == "stations":
+        return dataset.stations
+    if part == "cube":
+        return _filter_cube(dataset.version, dataset)
+    if part == "quality":
+        return _quality_report(dataset.version, dataset)
+    if part == "corridors":
+        if not ROADS_FILE:
+            return None
+        return _corridors(dataset.version, ROADS_FILE, os.stat(ROADS_FILE).st_mtime_ns, dataset)
+    raise KeyError(part)
+
+
+with st.spinner("Loading section data..."):
+    data = {part: section_data(part) for part in SECTION_DATA[current_section]}
+
+# ============================================================================
+# CROSS-FILTERS (sections II to VI)
+# ============================================================================
+# Sections II to VI read `view`: the national metrics, or the metrics of the
+# filtered stations rolled up from the cube
+FILTERED_SECTIONS = ("II", "III", "IV", "V", "VI")
+FILTER_KEYS = ("filter_regions", "filter_departments", "filter_operators", "filter_power", "filter_years")
+view = aggs
+filter_state = None
+# The filter widgets are only drawn on the sections they apply to: re-assign
+# their state so Streamlit keeps it while another section is shown
+for key in FILTER_KEYS:
+    if key in st.session_state:
+        st.session_state[key] = st.session_state[key]
+with filter_panel:
+    st.markdown("### Filters")
+    st.caption("Apply to sections II to VI")
+    if dataset is None:
+        st.caption("Filters need the full dataset and are not available in streaming mode.")
+    elif current_section in FILTERED_SECTIONS:
+        cube = data["cube"]
+        regions = st.multiselect("Region", cube.values('region'), key="filter_regions")
+        departments = cube.slice(regions=regions).values('department')
+        if 'filter_departments' in st.session_state:
+            st.session_state.filter_departments = [
+                d for d in st.session_state.filter_departments if d in departments
+            ]
+        departments = st.multiselect(
+            "Department", departments, format_func=department_label, key="filter_departments",
+        )
+        operators = st.multiselect("Operator", cube.values('operator'), key="filter_operators")
+        power_classes = st.multiselect(
+            "Power class",
+            [p for p in POWER_CLASSES if p in set(cube.values('power_class'))],
+            key="filter_power",
+        )
+        st.session_state.setdefault("filter_years", YEAR_RANGE)
+        years = st.slider("Installation year", YEAR_RANGE[0], YEAR_RANGE[1], key="filter_years")
+        years = None if tuple(years) == YEAR_RANGE else tuple(years)
+
+        if regions or departments or operators or power_classes or years:
+            filter_state = (tuple(regions), tuple(departments), tuple(operators), tuple(power_classes), years)
+            view = _filtered_aggregates(dataset.version, cube, *filter_state)
+            st.caption(f"{view['totals']['stations']:,} of {aggs['totals']['stations']:,} stations selected")
+
+if current_section in FILTERED_SECTIONS and view['totals']['stations'] == 0:
+    st.warning("No stations match the selected filters.")
+    st.stop()
+
+# The narrative is about France as a whole: it quotes the national figures
+# whatever the filters
+facts = narrative_facts(aggs)
+
 # ============================================================================
 # I / The State of French EV Infrastructure Today
 # ============================================================================
 
+section_span = instrument.begin(f"section {current_section}")
 if current_section == "I":
     st.markdown("""
     Electric vehicles are the future of transportation. But they need one very critical thing : charging infrastructure. 
@@ -315,10 +646,10 @@ if current_section == "I":
 
     st.markdown('<h2 class="section-title">I / The State of French EV Infrastructure Today</h2>', unsafe_allow_html=True)
 
-    total_stations = len(df)
-    total_charge_points = df['nbre_pdc'].sum() if 'nbre_pdc' in df.columns else 0
-    total_power = df['puissance_nominale'].sum() if 'puissance_nominale' in df.columns else 0
-    total_operators = df['nom_operateur'].nunique() if 'nom_operateur' in df.columns else 0
+    total_stations = aggs['totals']['stations']
+    total_charge_points = aggs['totals']['charge_points']
+    total_power = aggs['totals']['power_kw']
+    total_operators = aggs['totals']['operators']
 
     col1, col2, col3, col4 = st.columns(4)
 
@@ -358,20 +689,20 @@ if current_section == "I":
     <div class="insight-box">
     <h3>The current state of things :</h3>
     <p>
-    Right now, all across France, there are 176,286 charging stations standing ready for electric vehicles. That's 2,345,294 charge points. 
+    Right now, all across France, there are {facts['stations']:,} charging stations standing ready for electric vehicles. That's {facts['charge_points']:,} charge points. 
     This is enough electricity to simultaneously charge <strong>hundreds of thousands of cars</strong>. 
-    Together, they pack 12430 megawatts of raw capacity, scattered from coastal towns to Alpine villages.
+    Together, they pack {facts['power_mw']:,.0f} megawatts of raw capacity, scattered from coastal towns to Alpine villages.
     </p>
     <p>
-    But there is however a twist: all this infrastructure isn't controlled by one company. <strong>321 different operators are fighting for dominance</strong>. 
+    But there is however a twist: all this infrastructure isn't controlled by one company. <strong>{facts['operators']:,} different operators are fighting for dominance</strong>. 
     Energy corporations, EV specialists, and startup are all fighting for position. 
     Competition does help create innovation, but it also means chaos, 
     such as issues with incompatible payment apps, different pricing schemes and a fragmented networks that feel less like one system
     </p>
     <p>
-    Finally there is one last and main issue : is 2,345,294 charge points enough ? France wants 15 million EVs on the road by 2030. 
-    The industry standard is one public charger per 10 vehicles. If we do the math for this, <strong>France will need 1.5 million charge points</strong>. 
-    That number is approximately 10 times what exists today.
+    Finally there is one last and main issue : is {facts['charge_points']:,} charge points enough ? France wants {TARGET_EVS / 1e6:g} million EVs on the road by {TARGET_YEAR}. 
+    The industry standard is one public charger per {EVS_PER_CHARGE_POINT} vehicles. If we do the math for this, <strong>France will need {TARGET_CHARGE_POINTS / 1e6:g} million charge points</strong>. 
+    That number is approximately {facts['target_ratio']:.0f} times what exists today.
     </p>
     </div>
     """, unsafe_allow_html=True)
@@ -382,17 +713,13 @@ if current_section == "I":
 elif current_section == "II":
     st.markdown('<h2 class="section-title">II / Year-by-Year Growth Acceleration</h2>', unsafe_allow_html=True)
 
-    if 'year_installed' in df.columns:
-        df_years = df[df['year_installed'].notna()]
-        df_years = df_years[(df_years['year_installed'] >= 2010) & (df_years['year_installed'] <= 2025)]
+    if view['yearly_installs']:
+        yearly_installs = pd.DataFrame(view['yearly_installs'])
+        yearly_installs['Cumulative_Stations'] = yearly_installs['New_Stations'].cumsum()
         
-        if len(df_years) > 0:
-            yearly_installs = df_years.groupby('year_installed').size().reset_index()
-            yearly_installs.columns = ['Year', 'New_Stations']
-            yearly_installs['Cumulative_Stations'] = yearly_installs['New_Stations'].cumsum()
-            
+        def build_growth():
             fig_growth = go.Figure()
-            
+
             fig_growth.add_trace(go.Bar(
                 x=yearly_installs['Year'],
                 y=yearly_installs['New_Stations'],
@@ -400,7 +727,7 @@ elif current_section == "II":
                 marker_color='#667eea',
                 yaxis='y'
             ))
-            
+
             fig_growth.add_trace(go.Scatter(
                 x=yearly_installs['Year'],
                 y=yearly_installs['Cumulative_Stations'],
@@ -409,7 +736,7 @@ elif current_section == "II":
                 yaxis='y2',
                 marker=dict(size=8)
             ))
-            
+
             fig_growth.update_layout(
                 title_text='<b style="color: #ccc;">EV Charging Station Growth: The Exponential Curve</b>',
                 title_font_size=18,
@@ -423,41 +750,73 @@ elif current_section == "II":
                 paper_bgcolor='rgba(0,0,0,0)',
                 font=dict(size=12, color='#ccc')
             )
-            
-            st.plotly_chart(fig_growth, use_container_width=True)
-            
-            recent_years = yearly_installs[yearly_installs['Year'] >= 2020]
-            if len(recent_years) >= 2:
-                avg_growth = recent_years['New_Stations'].mean()
-                peak_year = yearly_installs.loc[yearly_installs['New_Stations'].idxmax(), 'Year']
-                peak_installs = yearly_installs['New_Stations'].max()
-                
-                st.markdown(f"""
-                <div class="insight-box">
-                <h3>The Acceleration Phase (2020-2025)</h3>
-                <p>
-                Let's take a look at this graph. The red line curving upward is no accident. We can see that France has had a huge growth spurt. 
-                <strong>Since 2020, the country has been deploying an average of 15,544 charging stations per year</strong>. 
-                Not incrementally, nor cautiously, but in a very aggressive manner.
-                </p>
-                <p>
-                The main shift happened around 2019/2020. That's the moment when the growth stopped being linear and instead became exponential. The reason ? 
-                Because the urgency finally sank in. 
-                Climate change isn't abstract anymore, and they finally noticed that EVs aren't a luxury, but that they are necessary. The Governments started setting mandates, 
-                and private companies smelled opportunity. 
-                </p>
-                <p>
-                <strong>2024 was the peak year: 25,210 new stations installed in a single year</strong>. It wasn't because it became easy to install thanks to technology getting easier. 
-                It was money flowing. Highway rest stops were mandated to install chargers. Commercial parking lots followed. 
-                Employers realized their EV-driving employees needed places to charge during the workday. Everything was falling into place.
-                </p>
-                <p>
-                But again, one very important question comes to mind : can France keep this up ? For the next six years ? And without slowing down ? The easy part was done. 
-                The hard part comes next: rural areas, faster deployment timelines and scaling supply chains across the country. 
-                The acceleration has to continue, or the 2030 target just becomes wishful thinking.
-                </p>
-                </div>
-                """, unsafe_allow_html=True)
+            return fig_growth
+
+        plotly_chart(cached_figure('II/growth', build_growth), use_container_width=True)
+        
+        if facts['recent_years'] >= 2:
+            st.markdown(f"""
+            <div class="insight-box">
+            <h3>The Acceleration Phase (2020-{release.date.year})</h3>
+            <p>
+            Let's take a look at this graph. The red line curving upward is no accident. We can see that France has had a huge growth spurt. 
+            <strong>Since 2020, the country has been deploying an average of {facts['avg_recent_installs']:,.0f} charging stations per year</strong>. 
+            Not incrementally, nor cautiously, but in a very aggressive manner.
+            </p>
+            <p>
+            The main shift happened around 2019/2020. That's the moment when the growth stopped being linear and instead became exponential. The reason ? 
+            Because the urgency finally sank in. 
+            Climate change isn't abstract anymore, and they finally noticed that EVs aren't a luxury, but that they are necessary. The Governments started setting mandates, 
+            and private companies smelled opportunity. 
+            </p>
+            <p>
+            <strong>{facts['peak_year']} was the peak year: {facts['peak_installs']:,} new stations installed in a single year</strong>. It wasn't because it became easy to install thanks to technology getting easier. 
+            It was money flowing. Highway rest stops were mandated to install chargers. Commercial parking lots followed. 
+            Employers realized their EV-driving employees needed places to charge during the workday. Everything was falling into place.
+            </p>
+            <p>
+            But again, one very important question comes to mind : can France keep this up ? For the next six years ? And without slowing down ? The easy part was done. 
+            The hard part comes next: rural areas, faster deployment timelines and scaling supply chains across the country. 
+            The acceleration has to continue, or the 2030 target just becomes wishful thinking.
+            </p>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # Installation dates miss decommissioned stations and many are blank:
+    # the recorded releases give the actual size of the network at each date
+    history = data["history"]
+    if history is not None and len(history) >= 2:
+        st.markdown("### Network Size Across Releases")
+        if filter_state is not None:
+            st.caption("Recorded for the whole of France: the filters do not apply to this chart.")
+
+        def build_releases():
+            fig_releases = go.Figure(go.Scatter(
+                x=history['date'],
+                y=history['stations'],
+                customdata=history[['added', 'removed']],
+                mode='lines+markers',
+                name='Stations',
+                line=dict(color='#667eea', width=3),
+                marker=dict(size=7),
+                hovertemplate='%{y:,} stations<br>+%{customdata[0]:,} / -%{customdata[1]:,} since the previous release<extra></extra>',
+            ))
+            fig_releases.update_layout(
+                title_text='<b style="color: #ccc;">Stations Listed in Each Consolidation Release</b>',
+                title_font_size=18,
+                xaxis=dict(title_text='<b style="color: #ccc;">Release date</b>', title_font_size=14, tickfont=dict(color='#999')),
+                yaxis=dict(title_text='<b style="color: #ccc;">Stations</b>', title_font_size=13, tickfont=dict(color='#999')),
+                height=450,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(size=12, color='#ccc')
+            )
+            return fig_releases
+
+        plotly_chart(
+            cached_figure('II/releases', build_releases, history.to_json(date_format='iso'), filtered=False),
+            use_container_width=True,
+        )
 
 
 # ============================================================================
@@ -466,42 +825,138 @@ elif current_section == "II":
 elif current_section == "III":
     st.markdown('<h2 class="section-title">III / Regional Concentration & Disparities</h2>', unsafe_allow_html=True)
 
+    st.markdown("### Charging Density Map")
+    if dataset is None:
+        st.info("The map needs the full dataset and is not available in streaming mode.")
+    else:
+        grid = _grid_index(dataset.version, data["stations"])
+        map_view = st.selectbox("Area", list(VIEWS), key="map_view")
+        bbox = VIEWS[map_view]
+        level = grid.pick_level(bbox)
+        cells = grid.cells(level, bbox)
+        center, zoom = view_zoom(bbox)
+
+        if len(cells) > 0:
+            marker_size = 5 + 25 * np.sqrt(cells['stations'] / cells['stations'].max())
+            def build_map():
+                fig_map = go.Figure(go.Scattermap(
+                    lon=cells['lon'],
+                    lat=cells['lat'],
+                    mode='markers',
+                    marker=dict(
+                        size=marker_size,
+                        color=cells['charge_points'],
+                        colorscale='Plasma',
+                        opacity=0.75,
+                        showscale=True,
+                        colorbar=dict(title=dict(text='Charge Points', font=dict(color='#ccc')), tickfont=dict(color='#999'))
+                    ),
+                    customdata=np.stack([cells['stations'], cells['charge_points'], cells['power_kw'] / 1000], axis=-1),
+                    hovertemplate='%{customdata[0]:,} stations<br>%{customdata[1]:,} charge points<br>%{customdata[2]:.1f} MW<extra></extra>'
+                ))
+                fig_map.update_layout(
+                    map=dict(style='carto-darkmatter', center=center, zoom=zoom),
+                    height=650,
+                    margin=dict(l=0, r=0, t=0, b=0),
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(size=12, color='#ccc')
+                )
+                return fig_map
+
+            plotly_chart(cached_figure('III/map', build_map, map_view, filtered=False), use_container_width=True)
+            st.caption(
+                f"{len(cells):,} cells of about {cell_size(level) * 111:.1f} km, "
+                f"covering {int(cells['stations'].sum()):,} stations"
+            )
+        else:
+            st.info("No geolocated stations in this area.")
+
+    st.markdown("### Regions and Departments")
+    # Identity of the population file: the charts depend on it as well as on the dataset version
+    population_file = (POPULATION_FILE, os.stat(POPULATION_FILE).st_mtime_ns) if POPULATION_FILE else None
+    population = _population(*population_file) if population_file else None
+    area_col1, area_col2 = st.columns(2)
+    for column, key, label, names in (
+        (area_col1, 'regions', 'Region', None),
+        (area_col2, 'departments', 'Department', department_label),
+    ):
+        areas = pd.DataFrame([row for row in view[key] if row[label] != UNKNOWN][:15])
+        if areas.empty:
+            continue
+        measure = 'Stations'
+        if population is not None:
+            inhabitants = population[0] if key == 'departments' else population[1]
+            areas['Stations per 100k inhabitants'] = 100_000 * areas['Stations'] / areas[label].map(inhabitants)
+            measure = 'Stations per 100k inhabitants'
+        if names is not None:
+            areas[label] = areas[label].map(names)
+
+        def build_areas(areas=areas, label=label, measure=measure, key=key):
+            import plotly.express as px
+
+            fig_areas = px.bar(
+                areas.sort_values(measure),
+                x=measure,
+                y=label,
+                orientation='h',
+                color=measure,
+                color_continuous_scale='Teal',
+                hover_data=['Stations', 'Charge_Points'],
+                title=f'{measure} by {label} (top 15 by stations)',
+            )
+            fig_areas.update_layout(
+                height=600,
+                showlegend=False,
+                coloraxis_showscale=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16,
+                title_font_color='#ccc',
+                font=dict(size=11, color='#ccc'),
+                xaxis=dict(tickfont=dict(color='#999')),
+                yaxis=dict(tickfont=dict(color='#999'))
+            )
+            return fig_areas
+
+        with column:
+            plotly_chart(cached_figure(f'III/{key}', build_areas, measure, population_file), use_container_width=True)
 
     st.markdown("### Top 15 Communes")
-    if 'commune' in df.columns:
-        commune_counts = df['commune'].value_counts().head(15).reset_index()
-        commune_counts.columns = ['Commune', 'Stations']
+    if view['top_communes']:
+        commune_counts = pd.DataFrame(view['top_communes'])
         
-        fig_communes = px.bar(
-            commune_counts,
-            x='Stations',
-            y='Commune',
-            orientation='h',
-            color='Stations',
-            color_continuous_scale='Blues',
-            title='Charging Stations by City'
-        )
-        fig_communes.update_layout(
-            height=600,
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title_font_size=16,
-            title_font_color='#ccc',
-            font=dict(size=11, color='#ccc'),
-            xaxis=dict(tickfont=dict(color='#999')),
-            yaxis=dict(tickfont=dict(color='#999'))
-        )
-        st.plotly_chart(fig_communes, use_container_width=True)
-        
-        top_commune = commune_counts.iloc[0]['Commune']
-        top_commune_count = commune_counts.iloc[0]['Stations']
+        def build_communes():
+            import plotly.express as px
+
+            fig_communes = px.bar(
+                commune_counts,
+                x='Stations',
+                y='Commune',
+                orientation='h',
+                color='Stations',
+                color_continuous_scale='Blues',
+                title='Charging Stations by City'
+            )
+            fig_communes.update_layout(
+                height=600,
+                showlegend=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16,
+                title_font_color='#ccc',
+                font=dict(size=11, color='#ccc'),
+                xaxis=dict(tickfont=dict(color='#999')),
+                yaxis=dict(tickfont=dict(color='#999'))
+            )
+            return fig_communes
+
+        plotly_chart(cached_figure('III/communes', build_communes), use_container_width=True)
 
     st.markdown(f"""
     <div class="insight-box">
     <h3>The Urban vs Rural Divide</h3>
     <p>
-    If you're living in Paris, it is a paradise for EVs. There are 394 charging stations in your city. Around any corner you'll be able to find a charger. 
+    If you're living in {facts['top_commune']}, it is a paradise for EVs. There are {facts['top_commune_stations']:,} charging stations in your city. Around any corner you'll be able to find a charger. 
     But, outside the cities, the rural side of France looks completely different. <strong>Small towns and villages ? Charging deserts</strong>. 
     One charging point serving thousands of people, for kilometers around.
     </p>
@@ -514,42 +969,154 @@ elif current_section == "III":
     """, unsafe_allow_html=True)
 
     st.markdown("### Top 10 Operators")
-    if 'nom_operateur' in df.columns:
-        operator_counts = df['nom_operateur'].value_counts().head(10).reset_index()
-        operator_counts.columns = ['Operator', 'Stations']
+    if view['top_operators']:
+        operator_counts = pd.DataFrame(view['top_operators'])
         
-        fig_ops = px.bar(
-            operator_counts,
-            x='Stations',
-            y='Operator',
-            orientation='h',
-            color='Stations',
-            color_continuous_scale='Purples',
-            title='Stations by Network Operator'
+        def build_ops():
+            import plotly.express as px
+
+            fig_ops = px.bar(
+                operator_counts,
+                x='Stations',
+                y='Operator',
+                orientation='h',
+                color='Stations',
+                color_continuous_scale='Purples',
+                title='Stations by Network Operator'
+            )
+            fig_ops.update_layout(
+                height=600,
+                showlegend=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16,
+                title_font_color='#ccc',
+                font=dict(size=11, color='#ccc'),
+                xaxis=dict(tickfont=dict(color='#999')),
+                yaxis=dict(tickfont=dict(color='#999'))
+            )
+            return fig_ops
+
+        plotly_chart(cached_figure('III/operators', build_ops), use_container_width=True)
+
+    national_concentration = None
+    if dataset is not None:
+        rollup = _operator_rollup(dataset.version, data["cube"], filter_state)
+        national_concentration = (
+            concentration(_operator_rollup(dataset.version, data["cube"], None))
+            if filter_state else concentration(rollup)
         )
-        fig_ops.update_layout(
-            height=600,
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title_font_size=16,
-            title_font_color='#ccc',
-            font=dict(size=11, color='#ccc'),
-            xaxis=dict(tickfont=dict(color='#999')),
-            yaxis=dict(tickfont=dict(color='#999'))
+        market = concentration(rollup)
+
+        st.markdown("### Market Concentration")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Operators", f"{market['operators']:,}")
+        col2.metric("HHI (stations)", f"{market['hhi']:,.0f}", help="Herfindahl-Hirschman index on station shares, 0 to 10,000")
+        col3.metric("Gini coefficient", f"{market['gini']:.2f}")
+        col4.metric("Top 4 share", f"{market['top4_share']:.1f}%")
+        st.caption(f"By the merger guidelines thresholds, this market is {market['level']}.")
+
+        def build_lorenz():
+            operator_share, station_share = lorenz_curve(rollup)
+            fig_lorenz = go.Figure([
+                go.Scatter(x=[0, 100], y=[0, 100], mode='lines', name='Equal shares',
+                           line=dict(color='#999', dash='dash')),
+                go.Scatter(x=operator_share, y=station_share, mode='lines', name='Operators',
+                           line=dict(color='#764ba2', width=3), fill='tonexty'),
+            ])
+            fig_lorenz.update_layout(
+                title='Share of Stations Held by the Smallest Operators',
+                xaxis_title='Operators, smallest first (%)',
+                yaxis_title='Stations (%)',
+                height=450,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16,
+                title_font_color='#ccc',
+                font=dict(size=11, color='#ccc'),
+                xaxis=dict(tickfont=dict(color='#999')),
+                yaxis=dict(tickfont=dict(color='#999'))
+            )
+            return fig_lorenz
+
+        plotly_chart(cached_figure('III/lorenz', build_lorenz), use_container_width=True)
+
+        st.markdown("### Operator Drill-down")
+        operator = st.selectbox(
+            "Operator", list(rollup.index),
+            format_func=lambda name: f"{name} ({rollup.at[name, 'stations']:,} stations)",
+            key="drilldown_operator",
         )
-        st.plotly_chart(fig_ops, use_container_width=True)
-        
-        top_operator = operator_counts.iloc[0]['Operator']
-        top_operator_count = operator_counts.iloc[0]['Stations']     
+        if operator is not None:
+            profile_row = operator_profile(rollup, operator)
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Rank", f"#{profile_row['rank']}", f"{profile_row['station_share']:.1f}% of stations", delta_color="off")
+            col2.metric("Stations / charge points", f"{profile_row['stations']:,} / {profile_row['charge_points']:,}")
+            col3.metric("Power", f"{profile_row['power_kw'] / 1000:,.1f} MW", f"{profile_row['dc_share']:.0f}% DC fast", delta_color="off")
+            col4.metric("Departments", f"{profile_row['departments']:,}")
+            mix = pd.DataFrame(
+                [{'Feature': label, 'Kind': 'Connector', 'Share': profile_row[label]} for label in PLUG_TYPES]
+                + [{'Feature': label, 'Kind': 'Payment', 'Share': profile_row[label]} for label in PAYMENT_METHODS]
+            )
 
-    
+            def build_mix():
+                import plotly.express as px
+
+                fig_mix = px.bar(
+                    mix, x='Share', y='Feature', color='Kind', orientation='h',
+                    title=f'Share of {operator} Stations Offering Each Feature',
+                    color_discrete_sequence=['#667eea', '#4caf50'],
+                )
+                fig_mix.update_layout(
+                    height=400,
+                    xaxis=dict(range=[0, 100], title='Stations (%)', tickfont=dict(color='#999')),
+                    yaxis=dict(title='', tickfont=dict(color='#999')),
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    title_font_size=16,
+                    title_font_color='#ccc',
+                    font=dict(size=11, color='#ccc'),
+                )
+                return fig_mix
+
+            plotly_chart(cached_figure('III/operator_mix', build_mix, operator), use_container_width=True)
+
+        with st.expander("All Operators"):
+            st.dataframe(
+                rollup.reset_index(),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'operator': 'Operator',
+                    'stations': st.column_config.NumberColumn('Stations', format='%d'),
+                    'charge_points': st.column_config.NumberColumn('Charge points', format='%d'),
+                    'power_kw': st.column_config.NumberColumn('Power (kW)', format='%.0f'),
+                    'station_share': st.column_config.NumberColumn('Station share (%)', format='%.2f'),
+                    'dc_share': st.column_config.NumberColumn('DC fast (%)', format='%.1f'),
+                    **{label: st.column_config.NumberColumn(f'{label} (%)', format='%.0f')
+                       for label in list(PLUG_TYPES) + list(PAYMENT_METHODS)},
+                    'departments': st.column_config.NumberColumn('Departments', format='%d'),
+                },
+            )
+
+    concentration_sentence = (
+        f"The four largest hold {national_concentration['top4_share']:.0f}% of the stations, "
+        f"for a Herfindahl-Hirschman index of {national_concentration['hhi']:,.0f}: "
+        f"by the usual thresholds the market is {national_concentration['level']}. "
+        if national_concentration else ""
+    )
+    fragmentation = (
+        "On paper it looks fragmented, and it is: even the largest operators hold a small share each."
+        if national_concentration and national_concentration['level'] == HHI_LEVELS[0][1]
+        else "On paper it would look fragmented, but in reality a few giants dominate."
+    )
+    runner_up = f", with only {facts['runner_up_operator']} right behind" if facts['runner_up_operator'] else ""
     st.markdown(f"""
     <div class="insight-box">
     <h3>Fragmentation and Useless issues</h3>
     <p>
-    Then there is the operator question. Power Dot France controls 13,069 stations, with only Bouygues Energies and & Services right behind. 
-    That's a huge margin of power in a market with 321 operators total. On paper it would look fragmented, but in reality a few giants dominate. 
+    Then there is the operator question. {facts['top_operator']} controls {facts['top_operator_stations']:,} stations{runner_up}. 
+    That's a huge margin of power in a market with {facts['operators']:,} operators total. {concentration_sentence}{fragmentation} 
     Which means different apps for charging, different payment systems, different customer service and many others annoying side-effects. 
     <strong>Unsurprisingly, drivers hate this fragmentation. They want one app, one payment method, one seamless experience</strong>. 
     Instead they get a random looking patchwork of a system that feels like it was assembled from spare parts.
@@ -564,71 +1131,72 @@ elif current_section == "III":
 elif current_section == "IV":
     st.markdown('<h2 class="section-title">IV / The Critical Role of Fast Charging</h2>', unsafe_allow_html=True)
 
-    if 'puissance_nominale' in df.columns:
-        df_power = df[df['puissance_nominale'].notna()]
-        
-        df_power['charging_speed'] = pd.cut(
-            df_power['puissance_nominale'],
-            bins=[0, 22, 50, 150, 10000],
-            labels=['Slow (≤22kW)', 'Medium (22-50kW)', 'Fast (50-150kW)', 'Ultra-Fast (>150kW)']
-        )
-        
-        power_dist = df_power['charging_speed'].value_counts().reset_index()
-        power_dist.columns = ['Charging_Speed', 'Count']
+    if view['power_tiers']:
+        power_dist = pd.DataFrame(view['power_tiers']).sort_values('Count', ascending=False)
         
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_power_pie = px.pie(
-                power_dist,
-                values='Count',
-                names='Charging_Speed',
-                title='Charging Infrastructure Mix',
-                color_discrete_sequence=px.colors.sequential.Blues
-            )
-            fig_power_pie.update_layout(
-                height=550,
-                title_font_size=16,
-                title_font_color='#ccc',
-                font=dict(size=12, color='#ccc'),
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            fig_power_pie.update_traces(textposition='inside', textinfo='percent+label', textfont=dict(color='#000000'))
-            st.plotly_chart(fig_power_pie, use_container_width=True)
+            def build_power_pie():
+                import plotly.express as px
+
+                fig_power_pie = px.pie(
+                    power_dist,
+                    values='Count',
+                    names='Charging_Speed',
+                    title='Charging Infrastructure Mix',
+                    color_discrete_sequence=px.colors.sequential.Blues
+                )
+                fig_power_pie.update_layout(
+                    height=550,
+                    title_font_size=16,
+                    title_font_color='#ccc',
+                    font=dict(size=12, color='#ccc'),
+                    paper_bgcolor='rgba(0,0,0,0)'
+                )
+                fig_power_pie.update_traces(textposition='inside', textinfo='percent+label', textfont=dict(color='#000000'))
+                return fig_power_pie
+
+            plotly_chart(cached_figure('IV/power_pie', build_power_pie), use_container_width=True)
         
         with col2:
-            fig_power_bar = px.bar(
-                power_dist.sort_values('Count', ascending=True),
-                x='Count',
-                y='Charging_Speed',
-                orientation='h',
-                title='Number of Stations per Speed Tier',
-                color='Count',
-                color_continuous_scale='Viridis'
-            )
-            fig_power_bar.update_layout(
-                height=550,
-                showlegend=False,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                title_font_size=16,
-                title_font_color='#ccc',
-                font=dict(size=12, color='#ccc'),
-                xaxis=dict(tickfont=dict(color='#999')),
-                yaxis=dict(tickfont=dict(color='#999'))
-            )
-            st.plotly_chart(fig_power_bar, use_container_width=True)
+            def build_power_bar():
+                import plotly.express as px
+
+                fig_power_bar = px.bar(
+                    power_dist.sort_values('Count', ascending=True),
+                    x='Count',
+                    y='Charging_Speed',
+                    orientation='h',
+                    title='Number of Charge Points per Speed Tier',
+                    color='Count',
+                    color_continuous_scale='Viridis'
+                )
+                fig_power_bar.update_layout(
+                    height=550,
+                    showlegend=False,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    title_font_size=16,
+                    title_font_color='#ccc',
+                    font=dict(size=12, color='#ccc'),
+                    xaxis=dict(tickfont=dict(color='#999')),
+                    yaxis=dict(tickfont=dict(color='#999'))
+                )
+                return fig_power_bar
+
+            plotly_chart(cached_figure('IV/power_bar', build_power_bar), use_container_width=True)
             
         st.markdown(f"""
         <div class="insight-box">
         <h3> The Speed Trap</h3>
         <p>
-        This is where France's infrastructure reveals its weakness. 58.8% of chargers are slow (≤22kW). 
+        This is where France's infrastructure reveals its weakness. {facts['slow_share']:.1f}% of chargers are slow (≤22kW). 
         It is not all bad, they are great for overnight charging at home. You can park your car at 8pm, and wake up with 150-200km of range.
         But for everyone else ? For families planning road trips ? For people who need a charge in 30 minutes ? <strong>These slow chargers are useless</strong>.
         </p>
         <p>
-        Now the real issue: <strong>only 27.9% of stations offer fast or ultra-fast charging (>50kW)</strong>. These are the chargers that matter for long-distance travel.
+        Now the real issue: <strong>only {facts['fast_share']:.1f}% of stations offer fast or ultra-fast charging (>50kW)</strong>. These are the chargers that matter for long-distance travel.
         They can give an EV 200km in 20-30 minutes, making them able to to compete with gas cars. But they are very rare and scattered. Mostly on highways, occasionally in cities.
         Not enough.
         </p>
@@ -641,52 +1209,113 @@ elif current_section == "IV":
         </div>
         """, unsafe_allow_html=True)
 
+    st.markdown("### Fast-Charging Corridors")
+    corridors = data["corridors"]
+    if corridors is None:
+        st.info(
+            "Set IRVE_ROADS_FILE to a GeoJSON file of road lines to measure the gaps between "
+            "fast chargers along each corridor."
+            if dataset is not None else
+            "Corridors need the full dataset and are not available in streaming mode."
+        )
+    elif corridors.empty:
+        st.info("The roads file has no named road lines.")
+    else:
+        over = corridors[corridors['max_gap_km'] > TARGET_GAP_KM]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Corridors", f"{len(corridors):,}")
+        col2.metric("Fast chargers on corridors", f"{int(corridors['chargers'].sum()):,}")
+        col3.metric(f"Corridors with a gap over {TARGET_GAP_KM} km", f"{len(over):,}")
+        worst = corridors.head(20)
+
+        def build_corridors():
+            import plotly.express as px
+
+            fig_corridors = px.bar(
+                worst.sort_values('max_gap_km'),
+                x='max_gap_km',
+                y='corridor',
+                orientation='h',
+                color='max_gap_km',
+                color_continuous_scale='Reds',
+                hover_data=['length_km', 'chargers'],
+                labels={'max_gap_km': 'Longest gap (km)', 'corridor': 'Corridor',
+                        'length_km': 'Length (km)', 'chargers': 'Fast chargers'},
+                title=f'Longest Stretch Without a Fast Charger (≥{DC_FAST_KW} kW)',
+            )
+            fig_corridors.add_vline(x=TARGET_GAP_KM, line_dash='dash', line_color='#fbbf24')
+            fig_corridors.update_layout(
+                height=600,
+                showlegend=False,
+                coloraxis_showscale=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16,
+                title_font_color='#ccc',
+                font=dict(size=12, color='#ccc'),
+                xaxis=dict(tickfont=dict(color='#999')),
+                yaxis=dict(tickfont=dict(color='#999'))
+            )
+            return fig_corridors
+
+        plotly_chart(cached_figure('IV/corridors', build_corridors, ROADS_FILE, filtered=False), use_container_width=True)
+        st.caption(
+            f"Fast chargers within {SNAP_KM:g} km of a road are snapped to it; the dashed line is the "
+            f"{TARGET_GAP_KM} km spacing required on the core European network."
+            + (" Corridors cover every station, whatever the filters." if filter_state else "")
+        )
+        with st.expander("All Corridors"):
+            st.dataframe(
+                corridors[['corridor', 'length_km', 'chargers', 'max_gap_km']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'corridor': 'Corridor',
+                    'length_km': st.column_config.NumberColumn('Length (km)', format='%.0f'),
+                    'chargers': st.column_config.NumberColumn('Fast chargers', format='%d'),
+                    'max_gap_km': st.column_config.NumberColumn('Longest gap (km)', format='%.1f'),
+                },
+            )
+
 # ============================================================================
 # V / Technical Standardization: Connector Types
 # ============================================================================
 elif current_section == "V":
     st.markdown('<h2 class="section-title">V / Technical Standardization: Connector Types</h2>', unsafe_allow_html=True)
 
-    plug_types = {}
-
-    if 'prise_type_2' in df.columns:
-        plug_types['Type 2 (AC standard)'] = int(df['prise_type_2'].astype(int).sum())
-
-    if 'prise_type_combo_ccs' in df.columns:
-        plug_types['CCS Combo (DC fast)'] = int(df['prise_type_combo_ccs'].astype(int).sum())
-
-    if 'prise_type_chademo' in df.columns:
-        plug_types['CHAdeMO (DC)'] = int(df['prise_type_chademo'].astype(int).sum())
-
-    if 'prise_type_ef' in df.columns:
-        plug_types['Type EF (AC)'] = int(df['prise_type_ef'].astype(int).sum())
+    plug_types = view['plug_types']
 
     plug_df = pd.DataFrame(list(plug_types.items()), columns=['Plug_Type', 'Count'])
     plug_df = plug_df[plug_df['Count'] > 0].sort_values('Count', ascending=False)
 
     if len(plug_df) > 0:
-        fig_plugs = px.bar(
-            plug_df,
-            x='Plug_Type',
-            y='Count',
-            title='Available Connector Types Across France',
-            color='Count',
-            color_continuous_scale='Teal',
-            labels={'Count': 'Number of Stations', 'Plug_Type': 'Connector Type'}
-        )
-        fig_plugs.update_layout(
-            height=550,
-            showlegend=False,
-            xaxis_tickangle=-45,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title_font_size=16,
-            title_font_color='#ccc',
-            font=dict(size=12, color='#ccc'),
-            xaxis=dict(tickfont=dict(color='#999')),
-            yaxis=dict(tickfont=dict(color='#999'))
-        )
-        st.plotly_chart(fig_plugs, use_container_width=True)
+        def build_plugs():
+            import plotly.express as px
+
+            fig_plugs = px.bar(
+                plug_df,
+                x='Plug_Type',
+                y='Count',
+                title='Available Connector Types Across France',
+                color='Count',
+                color_continuous_scale='Teal',
+                labels={'Count': 'Number of Stations', 'Plug_Type': 'Connector Type'}
+            )
+            fig_plugs.update_layout(
+                height=550,
+                showlegend=False,
+                xaxis_tickangle=-45,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16,
+                title_font_color='#ccc',
+                font=dict(size=12, color='#ccc'),
+                xaxis=dict(tickfont=dict(color='#999')),
+                yaxis=dict(tickfont=dict(color='#999'))
+            )
+            return fig_plugs
+
+        plotly_chart(cached_figure('V/plugs', build_plugs), use_container_width=True)
         
     st.markdown(f"""
     <div class="insight-box">
@@ -694,13 +1323,13 @@ elif current_section == "V":
     <p>
     In early 2010s EV charging was a nightmare. Tesla had its own connector. Japan used CHAdeMO. Europe ? <strong>Multiple competing standards fighting for dominance.</strong>
     Drivers needed adapters for adapters. It was chaos. Then Europe got smart and mandated standardization. 
-    Type 2 became the EU standard for AC charging, and it's everywhere now, in 110,073 stations. That's progress.
+    Type 2 became the EU standard for AC charging, and it's everywhere now, in {facts['type2_stations']:,} stations. That's progress.
     Nissan, a Tesla, a Renault : now they all use the same connector. <strong>One cable fits all.</strong>
     </p>
     <p>
-    For fast charging, CCS Combo is winning (59,433 stations worldwide). It's becoming the global standard. Even Tesla caved and adopted it in Europe. 
+    For fast charging, CCS Combo is winning ({facts['ccs_stations']:,} stations worldwide). It's becoming the global standard. Even Tesla caved and adopted it in Europe. 
     This is good, because convergence means compatibility, which means fewer headaches for drivers.
-    But there are still issues however. CHAdeMO (10,357 stations) is slowly dying. Nissan owners will <strong>soon find their cars to be obsolete.</strong>
+    But there are still issues however. CHAdeMO ({facts['chademo_stations']:,} stations) is slowly dying. Nissan owners will <strong>soon find their cars to be obsolete.</strong>
     Japanese EV drivers are also feeling the pressure as their charger network dies too. This is standardization's dark side: winners and losers, created overnight.
     </p>
     <p>
@@ -721,44 +1350,40 @@ elif current_section == "VI":
     with col1:
         st.markdown("### Payment Landscape")
         
-        payment_methods = {}
-        
-        if 'paiement_cb' in df.columns:
-            payment_methods['Credit Card'] = int(df['paiement_cb'].astype(int).sum())
-        
-        if 'paiement_acte' in df.columns:
-            payment_methods['Pay-as-you-go'] = int(df['paiement_acte'].astype(int).sum())
-        
-        if 'gratuit' in df.columns:
-            payment_methods['Free'] = int(df['gratuit'].astype(int).sum())
+        payment_methods = view['payment_methods']
         
         payment_df = pd.DataFrame(list(payment_methods.items()), columns=['Payment_Type', 'Count'])
         payment_df = payment_df[payment_df['Count'] > 0].sort_values('Count', ascending=False)
         
         if len(payment_df) > 0:
-            fig_payment = px.pie(
-                payment_df,
-                values='Count',
-                names='Payment_Type',
-                title='Payment Options at Stations',
-                color_discrete_sequence=['#2563eb', '#fbbf24', '#a855f7']
-            )
-            fig_payment.update_layout(
-                height=550,
-                title_font_size=16,
-                title_font_color='#ccc',
-                font=dict(size=12, color='#ccc'),
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            fig_payment.update_traces(textposition='inside', textinfo='percent+label', textfont=dict(color='white'))
-            st.plotly_chart(fig_payment, use_container_width=True)
+            def build_payment():
+                import plotly.express as px
+
+                fig_payment = px.pie(
+                    payment_df,
+                    values='Count',
+                    names='Payment_Type',
+                    title='Payment Options at Stations',
+                    color_discrete_sequence=['#2563eb', '#fbbf24', '#a855f7']
+                )
+                fig_payment.update_layout(
+                    height=550,
+                    title_font_size=16,
+                    title_font_color='#ccc',
+                    font=dict(size=12, color='#ccc'),
+                    paper_bgcolor='rgba(0,0,0,0)'
+                )
+                fig_payment.update_traces(textposition='inside', textinfo='percent+label', textfont=dict(color='white'))
+                return fig_payment
+
+            plotly_chart(cached_figure('VI/payment', build_payment), use_container_width=True)
 
     with col2:
         st.markdown("### Reservation Capability")
         
-        if 'reservation' in df.columns:
-            has_reservation = int(df['reservation'].astype(int).sum())
-            total_with_booking = len(df[df['reservation'].notna()])
+        if view['reservation']:
+            has_reservation = view['reservation']['has']
+            total_with_booking = view['reservation']['total']
             reservation_pct = (has_reservation / total_with_booking * 100) if total_with_booking > 0 else 0
             
             st.markdown(f"""
@@ -771,7 +1396,7 @@ elif current_section == "VI":
             st.markdown(f"""
             <div class="insight-box">
             <p>
-            Here's a problem that'll make any future EV driver anxious: <strong>only 23.0%</strong> of charging stations let you reserve ahead. 
+            Here's a problem that'll make any future EV driver anxious: <strong>only {facts['reservation_share']:.1f}%</strong> of charging stations let you reserve ahead. 
             You arrive, needing a charge, and… someone else is already there. Now you have to wait. Maybe 20 minutes, maybe an hour. Or you drive to the next 
             station, hoping it's free. Gas cars have gas stations on every corner. 
             </p>
@@ -796,42 +1421,59 @@ elif current_section == "VII":
     st.markdown(f"""
     <div class="insight-box">
     <p>
-    France has set an ambitious target: <strong>15 million electric vehicles on roads by 2030</strong>. Industry experts recommend 
-    maintaining at least 1 public charging point per 10 vehicles. This means France needs 1.5 million charge points 
-    by 2030. The question is: <strong>can we get there from where we are today ?</strong>
+    France has set an ambitious target: <strong>{TARGET_EVS / 1e6:g} million electric vehicles on roads by {TARGET_YEAR}</strong>. Industry experts recommend 
+    maintaining at least 1 public charging point per {EVS_PER_CHARGE_POINT} vehicles. This means France needs {TARGET_CHARGE_POINTS / 1e6:g} million charge points 
+    by {TARGET_YEAR}. The question is: <strong>can we get there from where we are today ?</strong>
     </p>
     </div>
     """, unsafe_allow_html=True)
 
-    total_stations = len(df)
-    total_charge_points = df['nbre_pdc'].sum() if 'nbre_pdc' in df.columns else 0
-    total_power = df['puissance_nominale'].sum() if 'puissance_nominale' in df.columns else 0
-    total_operators = df['nom_operateur'].nunique() if 'nom_operateur' in df.columns else 0
+    total_charge_points = aggs['totals']['charge_points']
+    trends = _growth_trends(data_version, aggs['yearly_installs'])
+    fitted = best_trend(trends)
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("### Scenario Analysis")
         
-        # Use actual current charge points
+        # Use actual current charge points, counted at the release date
         current_points = int(total_charge_points)
-        target_2030 = 1_500_000
-        years_remaining = 2030 - 2025
-        
+        current_year = release.date.year
+        target_2030 = TARGET_CHARGE_POINTS
+        years_remaining = TARGET_YEAR - current_year
+
+        if trends:
+            trend_model = st.radio(
+                "Trend model",
+                list(trends),
+                index=list(trends).index(fitted.model),
+                format_func=MODELS.get,
+                horizontal=True,
+                key="trend_model",
+                help="Fitted on the cumulative installations per year; the logistic model saturates. The best fit is selected by default.",
+            )
+            trend = trends[trend_model]
+            # The slider starts at the growth rate of the best fit, rounded to its step
+            default_rate = int(min(max(5 * round(fitted.annual_rate / 5), 10), 60))
+        else:
+            trend = None
+            default_rate = 30
+
         growth_rate = st.slider(
             "Annual growth rate (%)",
             min_value=10,
             max_value=60,
-            value=30,
+            value=default_rate,
             step=5,
-            help="Adjust the slider to see different growth scenarios. Historical growth has been around 25-40%."
+            help="Adjust the slider to see different growth scenarios. It starts at the growth rate of the best fitted trend."
         )
         
         projected_2030 = current_points * ((1 + growth_rate/100) ** years_remaining)
         gap = target_2030 - projected_2030
         gap_percent = (gap / target_2030 * 100)
         
-        st.metric("Current Charge Points (2025)", f"{current_points:,}")
+        st.metric(f"Current Charge Points ({current_year})", f"{current_points:,}")
         st.metric(f"Projected 2030 (at {growth_rate}% growth)", f"{int(projected_2030):,}")
         
         if gap > 0:
@@ -841,58 +1483,93 @@ elif current_section == "VII":
             st.metric("Surplus", f"{int(abs(gap)):,}", 
                     delta=f"{abs(gap_percent):.1f}% above target", delta_color="normal")
 
+        if trend is not None:
+            st.metric(
+                f"Trend 2030 ({MODELS[trend.model].lower()})",
+                f"{int(current_points * trend.factor[-1]):,}",
+                delta=f"90% band: {int(current_points * trend.low[-1]):,} to {int(current_points * trend.high[-1]):,}",
+                delta_color="off",
+            )
+
     with col2:
         st.markdown("### Projection Trajectory")
         
-        years = list(range(2025, 2031))
-        projected = [current_points * ((1 + growth_rate/100) ** (y - 2025)) for y in years]
-        
-        fig_projection = go.Figure()
+        years = np.arange(current_year, TARGET_YEAR + 1)
+        projected = current_points * (1 + growth_rate/100) ** (years - current_year)
         
-        fig_projection.add_trace(go.Scatter(
-            x=years,
-            y=projected,
-            mode='lines+markers',
-            name='Projected Growth',
-            line=dict(color='#667eea', width=4),
-            marker=dict(size=10)
-        ))
-        
-        fig_projection.add_hline(
-            y=target_2030,
-            line_dash="dash",
-            line_color="red",
-            line_width=3,
-            annotation_text="2030 Target: 1.5M",
-            annotation_position="right"
-        )
-        
-        fig_projection.update_layout(
-            title_text='<b style="color: #ccc;">Path to 2030: Can France Close the Gap ?</b>',
-            yaxis_title='<b style="color: #ccc;">Total Charge Points</b>',
-            xaxis_title='<b style="color: #ccc;">Year</b>',
-            hovermode='x unified',
-            height=550,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title_font_size=16,
-            font=dict(size=12, color='#ccc'),
-            xaxis=dict(tickfont=dict(color='#999')),
-            yaxis=dict(tickfont=dict(color='#999'))
-        )
-        
-        st.plotly_chart(fig_projection, use_container_width=True)
+        def build_projection():
+            fig_projection = go.Figure()
+
+            if trend is not None:
+                band_years = np.concatenate([trend.years, trend.years[::-1]])
+                band = current_points * np.concatenate([trend.high, trend.low[::-1]])
+                fig_projection.add_trace(go.Scatter(
+                    x=band_years,
+                    y=band,
+                    fill='toself',
+                    fillcolor='rgba(76, 175, 80, 0.15)',
+                    line=dict(width=0),
+                    hoverinfo='skip',
+                    name='Trend 90% band',
+                ))
+                fig_projection.add_trace(go.Scatter(
+                    x=trend.years,
+                    y=current_points * trend.factor,
+                    mode='lines',
+                    name=f'Fitted trend ({MODELS[trend.model].lower()})',
+                    line=dict(color='#4caf50', width=3, dash='dot'),
+                ))
+
+            fig_projection.add_trace(go.Scatter(
+                x=years,
+                y=projected,
+                mode='lines+markers',
+                name='Projected Growth',
+                line=dict(color='#667eea', width=4),
+                marker=dict(size=10)
+            ))
+
+            fig_projection.add_hline(
+                y=target_2030,
+                line_dash="dash",
+                line_color="red",
+                line_width=3,
+                annotation_text=f"{TARGET_YEAR} Target: {TARGET_CHARGE_POINTS / 1e6:g}M",
+                annotation_position="right"
+            )
+
+            fig_projection.update_layout(
+                title_text='<b style="color: #ccc;">Path to 2030: Can France Close the Gap ?</b>',
+                yaxis_title='<b style="color: #ccc;">Total Charge Points</b>',
+                xaxis_title='<b style="color: #ccc;">Year</b>',
+                hovermode='x unified',
+                height=550,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16,
+                font=dict(size=12, color='#ccc'),
+                xaxis=dict(tickfont=dict(color='#999')),
+                yaxis=dict(tickfont=dict(color='#999'))
+            )
+            return fig_projection
+
+        plotly_chart(cached_figure('VII/projection', build_projection, growth_rate, trend and trend.model), use_container_width=True)
 
+    trend_sentence = (
+        f"Extending the {MODELS[trend.model].lower()} trend fitted on the yearly installations instead gives "
+        f"{int(current_points * trend.factor[-1]):,} charge points by 2030, an average of {trend.annual_rate:.0f}% a year."
+        if trend is not None else ""
+    )
     st.markdown(f"""
     <div class="insight-box">
     <h3>The Result</h3>
     <p>
-    At {growth_rate}% annual growth, France reaches {int(projected_2030):,} charge points by 2030.
+    At {growth_rate}% annual growth, France reaches {int(projected_2030):,} charge points by 2030. {trend_sentence}
     </p>
     <p>
-    That actually exceeds the target by {int(abs(gap)):,} charge points. At this growth rate, France would 
-    be well-positioned to support 15 million EVs by 2030. <strong>But there's a catch: maintaining {growth_rate}% growth 
-    for five straight years requires everything to go right</strong>.
+    {"That actually exceeds" if gap <= 0 else "That still falls short of"} the target by {int(abs(gap)):,} charge points. At this growth rate, France would 
+    {"be well-positioned" if gap <= 0 else "not be ready"} to support {TARGET_EVS / 1e6:g} million EVs by {TARGET_YEAR}. <strong>But there's a catch: maintaining {growth_rate}% growth 
+    for {years_remaining} straight years requires everything to go right</strong>.
     </p>
     <p>
     No supply chain disruptions. No economic downturns that freeze investment. No regulatory 
@@ -907,6 +1584,67 @@ elif current_section == "VII":
     
     st.markdown("</div>", unsafe_allow_html=True)
 
+    st.markdown("### Coverage: How Far Is the Nearest Charger ?")
+    if dataset is None:
+        st.info("Coverage queries need the full dataset and are not available in streaming mode.")
+    else:
+        chargers = _charger_index(dataset.version, data["stations"])
+        communes = _commune_points(dataset.version, data["stations"])
+        charger_types = {
+            'Any charger': 0,
+            f'DC fast charger (≥{DC_FAST_KW}kW)': DC_FAST_KW,
+            'Ultra-fast charger (≥150kW)': 150,
+        }
+        if not COMMUNES_FILE:
+            # Every commune of the dataset has a charger: "any charger" would
+            # always be 0% away
+            del charger_types['Any charger']
+
+    if dataset is not None and communes.empty:
+        st.info("No geolocated commune to measure the coverage from.")
+    elif dataset is not None:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            radius_km = st.slider("Radius (km)", min_value=5, max_value=100, value=20, step=5)
+            charger_type = st.selectbox("Charger type", list(charger_types))
+            uncovered = chargers.uncovered_share(
+                communes['longitude'], communes['latitude'], radius_km, charger_types[charger_type]
+            )
+
+            st.markdown(f"""
+            <div class="metric-card">
+                <div class="metric-value">{uncovered * 100:.1f}%</div>
+                <div class="metric-label">Communes with no {charger_type.split(' (')[0].lower()} within {radius_km} km</div>
+            </div>
+            """, unsafe_allow_html=True)
+            if COMMUNES_FILE:
+                st.caption(f"Measured over {len(communes):,} communes.")
+            else:
+                st.caption(
+                    f"Measured over the {len(communes):,} communes that have at least one charger. "
+                    "Set IRVE_COMMUNES_FILE to measure every commune, including those without any charger."
+                )
+
+        with col2:
+            st.markdown(f"#### Nearest DC Fast Chargers (≥{DC_FAST_KW}kW)")
+            commune_code = st.selectbox(
+                "Commune",
+                communes.index,
+                format_func=lambda code: f"{communes.at[code, 'nom']} ({code})"
+            )
+            nearest = chargers.nearest(
+                communes.at[commune_code, 'longitude'], communes.at[commune_code, 'latitude'], k=5
+            )
+            st.dataframe(
+                nearest[['nom_operateur', 'commune', 'puissance_max', 'nbre_pdc', 'distance_km']].rename(columns={
+                    'nom_operateur': 'Operator', 'commune': 'Commune', 'puissance_max': 'Max Power (kW)',
+                    'nbre_pdc': 'Charge Points', 'distance_km': 'Distance (km)',
+                }).round({'Distance (km)': 1}),
+                hide_index=True,
+                use_container_width=True
+            )
+
 # ============================================================================
 # VIII / Conclusion
 # ============================================================================
@@ -919,13 +1657,13 @@ elif current_section == "VIII":
     <h3>Connecting the Dots</h3>
 
     <p>
-    By going through France's EV charging infrastructure, the numbers tell a story. 176,286 stations, 2,345,294 charge points, exponential growth since 2020. On paper ? Impressive. 
+    By going through France's EV charging infrastructure, the numbers tell a story. {facts['stations']:,} stations, {facts['charge_points']:,} charge points, exponential growth since 2020. On paper ? Impressive. 
     In reality ? It's more complicated.
     </p>
 
     <p>The Good News: <strong>the Momentum is Real !</strong></p>
     <p>
-    France isn't sitting still. The acceleration from 2020-2025 proves it. Exponential growth, not linear. 321 operators competing means innovation is happening. 
+    France isn't sitting still. The acceleration from 2020-{release.date.year} proves it. Exponential growth, not linear. {facts['operators']:,} operators competing means innovation is happening. 
     The infrastructure foundation is solid. Not perfect, not complete, but <strong>real</strong>.
     </p>
 
@@ -935,11 +1673,11 @@ elif current_section == "VIII":
     </p>
 
     <ul>
-    <li><strong>Scale</strong> is a nightmare. We need 10x what we have in 6 years. That's not ambitious, it's more like madness. </li>
+    <li><strong>Scale</strong> is a nightmare. We need {facts['target_ratio']:.0f}x what we have in {TARGET_YEAR - release.date.year} years. That's not ambitious, it's more like madness. </li>
     <li>The urban-rural <strong>split</strong> is getting worse, not better. Cities like Paris are swimming in chargers. But small towns ? Forgotten. This builds resentment. 
         It builds inequality. It's unsustainable politically.</li>
-    <li>Road trips are still a <strong>gamble.</strong> 27.9% fast chargers means highway EV travel remains uncertain. Families hesitate.</li>
-    <li>Every station requires a <strong>different app.</strong> 23.0% let you reserve. Different payment systems. Different pricing. It's a mess. 
+    <li>Road trips are still a <strong>gamble.</strong> {facts['fast_share']:.1f}% fast chargers means highway EV travel remains uncertain. Families hesitate.</li>
+    <li>Every station requires a <strong>different app.</strong> {facts['reservation_share']:.1f}% let you reserve. Different payment systems. Different pricing. It's a mess. 
         And a mess means friction, which in turn means dead adoption.</li>
     <li><strong>One supply chain hiccup, and everything falls apart.</strong> There's no buffer. We're running at max capacity to hit targets. Any disruption cascades.</li>
     </ul>
@@ -981,16 +1719,107 @@ elif current_section == "VIII":
     st.markdown("---")
     st.markdown("## Raw Data")
 
-    with st.expander("View Data Sample (First 100 Records)"):
-        st.dataframe(df.head(100), use_container_width=True, height=400)
-        st.markdown(f"**Total records in dataset:** {len(df):,}")
+    frame = data["frame"]
+    if frame is None:
+        # Streaming mode: only the head of the table can be shown
+        with st.expander("View Data Sample (First 100 Records)"):
+            st.dataframe(unpack_flags(section_data("sample")), use_container_width=True, height=400)
+            st.markdown(f"**Total records in dataset:** {aggs['totals']['pdc_rows']:,}")
+    else:
+        with st.expander("Explore the Raw Data", expanded=True):
+            operator_options, max_power = _explorer_options(dataset.version, frame)
+            col1, col2 = st.columns(2)
+            with col1:
+                operators = st.multiselect("Operator", operator_options, key="explorer_operators")
+                commune = st.text_input("Commune contains", key="explorer_commune")
+                plugs = st.multiselect(
+                    "Connector (any of)", list(PLUG_TYPES), key="explorer_plugs",
+                )
+            with col2:
+                power = st.slider(
+                    "Power (kW)", 0.0, max_power, (0.0, max_power), step=1.0, key="explorer_power",
+                )
+                sort_col1, sort_col2 = st.columns([3, 1])
+                with sort_col1:
+                    sort = st.selectbox(
+                        "Sort by", [None] + [col for col in frame.columns if col not in FLAG_COLUMNS],
+                        format_func=lambda col: "File order" if col is None else col,
+                        key="explorer_sort",
+                    )
+                with sort_col2:
+                    descending = st.toggle("Descending", key="explorer_descending")
+                page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key="explorer_page_size")
+
+            query = RowQuery(
+                operators=tuple(operators),
+                commune=commune.strip(),
+                power=None if tuple(power) == (0.0, max_power) else tuple(power),
+                plugs=tuple(PLUG_TYPES[label] for label in plugs),
+                sort=sort,
+                descending=descending,
+            )
+            positions = _explorer_rows(dataset.version, query, frame)
+            pages = max(1, -(-len(positions) // page_size))
+            # A narrower query can leave the page number past the last page
+            if st.session_state.get("explorer_page", 1) > pages:
+                st.session_state.explorer_page = 1
+            page = st.number_input(f"Page (of {pages:,})", 1, pages, key="explorer_page")
+            st.dataframe(
+                page_rows(frame, positions, page - 1, page_size),
+                use_container_width=True, height=400, hide_index=True,
+            )
+            st.markdown(f"**Matching records:** {len(positions):,} of {len(frame):,} charge points")
+
+            def export(writer):
+                # Deferred: only runs when the download is clicked
+                def build():
+                    sink = io.BytesIO()
+                    writer(frame, positions, sink)
+                    return sink.getvalue()
+                return build
+
+            # The file is built in memory: a whole-country export could exhaust it
+            too_large = len(positions) > EXPORT_MAX_ROWS
+            for column, (kind, (writer, mime)) in zip(st.columns(len(EXPORTS)), EXPORTS.items()):
+                with column:
+                    st.download_button(
+                        f"Export {len(positions):,} rows as {kind.upper()}", export(writer),
+                        file_name=f"{release.path.stem}-selection.{kind}", mime=mime,
+                        on_click="ignore", key=f"explorer_export_{kind}", disabled=too_large,
+                    )
+            if too_large:
+                st.warning(
+                    f"Exports are limited to {EXPORT_MAX_ROWS:,} rows: "
+                    f"narrow the filters to export this selection."
+                )
+
+    quality = data["quality"]
+    if quality is not None:
+        with st.expander("Data Quality Report"):
+            st.markdown(
+                f"Implausible values are corrected before any figure is computed: "
+                f"{quality['rows']:,} charge point rows read, {quality['kept']:,} kept."
+            )
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Rule': rule['description'],
+                        'Action': rule['action'],
+                        'Rows': rule['rows'],
+                        'Examples': '; '.join(rule['examples']),
+                    }
+                    for rule in quality['rules']
+                ]),
+                use_container_width=True,
+                hide_index=True,
+            )
 
     st.markdown("---")
-    st.markdown("""
+    st.markdown(f"""
     **Data Source:** Consolidation ETALAB - Base Nationale des IRVE  
     **Coverage:** France (metropolitan and overseas), all public charging stations  
-    **Last Updated:** October 24, 2025  
-    **Format:** CSV (consolidation-etalab-schema-irve-statique-v-2.3.1-20251024.csv)   
+    **Last Updated:** {release.date:%B %d, %Y}  
+    **Format:** CSV ({release.path.name})   
     **Link:** https://www.data.gouv.fr/datasets/base-nationale-des-irve-infrastructures-de-recharge-pour-vehicules-electriques/#/resources/eb76d20a-8501-400e-b336-d85724de5435
 
     **Key Variables:**
@@ -1003,6 +1832,26 @@ elif current_section == "VIII":
     - `prise_type_*`: Available connector types
     """, unsafe_allow_html=True)
 
+instrument.end(section_span)
+
 st.markdown("""---""")
 st.markdown("""Data Analysis & Visualization | AININE Nassim | 20220610
 """)
+
+# ============================================================================
+# DEBUG PANEL (profiling only)
+# ============================================================================
+if profile is not None:
+    instrument.stop()
+    with st.sidebar.expander("Debug: timings", expanded=False):
+        st.caption(
+            f"Run {profile.context['run']} of session {profile.context['session']}: "
+            f"{profile.seconds:.3f} s, peak RSS {instrument.peak_rss_mb():,.0f} MB"
+        )
+        spans = pd.DataFrame(profile.records(), columns=['name', 'depth', 'seconds', 'peak_rss_delta_mb', 'cache'])
+        spans['name'] = spans['depth'].map(lambda depth: '\u2003' * depth) + spans['name']
+        st.dataframe(
+            spans.drop(columns='depth').rename(columns={'peak_rss_delta_mb': 'peak RSS Δ (MB)'}),
+            hide_index=True,
+            use_container_width=True,
+        )
@@ -0,0 +1,17 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import release_name, write_csv
+
+
+@pytest.fixture
+def release(tmp_path):
+    """A small synthetic release in tmp_path, with its cache directory"""
+    path = write_csv(tmp_path / release_name(), 3000)
+    return path, tmp_path / 'cache'
+
+
+def rewrite(path, edit):
+    """Replace the content of a release file in place with edit(rows)"""
+    rows = pd.read_csv(path, dtype=str, keep_default_na=False)
+    edit(rows).to_csv(path, index=False)
@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+
+from irve.aggregates import POWER_LABELS, load_aggregates, sidecar_path
+from irve.dataset import open_dataset
+
+
+def test_totals_add_up_the_prepared_rows(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    aggregates = load_aggregates(dataset, cache_dir)
+    frame, stations = dataset.frame, dataset.stations
+
+    totals = aggregates['totals']
+    assert totals['pdc_rows'] == len(frame)
+    assert totals['stations'] == len(stations)
+    assert totals['charge_points'] == stations['nbre_pdc'].sum()
+    assert np.isclose(totals['power_kw'], frame['puissance_nominale'].astype(np.float64).sum())
+    assert [tier['Charging_Speed'] for tier in aggregates['power_tiers']] == POWER_LABELS
+    assert sum(tier['Count'] for tier in aggregates['power_tiers']) == frame['puissance_nominale'].notna().sum()
+    assert sum(area['Stations'] for area in aggregates['regions']) == len(stations)
+
+
+def test_sidecar_is_read_without_loading_the_frame(release):
+    path, cache_dir = release
+    computed = load_aggregates(open_dataset(path, cache_dir), cache_dir)
+    dataset = open_dataset(path, cache_dir)
+    assert load_aggregates(dataset, cache_dir) == computed
+    assert not dataset.loaded('frame')
+
+
+def test_sidecar_of_another_format_is_recomputed(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    computed = load_aggregates(dataset, cache_dir)
+    sidecar = sidecar_path(path, dataset.version, cache_dir)
+    stored = json.loads(sidecar.read_text())
+    sidecar.write_text(json.dumps({**stored, 'format': stored['format'] - 1, 'aggregates': {}}))
+
+    assert load_aggregates(open_dataset(path, cache_dir), cache_dir) == computed
+    assert json.loads(sidecar.read_text())['format'] == stored['format']
@@ -0,0 +1,169 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.elements.lib import policies
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import release_name, write_csv
+from irve import explorer, instrument, warmup
+from irve.cache import CACHE_DIR
+from irve.history import History, sync_history
+
+from .conftest import rewrite
+
+APP = Path(__file__).resolve().parents[1] / 'streamlit_app.py'
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Empty data directory served by the app, which also holds the default cache directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('IRVE_DATA_DIR', str(tmp_path))
+    monkeypatch.delenv('IRVE_STREAMING', raising=False)
+    # The served dataset and the figures are process-wide resources
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    yield tmp_path
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    """Spans of the profiled app runs, as logged"""
+    logged = []
+    monkeypatch.setenv('IRVE_PROFILE', '1')
+    monkeypatch.setattr(instrument.logger, 'info', lambda message: logged.append(json.loads(message)))
+    return logged
+
+
+def run_section(app, section):
+    app.session_state.current_section = section
+    app.run()
+    assert not app.exception, [e.value for e in app.exception]
+    return app
+
+
+def test_release_dropped_in_is_added_to_the_history(data_dir):
+    first = write_csv(data_dir / release_name('20250915'), 2000)
+    # The warm-up records the release served at start
+    sync_history(data_dir, CACHE_DIR)
+    app = AppTest.from_file(str(APP), default_timeout=120)
+    app.run()
+    run_section(app, 'II')
+    assert '### Network Size Across Releases' not in [md.value for md in app.markdown]
+
+    second = write_csv(data_dir / release_name('20251015'), 2000)
+    rewrite(second, lambda rows: rows.iloc[300:])
+    run_section(app, 'II')
+
+    history = History(CACHE_DIR)
+    assert history.names() == [first.name, second.name]
+    assert history.releases[-1]['totals']['stations'] < history.releases[0]['totals']['stations']
+    assert '### Network Size Across Releases' in [md.value for md in app.markdown]
+
+
+def test_filters_keep_their_state_across_sections(data_dir, monkeypatch):
+    # Streamlit logs a widget with a default also set through the Session
+    # State API once per process, on a logger that does not propagate
+    warnings = []
+    monkeypatch.setattr(policies, '_shown_default_value_warning', False)
+    monkeypatch.setattr(policies._LOGGER, 'warning', lambda message, *args, **kwargs: warnings.append(message % args))
+
+    write_csv(data_dir / release_name(), 2000)
+    app = AppTest.from_file(str(APP), default_timeout=120)
+    app.run()
+    run_section(app, 'II')
+    app.slider(key='filter_years').set_range(2015, 2020).run()
+    run_section(app, 'VIII')
+    run_section(app, 'III')
+    assert app.slider(key='filter_years').value == (2015, 2020)
+    assert warnings == []
+
+
+def test_coverage_offers_any_charger_only_over_every_commune(data_dir, monkeypatch):
+    write_csv(data_dir / release_name(), 2000)
+    app = run_section(AppTest.from_file(str(APP), default_timeout=120), 'VII')
+    assert 'Any charger' not in app.selectbox[0].options
+
+    communes = data_dir / 'communes.csv'
+    communes.write_text('code_insee,nom,longitude,latitude\n01001,Somewhere,4.9,46.2\n')
+    monkeypatch.setenv('IRVE_COMMUNES_FILE', str(communes))
+    st.cache_data.clear()
+    app = run_section(AppTest.from_file(str(APP), default_timeout=120), 'VII')
+    assert 'Any charger' in app.selectbox[0].options
+
+
+def test_coverage_without_communes(data_dir, monkeypatch):
+    write_csv(data_dir / release_name(), 2000)
+    communes = data_dir / 'communes.csv'
+    communes.write_text('code_insee,nom,longitude,latitude\n')
+    monkeypatch.setenv('IRVE_COMMUNES_FILE', str(communes))
+    app = run_section(AppTest.from_file(str(APP), default_timeout=120), 'VII')
+    assert [info.value for info in app.info] == ["No geolocated commune to measure the coverage from."]
+    assert not app.selectbox
+
+
+def test_streaming_sample_counts_every_record(data_dir, monkeypatch):
+    monkeypatch.setenv('IRVE_STREAMING', '1')
+    path = write_csv(data_dir / release_name(), 2000)
+    records = pd.read_csv(path, usecols=['id_pdc_itinerance'])['id_pdc_itinerance'].nunique()
+    app = run_section(AppTest.from_file(str(APP), default_timeout=120), 'VIII')
+    assert f"**Total records in dataset:** {records:,}" in [md.value for md in app.markdown]
+
+
+def test_figures_are_built_once_per_data_and_filters(data_dir, spans):
+    def figures():
+        built = {span['name']: span['cache'] for span in spans if span.get('name', '').startswith('figure ')}
+        spans.clear()
+        return built
+
+    write_csv(data_dir / release_name(), 2000)
+    first = run_section(AppTest.from_file(str(APP), default_timeout=120), 'IV')
+    built = figures()
+    assert built and set(built.values()) == {'miss'}
+    # Another session showing the same data is served the same figures
+    second = run_section(AppTest.from_file(str(APP), default_timeout=120), 'IV')
+    assert figures() == dict.fromkeys(built, 'hit')
+    assert [chart.proto.spec for chart in second.get('plotly_chart')] == \
+        [chart.proto.spec for chart in first.get('plotly_chart')]
+
+    power = second.multiselect(key='filter_power')
+    power.select(power.options[0]).run()
+    assert figures()['figure IV/power_bar'] == 'miss'
+
+
+@pytest.mark.parametrize('section, loaded', [
+    ('I', set()),
+    ('III', {'load_stations'}),
+    ('VII', {'load_stations'}),
+    ('VIII', {'load_prepared'}),
+])
+def test_sections_only_load_the_parts_they_read(data_dir, spans, section, loaded):
+    write_csv(data_dir / release_name(), 2000)
+    # The replica starts once the warm-up has written every sidecar
+    assert warmup.main(['--data-dir', str(data_dir)]) == 0
+    run_section(AppTest.from_file(str(APP), default_timeout=120), section)
+    parts = {span.get('name') for span in spans} & {'load_prepared', 'load_stations'}
+    assert parts == loaded
+
+
+def test_selection_above_the_export_limit_is_not_exported(data_dir, monkeypatch):
+    write_csv(data_dir / release_name(), 2000)
+    app = run_section(AppTest.from_file(str(APP), default_timeout=120), 'VIII')
+    assert len(app.get('download_button')) == 2
+    assert not any(button.proto.disabled for button in app.get('download_button'))
+    assert not app.warning
+
+    monkeypatch.setattr(explorer, 'EXPORT_MAX_ROWS', 1000)
+    app.run()
+    assert all(button.proto.disabled for button in app.get('download_button'))
+    assert [warning.value for warning in app.warning] == [
+        "Exports are limited to 1,000 rows: narrow the filters to export this selection."
+    ]
+    # A narrower selection can be exported again
+    app.text_input(key='explorer_commune').input('Commune 01').run()
+    assert not any(button.proto.disabled for button in app.get('download_button'))
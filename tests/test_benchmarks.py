@@ -0,0 +1,37 @@
+from benchmarks import synthetic
+from benchmarks.run import Timer, bench_pipeline, compare
+
+
+def run(**steps):
+    return {'runs': {'1000': {step: {'seconds': seconds} for step, seconds in steps.items()}}}
+
+
+def test_slower_steps_are_reported():
+    baseline = run(parse=1.0, prepare=0.5, cells=0.001)
+    results = run(parse=1.1, prepare=0.8, cells=0.01, cube=2.0)
+    assert compare(results, baseline) == [
+        {'rows': '1000', 'step': 'prepare', 'before': 0.5, 'after': 0.8, 'ratio': 1.6},
+    ]
+
+
+def test_synthetic_release_is_reproducible(tmp_path, monkeypatch):
+    whole = synthetic.write_csv(tmp_path / 'whole.csv', 1000)
+    assert synthetic.write_csv(tmp_path / 'again.csv', 1000).read_bytes() == whole.read_bytes()
+    monkeypatch.setattr(synthetic, 'CHUNK_ROWS', 300)
+    chunked = synthetic.write_csv(tmp_path / 'chunked.csv', 1000)
+    whole_rows, chunked_rows = whole.read_text().splitlines(), chunked.read_text().splitlines()
+    assert len(whole_rows) == 1001
+    # The random draws differ per chunk, the station attributes do not
+    stations = [line.split(',')[2] for line in whole_rows]
+    assert stations == [line.split(',')[2] for line in chunked_rows]
+
+
+def test_every_pipeline_stage_is_timed(release, capsys):
+    path, cache_dir = release
+    timer = Timer()
+    bench_pipeline(timer, path, cache_dir)
+    assert list(timer.steps) == [
+        'csv_to_parquet', 'parquet_load', 'prepare', 'stations', 'aggregates', 'stream_aggregates',
+        'grid_index', 'grid_cells', 'coverage', 'cube', 'cube_slice',
+    ]
+    assert all(step['seconds'] >= 0 and step['peak_rss_mb'] > 0 for step in timer.steps.values())
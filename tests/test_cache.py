@@ -0,0 +1,62 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from irve import cache
+from irve.cache import load_table, sample_rows
+
+from .conftest import rewrite
+
+
+@pytest.fixture
+def no_csv_reads(monkeypatch):
+    """Fail any load that parses the CSV instead of reading the Parquet cache"""
+    def read_irve_csv(source, **kwargs):
+        raise AssertionError(f"{source} was parsed again")
+    monkeypatch.setattr(cache, 'read_irve_csv', read_irve_csv)
+
+
+def manifest(path, cache_dir):
+    return json.loads((cache_dir / f'{path.stem}.json').read_text())
+
+
+def test_second_load_reads_the_parquet_cache(release, request):
+    path, cache_dir = release
+    built = load_table(path, cache_dir)
+    request.getfixturevalue('no_csv_reads')
+    pd.testing.assert_frame_equal(load_table(path, cache_dir), built)
+
+
+def test_touched_source_keeps_its_cache(release, request):
+    path, cache_dir = release
+    load_table(path, cache_dir)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    request.getfixturevalue('no_csv_reads')
+    load_table(path, cache_dir)
+    assert manifest(path, cache_dir)['mtime_ns'] == stat.st_mtime_ns + 10**9
+
+
+def test_changed_source_replaces_its_cache(release):
+    path, cache_dir = release
+    load_table(path, cache_dir)
+    before = manifest(path, cache_dir)['parquet']
+    rewrite(path, lambda rows: rows.iloc[:1000])
+
+    assert len(load_table(path, cache_dir)) == 1000
+    after = manifest(path, cache_dir)['parquet']
+    assert after != before
+    assert sorted(p.name for p in cache_dir.glob('*.parquet')) == [after]
+
+
+def test_sample_rows_match_the_head_of_the_table(release):
+    path, cache_dir = release
+    # Parsed from the CSV, then decoded from the first Parquet batch
+    from_csv = sample_rows(path, 100, cache_dir)
+    table = load_table(path, cache_dir)
+    from_parquet = sample_rows(path, 100, cache_dir)
+    # The CSV head only knows the categories of its own rows
+    pd.testing.assert_frame_equal(from_csv, table.head(100), check_categorical=False)
+    pd.testing.assert_frame_equal(from_parquet, table.head(100))
@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irve.corridors import corridor_gaps, read_roads
+
+
+def write_roads(path, features):
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'ref': ref},
+         'geometry': {'type': 'LineString', 'coordinates': coordinates}}
+        for ref, coordinates in features
+    ]}))
+    return path
+
+
+def straight_road(n_features, lat=46.0, lon0=2.0, lon1=4.6, shuffle=False):
+    """A road along a parallel split into n_features ways, every other one drawn backwards"""
+    lons = np.linspace(lon0, lon1, n_features + 1)
+    ways = [[[lons[i], lat], [(lons[i] + lons[i + 1]) / 2, lat], [lons[i + 1], lat]] for i in range(n_features)]
+    ways = [way[::-1] if i % 2 else way for i, way in enumerate(ways)]
+    if shuffle:
+        ways = [ways[i] for i in np.random.default_rng(0).permutation(n_features)]
+    return ways
+
+
+def stations(lons, lat=46.0, power=150.0):
+    return pd.DataFrame({
+        'longitude': np.asarray(lons, dtype=np.float64),
+        'latitude': lat,
+        'puissance_max': power,
+    })
+
+
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_ways_of_a_corridor_are_chained(tmp_path, shuffle):
+    single = read_roads(write_roads(tmp_path / 'single.geojson', [('A1', straight_road(1)[0])]))
+    split = read_roads(write_roads(
+        tmp_path / 'split.geojson', [('A1', way) for way in straight_road(50, shuffle=shuffle)],
+    ))
+    assert split['line'].nunique() == 1
+    length = single['length_km'].sum()
+    assert split['length_km'].sum() == pytest.approx(length)
+    assert length == pytest.approx(200, abs=2)
+
+    gaps = corridor_gaps(split, stations([]))
+    assert gaps.loc[0, 'max_gap_km'] == pytest.approx(length)
+
+
+def test_gap_is_measured_across_ways(tmp_path):
+    segments = read_roads(write_roads(tmp_path / 'roads.geojson', [('A1', way) for way in straight_road(50)]))
+    # Chargers at both ends and one a fifth of the way, the slow one does not count
+    gaps = corridor_gaps(segments, pd.concat([
+        stations([2.0, 2.52, 4.6]), stations([3.5], power=22.0),
+    ]))
+    row = gaps.iloc[0]
+    assert row['chargers'] == 3
+    assert row['max_gap_km'] == pytest.approx(0.8 * row['length_km'], rel=0.01)
+    assert sorted([row['gap_start_lon'], row['gap_end_lon']]) == pytest.approx([2.52, 4.6], abs=0.01)
+
+
+def test_corridors_are_not_joined_to_each_other(tmp_path):
+    ways = straight_road(2)
+    segments = read_roads(write_roads(tmp_path / 'roads.geojson', [('A1', ways[0]), ('A2', ways[1])]))
+    assert segments.groupby('corridor')['line'].nunique().to_dict() == {'A1': 1, 'A2': 1}
+    assert set(corridor_gaps(segments, stations([]))['corridor']) == {'A1', 'A2'}
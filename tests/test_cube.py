@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from irve.aggregates import compute_aggregates, load_aggregates
+from irve.cube import build_cube, load_cube
+from irve.dataset import open_dataset
+from irve.stations import build_stations
+
+
+@pytest.fixture
+def served(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    return dataset, load_aggregates(dataset, cache_dir), load_cube(dataset, cache_dir)
+
+
+def assert_same_aggregates(actual, expected):
+    """Equal aggregates, the power sums compared up to their float rounding"""
+    assert actual.keys() == expected.keys()
+    for key in expected:
+        if key in ('regions', 'departments'):
+            assert [{**row, 'Power_kW': None} for row in actual[key]] == \
+                [{**row, 'Power_kW': None} for row in expected[key]]
+            assert np.allclose([row['Power_kW'] for row in actual[key]],
+                               [row['Power_kW'] for row in expected[key]], rtol=1e-12)
+        elif key == 'totals':
+            assert {**actual[key], 'power_kw': None} == {**expected[key], 'power_kw': None}
+            assert np.isclose(actual[key]['power_kw'], expected[key]['power_kw'], rtol=1e-12)
+        else:
+            assert actual[key] == expected[key], key
+
+
+def test_unfiltered_cube_rolls_up_to_the_national_aggregates(served):
+    _, aggregates, cube = served
+    assert_same_aggregates(cube.aggregates(), aggregates)
+
+
+def test_slice_matches_the_aggregates_of_its_stations(served):
+    dataset, _, cube = served
+    frame, stations = dataset.frame, dataset.stations
+    region = cube.aggregates()['regions'][0]['Region']
+    operator = cube.slice(regions=[region]).values('operator')[0]
+
+    selected = (stations['nom_operateur'] == operator).to_numpy() & (stations['region'] == region).to_numpy()
+    keys = set(stations.index[selected].astype(str))
+    rows = frame[frame['id_station_itinerance'].astype(str).isin(keys).to_numpy()]
+    expected = compute_aggregates(rows, build_stations(rows))
+
+    sliced = cube.slice(regions=[region], operators=[operator])
+    assert sliced.aggregates()['totals']['stations'] == selected.sum() > 0
+    assert_same_aggregates(sliced.aggregates(), expected)
+
+
+def test_year_slice_drops_undated_stations(served):
+    dataset, _, cube = served
+    years = dataset.stations['year_installed']
+    sliced = cube.slice(years=(2015, 2018)).aggregates()
+    assert sliced['totals']['stations'] == int(((years >= 2015) & (years <= 2018)).sum())
+    assert [row['Year'] for row in sliced['yearly_installs']] == [2015, 2016, 2017, 2018]
+
+
+def test_rebuilt_cube_matches_its_sidecar(served):
+    dataset, _, cube = served
+    rebuilt = build_cube(dataset.frame, dataset.stations)
+    assert_same_aggregates(rebuilt.aggregates(), cube.aggregates())
+
+
+def test_rollup_counts_the_stations_of_each_value(served):
+    dataset, _, cube = served
+    stations = dataset.stations
+    by_operator = cube.rollup('operator')['stations']
+    expected = stations['nom_operateur'].astype(str).value_counts()
+    assert by_operator.rename(index=str).sort_index().to_dict() == expected.sort_index().to_dict()
+
+    # Undated stations have no year to be rolled up on
+    by_region_and_year = cube.rollup('region', 'year')['stations']
+    dated = stations[stations['year_installed'].notna()]
+    expected = dated.groupby(['region', 'year_installed'], observed=True).size()
+    assert {(str(region), int(year)): n for (region, year), n in by_region_and_year.items()} == \
+        {(str(region), int(year)): n for (region, year), n in expected.items()}
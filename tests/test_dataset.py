@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from irve.cache import file_sha256, load_table
+from irve.dataset import (
+    SourceChanged,
+    open_dataset,
+    prepare,
+    prepared_path,
+    read_prepared,
+)
+
+from .conftest import rewrite
+
+
+def test_dataset_is_keyed_on_the_content_of_its_source(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    assert dataset.version == file_sha256(path)
+    assert not dataset.loaded('frame') and not dataset.loaded('stations')
+
+    rewrite(path, lambda rows: rows.iloc[:-10])
+    assert open_dataset(path, cache_dir).version != dataset.version
+
+
+def test_frame_of_a_replaced_source_is_not_built(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    rewrite(path, lambda rows: rows.iloc[:-10])
+    with pytest.raises(SourceChanged):
+        dataset.load('frame')
+
+
+def test_prepared_frame_adds_the_analysis_columns(release):
+    path, cache_dir = release
+    frame = open_dataset(path, cache_dir).frame
+    assert len(frame) == len(prepare(load_table(path, cache_dir)))
+    dated = frame['date_mise_en_service'].notna()
+    assert (frame.loc[dated, 'year_installed'] == frame.loc[dated, 'date_mise_en_service'].dt.year).all()
+    assert frame.loc[~dated, 'year_installed'].isna().all()
+    assert frame['commune'].equals(frame['consolidated_commune'].rename('commune'))
+
+
+def test_prepared_frame_reads_back_from_its_mapped_file(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    mapped = dataset.frame
+    built = prepare(load_table(path, cache_dir))
+    # Missing dates are stored as NaT values rather than Arrow nulls
+    assert built['date_mise_en_service'].isna().any()
+    pd.testing.assert_frame_equal(mapped, built.reset_index(drop=True))
+
+
+def test_numeric_columns_are_views_on_the_mapping(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    dataset.load('frame')
+    frame = read_prepared(prepared_path(path, dataset.version, cache_dir))
+    for col in ('puissance_nominale', 'consolidated_longitude', 'date_mise_en_service', 'flag_bits'):
+        values = frame[col].to_numpy()
+        # Read-only: the pages are shared with the other processes mapping the file
+        assert not values.flags.writeable, col
+        assert not values.flags.owndata, col
+
+
+def test_new_version_replaces_the_prepared_file(release):
+    path, cache_dir = release
+    old = open_dataset(path, cache_dir)
+    old.load('frame')
+    rewrite(path, lambda rows: rows.iloc[:-10])
+    new = open_dataset(path, cache_dir)
+    assert len(new.frame) < len(old.frame)
+    assert [p.name for p in cache_dir.glob('*.arrow')] == [prepared_path(path, new.version, cache_dir).name]
+    # The old frame stays readable through its mapping
+    assert np.isfinite(old.frame['puissance_nominale'].to_numpy()).any()
@@ -0,0 +1,87 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from irve.dataset import open_dataset
+from irve.explorer import (
+    RowQuery,
+    page_rows,
+    query_rows,
+    take_rows,
+    write_csv,
+    write_parquet,
+)
+
+from .conftest import rewrite
+
+
+@pytest.fixture(scope='module')
+def frame(tmp_path_factory):
+    # Read-only, so shared by the tests of the module
+    data_dir = tmp_path_factory.mktemp('explorer')
+    path = synthetic.write_csv(data_dir / synthetic.release_name(), 3000)
+    rewrite(path, without_some_values)
+    return open_dataset(path, data_dir / 'cache').frame
+
+
+def without_some_values(rows):
+    rows.loc[rows.index[::50], 'puissance_nominale'] = ''
+    rows.loc[rows.index[7::60], 'nom_operateur'] = ''
+    return rows
+
+
+def test_filters_match_pandas(frame):
+    operators = frame['nom_operateur'].cat.categories[:40].tolist()
+    query = RowQuery(
+        operators=tuple(operators), commune='commune 0', power=(22, 150), plugs=('prise_type_chademo', 'gratuit'),
+    )
+    rows = take_rows(frame, np.arange(len(frame)))
+    expected = (
+        rows['nom_operateur'].isin(operators)
+        & rows['commune'].str.lower().str.contains('commune 0', regex=False)
+        & rows['puissance_nominale'].between(22, 150)
+        & (rows['prise_type_chademo'] | rows['gratuit'])
+    )
+    assert expected.any()
+    assert query_rows(frame, query).tolist() == np.flatnonzero(expected).tolist()
+    assert len(query_rows(frame, RowQuery())) == len(frame)
+
+
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('column', ['puissance_nominale', 'date_mise_en_service', 'nom_operateur'])
+def test_sorted_rows_keep_missing_values_last(frame, column, descending):
+    positions = query_rows(frame, RowQuery(sort=column, descending=descending))
+    values = frame[column].take(positions).reset_index(drop=True)
+    known = values.notna()
+    assert not known.all()
+    # Every missing value comes after every known one
+    assert known.tolist() == sorted(known, reverse=True)
+    ordered = values[known].astype(str if column == 'nom_operateur' else values.dtype)
+    assert ordered.is_monotonic_decreasing if descending else ordered.is_monotonic_increasing
+
+
+def test_pages_cover_the_selection(frame):
+    positions = query_rows(frame, RowQuery(power=(50, 1000), sort='puissance_nominale'))
+    pages = [page_rows(frame, positions, page, 100) for page in range(-(-len(positions) // 100))]
+    assert [len(page) for page in pages[:-1]] == [100] * (len(pages) - 1)
+    assert 0 < len(pages[-1]) <= 100
+    pd.testing.assert_frame_equal(pd.concat(pages, ignore_index=True), take_rows(frame, positions))
+    assert page_rows(frame, positions, len(pages), 100).empty
+
+
+@pytest.mark.parametrize('selection', [slice(None), slice(0, 0)])
+def test_exports_hold_the_selected_rows(frame, selection):
+    positions = query_rows(frame, RowQuery(commune='commune 1', sort='nom_operateur'))[selection]
+    expected = take_rows(frame, positions)
+
+    csv = io.BytesIO()
+    write_csv(frame, positions, csv, chunk_rows=40)
+    assert csv.getvalue().decode('utf-8') == expected.to_csv(index=False)
+
+    parquet = io.BytesIO()
+    write_parquet(frame, positions, parquet, chunk_rows=40)
+    parquet.seek(0)
+    pd.testing.assert_frame_equal(pd.read_parquet(parquet), expected)
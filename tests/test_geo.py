@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from irve.aggregates import load_aggregates
+from irve.dataset import open_dataset
+from irve.geo import (
+    DEPARTMENT_NAMES,
+    DEPARTMENT_REGION,
+    UNKNOWN,
+    department_codes,
+    department_label,
+    departments_and_regions,
+    read_department_population,
+    region_population,
+)
+
+
+@pytest.mark.parametrize('insee, department', [
+    ('75056', '75'),
+    ('1001', '01'),
+    (' 69123 ', '69'),
+    ('2A004', '2A'),
+    ('97411', '974'),
+    ('97701', '977'),
+])
+def test_department_of_a_commune_code(insee, department):
+    assert department_codes([insee]).tolist() == [department]
+
+
+def test_every_department_has_a_region_and_a_name():
+    assert DEPARTMENT_REGION.keys() == DEPARTMENT_NAMES.keys()
+    assert len(DEPARTMENT_REGION) == 101 + 3
+
+
+def test_missing_and_unknown_codes_are_unknown():
+    insee = pd.Series(['75056', None, '99999', '97411', '75056'], dtype='category')
+    department, region = departments_and_regions(insee)
+    assert department.tolist() == ['75', UNKNOWN, '99', '974', '75']
+    assert region.tolist() == ['Île-de-France', UNKNOWN, UNKNOWN, 'La Réunion', 'Île-de-France']
+    assert department.dtype == 'category' and region.index.equals(insee.index)
+
+
+def test_region_population_needs_all_its_departments(tmp_path):
+    path = tmp_path / 'population.csv'
+    path.write_text('department,population\n22,600000\n29,900000\n35,1100000\n56,750000\n1,650000\n')
+    population = read_department_population(path)
+    assert population['01'] == 650_000
+    assert region_population(population) == {'Bretagne': 3_350_000}
+    assert department_label('29') == '29 Finistère' and department_label('99') == '99'
+
+
+def test_department_rollup_of_the_stations(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    departments = load_aggregates(dataset, cache_dir)['departments']
+    stations = dataset.stations
+    expected = department_codes(stations['code_insee_commune'].astype(str)).value_counts()
+    assert {row['Department']: row['Stations'] for row in departments} == expected.to_dict()
+    counts = [row['Stations'] for row in departments]
+    assert counts == sorted(counts, reverse=True)
@@ -0,0 +1,96 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import release_name, write_csv
+from irve import history
+from irve.history import History, snapshot_of, sync_history
+
+from .conftest import rewrite
+
+DATES = ['20250115', '20250215', '20250315', '20250415', '20250515', '20250615', '20250715']
+
+
+def evolve(step):
+    """Rows of the release after step updates: stations closed, powers changed and rows without a station id"""
+    def edit(rows):
+        rows = rows.iloc[60 * step:].copy()
+        rows.loc[rows.index[::40 + step], 'puissance_nominale'] = str(7 * (step + 1))
+        rows.loc[rows.index[-step:] if step else [], 'id_station_itinerance'] = ''
+        return rows
+    return edit
+
+
+def write_release(data_dir, step, date=None):
+    path = write_csv(data_dir / release_name(date or DATES[step]), 2000)
+    rewrite(path, evolve(step))
+    return path
+
+
+def expected_snapshot(path):
+    return snapshot_of(history._release_stations(path))
+
+
+def assert_same_snapshot(actual, expected):
+    pd.testing.assert_frame_equal(actual.sort_index(), expected.sort_index(), check_categorical=False)
+
+
+@pytest.fixture(autouse=True)
+def short_keyframe_interval(monkeypatch):
+    # Several keyframes and deltas in a short series
+    monkeypatch.setattr(history, 'KEYFRAME_INTERVAL', 3)
+
+
+def test_replayed_snapshots_match_the_releases(tmp_path):
+    paths = [write_release(tmp_path, step) for step in range(len(DATES))]
+    cache_dir = tmp_path / 'cache'
+    assert sync_history(tmp_path, cache_dir) == [path.name for path in paths]
+
+    stored = History(cache_dir)
+    assert [entry['keyframe'] for entry in stored.releases] == [True, False, False] * 2 + [True]
+    for position, path in enumerate(paths):
+        assert_same_snapshot(stored.snapshot(position), expected_snapshot(path))
+    sizes = stored.network_size()
+    assert sizes['stations'].tolist() == [len(expected_snapshot(path)) for path in paths]
+    assert sync_history(tmp_path, cache_dir) == []
+
+
+def test_backfilled_release_rewrites_the_later_ones(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    paths = {step: write_release(tmp_path, step) for step in (0, 1, 3, 4)}
+    sync_history(tmp_path, cache_dir)
+    paths[2] = write_release(tmp_path, 2)
+
+    assert sync_history(tmp_path, cache_dir) == [paths[step].name for step in (2, 3, 4)]
+    stored = History(cache_dir)
+    assert stored.names() == [paths[step].name for step in range(5)]
+    assert [entry['date'] for entry in stored.releases] == sorted(entry['date'] for entry in stored.releases)
+    for position in range(5):
+        assert_same_snapshot(stored.snapshot(position), expected_snapshot(paths[position]))
+
+
+def test_release_replaced_in_place_is_stored_again(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    paths = [write_release(tmp_path, step) for step in range(3)]
+    sync_history(tmp_path, cache_dir)
+
+    # The last release is published again under the same name with other content
+    rewrite(paths[-1], evolve(5))
+    assert sync_history(tmp_path, cache_dir) == [paths[-1].name]
+    stored = History(cache_dir)
+    assert stored.names() == [path.name for path in paths]
+    for position, path in enumerate(paths):
+        assert_same_snapshot(stored.snapshot(position), expected_snapshot(path))
+
+
+def test_touched_release_is_not_stored_again(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    path = write_release(tmp_path, 0)
+    sync_history(tmp_path, cache_dir)
+    segment = History(cache_dir).releases[0]['segment']
+
+    os.utime(path, ns=(0, 10 ** 18))
+    assert sync_history(tmp_path, cache_dir) == []
+    entry = History(cache_dir).releases[0]
+    assert entry['segment'] == segment and entry['mtime_ns'] == 10 ** 18
@@ -0,0 +1,61 @@
+import json
+import logging
+
+import pytest
+
+from irve import instrument
+from irve.instrument import cache_miss, instrumented, span
+
+
+@instrumented('load', cached=True)
+def load(computed):
+    if computed:
+        cache_miss()
+        with span('build'):
+            pass
+    return computed
+
+
+@pytest.fixture
+def recorder():
+    recorder = instrument.start(session='test')
+    yield recorder
+    instrument.stop()
+
+
+def test_spans_record_nesting_and_cache_outcome(recorder):
+    load(False)
+    load(True)
+    assert [(s['name'], s['depth'], s['cache']) for s in recorder.records()] == [
+        ('load', 0, 'hit'), ('load', 0, 'miss'), ('build', 1, None),
+    ]
+
+
+def test_span_left_open_by_an_exception_is_closed(recorder):
+    with pytest.raises(ValueError), span('outer'):
+        instrument.begin('inner')
+        raise ValueError
+    with span('next'):
+        pass
+    assert [(s['name'], s['depth']) for s in recorder.records()] == [('outer', 0), ('inner', 1), ('next', 0)]
+    assert recorder.open == []
+
+
+def test_nothing_is_recorded_when_off():
+    assert instrument.active() is None
+    assert load(True) is True
+    with span('anything') as opened:
+        assert opened is None
+
+
+def test_every_span_is_logged_with_the_run_context(caplog):
+    instrument.start(session='abc')
+    with caplog.at_level(logging.INFO, logger='irve.instrument'):
+        load(True)
+        instrument.stop()
+    events = [json.loads(record.getMessage()) for record in caplog.records]
+    assert [(event['event'], event.get('name')) for event in events] == [
+        ('span', 'build'), ('span', 'load'), ('run', None),
+    ]
+    assert {event['session'] for event in events} == {'abc'}
+    assert events[-1]['spans'] == 2
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from irve.aggregates import POWER_LABELS, compute_aggregates
+from irve.cube import load_cube
+from irve.dataset import open_dataset
+from irve.narrative import TARGET_CHARGE_POINTS, narrative_facts
+
+AGGREGATES = {
+    'totals': {'stations': 400, 'charge_points': 1000, 'pdc_rows': 950, 'power_kw': 25_000.0, 'operators': 3},
+    'yearly_installs': [
+        {'Year': 2018, 'New_Stations': 40},
+        {'Year': 2020, 'New_Stations': 90},
+        {'Year': 2021, 'New_Stations': 120},
+        {'Year': 2022, 'New_Stations': 120},
+    ],
+    'top_communes': [{'Commune': 'Paris (75)', 'Stations': 60}, {'Commune': 'Lyon (69)', 'Stations': 30}],
+    'top_operators': [{'Operator': 'Ionity', 'Stations': 200}, {'Operator': 'Izivia', 'Stations': 150}],
+    'power_tiers': [
+        {'Charging_Speed': label, 'Count': n} for label, n in zip(POWER_LABELS, [600, 200, 150, 50], strict=True)
+    ],
+    'plug_types': {'Type 2 (AC standard)': 350, 'CCS Combo (DC fast)': 80, 'CHAdeMO (DC)': 10},
+    'payment_methods': {},
+    'reservation': {'has': 100, 'total': 400},
+}
+
+
+def test_facts_are_read_from_the_aggregates():
+    facts = narrative_facts(AGGREGATES)
+    assert facts['power_mw'] == 25
+    assert facts['target_ratio'] == TARGET_CHARGE_POINTS / 1000
+    assert (facts['recent_years'], facts['avg_recent_installs']) == (3, 110)
+    # Ties go to the latest year
+    assert (facts['peak_year'], facts['peak_installs']) == (2022, 120)
+    assert (facts['top_operator'], facts['runner_up_operator']) == ('Ionity', 'Izivia')
+    assert facts['top_commune'] == 'Paris (75)'
+    assert (facts['slow_share'], facts['fast_share']) == (60, 20)
+    assert facts['reservation_share'] == 25
+
+
+def test_facts_of_an_empty_view():
+    empty = pd.DataFrame({
+        'nom_operateur': pd.Series([], dtype='category'),
+        'puissance_nominale': pd.Series([], dtype='float32'),
+    })
+    facts = narrative_facts(compute_aggregates(empty))
+    assert facts['stations'] == 0 and facts['target_ratio'] == 0
+    assert facts['peak_year'] is None and facts['top_operator'] is None
+    assert facts['slow_share'] == facts['fast_share'] == 0
+
+
+@pytest.mark.parametrize('region', [0, 1])
+def test_facts_of_a_filtered_view(release, region):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    cube = load_cube(dataset, cache_dir)
+    sliced = cube.slice(regions=[cube.values('region')[region]])
+    facts = narrative_facts(sliced.aggregates())
+    assert 0 < facts['stations'] < len(dataset.stations)
+    assert facts['top_operator'] in sliced.values('operator')
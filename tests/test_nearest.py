@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from irve.nearest import EARTH_RADIUS_KM, ChargerIndex
+
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+rng = np.random.default_rng(7)
+STATIONS = pd.DataFrame({
+    'longitude': rng.uniform(-2, 8, 2000).astype(np.float32),
+    'latitude': rng.uniform(42, 50, 2000).astype(np.float32),
+    'puissance_max': rng.choice([7.4, 22, 50, 150, 350], 2000).astype(np.float32),
+})
+STATIONS.loc[::100, 'latitude'] = np.nan
+POINTS = rng.uniform([-2, 42], [8, 50], size=(300, 2))
+
+
+def brute_force_km(min_power_kw):
+    """Distance from each point to every station of at least min_power_kw"""
+    eligible = STATIONS.dropna()
+    eligible = eligible[eligible['puissance_max'] >= min_power_kw]
+    return haversine_km(
+        POINTS[:, :1], POINTS[:, 1:],
+        eligible['longitude'].to_numpy(np.float64), eligible['latitude'].to_numpy(np.float64),
+    ), eligible
+
+
+@pytest.mark.parametrize('min_power_kw', [0, 50, 150])
+def test_nearest_matches_brute_force(min_power_kw):
+    index = ChargerIndex(STATIONS)
+    distances, eligible = brute_force_km(min_power_kw)
+    for point, row in zip(POINTS[:20], distances[:20], strict=True):
+        nearest = index.nearest(*point, k=5, min_power_kw=min_power_kw)
+        closest = np.argsort(row)[:5]
+        assert nearest.index.tolist() == eligible.index[closest].tolist()
+        np.testing.assert_allclose(nearest['distance_km'], row[closest], rtol=1e-6)
+
+
+@pytest.mark.parametrize('radius_km', [5, 20, 60])
+def test_uncovered_share_matches_brute_force(radius_km):
+    index = ChargerIndex(STATIONS)
+    distances, _ = brute_force_km(150)
+    expected = np.mean(distances.min(axis=1) > radius_km)
+    assert index.uncovered_share(POINTS[:, 0], POINTS[:, 1], radius_km, 150) == pytest.approx(expected)
+
+
+def test_distances_beyond_the_bound_are_infinite():
+    index = ChargerIndex(STATIONS)
+    distances, _ = brute_force_km(0)
+    closest = distances.min(axis=1)
+    bounded = index.distance_to_nearest(POINTS[:, 0], POINTS[:, 1], max_km=10)
+    np.testing.assert_allclose(bounded[closest <= 10], closest[closest <= 10], rtol=1e-6)
+    assert np.isinf(bounded[closest > 10]).all()
+
+
+def test_queries_with_too_few_stations():
+    index = ChargerIndex(STATIONS)
+    assert len(index.nearest(2.35, 48.85, k=5, min_power_kw=1000)) == 0
+    assert index.uncovered_share([2.35], [48.85], 50, min_power_kw=1000) == 1.0
+    assert index.uncovered_share([], [], 50) == 0.0
+    assert len(ChargerIndex(STATIONS.iloc[1:4]).nearest(2.35, 48.85, k=5, min_power_kw=0)) == 3
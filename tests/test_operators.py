@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from irve.cube import load_cube
+from irve.dataset import open_dataset
+from irve.operators import (
+    concentration,
+    lorenz_curve,
+    operator_profile,
+    operator_rollup,
+)
+
+
+def rollup(*stations):
+    return pd.DataFrame({'stations': stations}, index=[f'op{i}' for i in range(len(stations))])
+
+
+def gini_by_pairs(values):
+    """Gini coefficient as the mean absolute difference over twice the mean"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.abs(values[:, None] - values[None]).mean() / (2 * values.mean())
+
+
+@pytest.mark.parametrize('stations, hhi, level', [
+    ((25, 25, 25, 25), 2500, 'highly concentrated'),
+    ((10,) * 10, 1000, 'unconcentrated'),
+    ((100, 0, 0), 10_000, 'highly concentrated'),
+    ((40, 20, 20, 10, 10), 2600, 'highly concentrated'),
+    ((30, 30, 20, 10, 10), 2400, 'moderately concentrated'),
+])
+def test_hhi_and_its_level(stations, hhi, level):
+    market = concentration(rollup(*stations))
+    assert market['hhi'] == pytest.approx(hhi)
+    assert market['level'] == level
+    assert market['gini'] == pytest.approx(gini_by_pairs(stations))
+
+
+def test_top4_share_and_empty_market():
+    assert concentration(rollup(50, 5, 20, 5, 10, 10))['top4_share'] == pytest.approx(90)
+    assert concentration(rollup())['hhi'] == 0
+    assert concentration(rollup(0, 0))['gini'] == 0
+
+
+def test_lorenz_curve_area_gives_the_gini():
+    stations = rollup(120, 3, 45, 8, 8, 60, 1)
+    operators, held = lorenz_curve(stations)
+    assert (operators[0], held[0], operators[-1], held[-1]) == (0, 0, 100, 100)
+    assert (np.diff(held) >= 0).all() and (held <= operators + 1e-9).all()
+    area = np.trapezoid(held / 100, operators / 100)
+    assert 1 - 2 * area == pytest.approx(concentration(stations)['gini'])
+
+
+def test_rollup_of_the_cube_matches_the_station_table(release):
+    path, cache_dir = release
+    dataset = open_dataset(path, cache_dir)
+    operators = operator_rollup(load_cube(dataset, cache_dir))
+    stations = dataset.stations
+    expected = stations.groupby(stations['nom_operateur'].astype(str)).agg(
+        stations=('nbre_pdc', 'size'), charge_points=('nbre_pdc', 'sum'),
+    )
+    pd.testing.assert_frame_equal(
+        operators[['stations', 'charge_points']].sort_index(), expected.astype(np.int64).rename_axis('operator'),
+    )
+    assert operators['stations'].is_monotonic_decreasing
+    assert operators['station_share'].sum() == pytest.approx(100)
+
+    largest = operator_profile(operators, operators.index[0])
+    assert largest['rank'] == 1 and largest['stations'] == operators['stations'].max()
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from irve.projection import best_trend, cumulative_installs, fit_trends
+
+YEARS = np.arange(2012, 2026)
+
+
+def installs(cumulative):
+    """yearly_installs records whose running total is the given curve"""
+    new = np.diff(cumulative, prepend=0)
+    return [{'Year': int(year), 'New_Stations': float(n)} for year, n in zip(YEARS, new, strict=True)]
+
+
+def test_exponential_growth_is_recovered():
+    trends = fit_trends(installs(100 * 1.3 ** (YEARS - YEARS[0])), n_boot=200)
+    exponential = trends['exponential']
+    assert exponential.rmse < 1e-9
+    assert exponential.annual_rate == pytest.approx(30)
+    assert exponential.years.tolist() == list(range(2025, 2031))
+    np.testing.assert_allclose(exponential.factor, 1.3 ** np.arange(6))
+    np.testing.assert_allclose([exponential.low, exponential.high], [exponential.factor] * 2)
+
+
+def test_logistic_growth_is_told_apart():
+    t = YEARS - 2022
+    cumulative = 50_000 / (1 + np.exp(-0.6 * t))
+    trends = fit_trends(installs(cumulative), n_boot=200)
+    assert best_trend(trends).model == 'logistic'
+    # The saturation level is only known up to the grid step
+    assert trends['logistic'].params['saturation'] == pytest.approx(50_000, rel=0.05)
+    assert trends['logistic'].factor[-1] < trends['exponential'].factor[-1]
+
+
+def test_change_of_rate_is_found():
+    rate = np.where(YEARS < 2019, 0.1, 0.4)
+    cumulative = 1000 * np.exp(np.cumsum(rate))
+    trends = fit_trends(installs(cumulative), n_boot=200)
+    piecewise = best_trend(trends)
+    assert piecewise.model == 'piecewise'
+    assert YEARS[-1] + piecewise.params['breakpoint'] == 2018
+    assert piecewise.params['rate'] + piecewise.params['rate_change'] == pytest.approx(0.4)
+
+
+def test_bands_surround_the_noisy_projection():
+    rng = np.random.default_rng(1)
+    cumulative = np.maximum.accumulate(100 * 1.25 ** (YEARS - YEARS[0]) * rng.lognormal(0, 0.05, len(YEARS)))
+    trends = fit_trends(installs(cumulative), n_boot=500)
+    # The bootstrap is seeded
+    again = fit_trends(installs(cumulative), n_boot=500)
+    for model, trend in trends.items():
+        np.testing.assert_array_equal([trend.low, trend.high], [again[model].low, again[model].high])
+        assert (trend.low <= trend.factor + 1e-12).all() and (trend.factor <= trend.high + 1e-12).all()
+        assert trend.high[-1] > trend.low[-1]
+
+
+def test_years_before_the_first_install_are_left_out():
+    records = [{'Year': year, 'New_Stations': n} for year, n in [(2010, 0), (2011, 0), (2012, 5), (2013, 0), (2014, 7)]]
+    years, counts = cumulative_installs(records)
+    assert years.tolist() == [2012, 2013, 2014]
+    assert counts.tolist() == [5, 5, 12]
+    assert fit_trends(records) == {}
+    assert best_trend({}) is None
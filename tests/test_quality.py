@@ -0,0 +1,89 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irve import aggregates, cube, quality
+from irve.dataset import open_dataset
+from irve.quality import QUALITY_BITS, QUALITY_COLUMN, validate
+from irve.schema import PDC_KEY
+
+THIS_YEAR = date.today().year
+
+
+@pytest.fixture
+def checked():
+    """Rows tripping one rule each, after a clean first row"""
+    rows = pd.DataFrame([
+        ('clean', 22.0, '2020-01-01', 2.35, 48.85),
+        ('clean', 22.0, '2020-01-01', 2.35, 48.85),
+        ('watts', 22000.0, '2020-01-01', 2.35, 48.85),
+        ('negative', -5.0, '2020-01-01', 2.35, 48.85),
+        ('this_year', 22.0, f'{THIS_YEAR}-01-15', 2.35, 48.85),
+        ('next_year', 22.0, f'{THIS_YEAR + 1}-01-01', 2.35, 48.85),
+        ('too_early', 22.0, '1999-12-31', 2.35, 48.85),
+        ('swapped', 22.0, '2020-01-01', 48.85, 2.35),
+        ('abroad', 22.0, '2020-01-01', -100.0, 40.0),
+    ], columns=[PDC_KEY, 'puissance_nominale', 'date_mise_en_service',
+                'consolidated_longitude', 'consolidated_latitude'])
+    rows['date_mise_en_service'] = pd.to_datetime(rows['date_mise_en_service'])
+    corrected, report = validate(rows)
+    return corrected.set_index(PDC_KEY), report
+
+
+def rule_rows(report, name):
+    return next(rule['rows'] for rule in report['rules'] if rule['rule'] == name)
+
+
+def flagged(corrected, name):
+    bits = corrected[QUALITY_COLUMN].to_numpy()
+    return sorted(corrected.index[(bits & QUALITY_BITS[name]) > 0])
+
+
+def test_every_rule_is_counted(checked):
+    _, report = checked
+    assert report['rows'] == 9 and report['kept'] == 8
+    assert {rule['rule']: rule['rows'] for rule in report['rules']} == {
+        'duplicate_pdc': 1,
+        'power_in_watts': 1,
+        'power_out_of_range': 1,
+        'date_out_of_range': 2,
+        'swapped_coordinates': 1,
+        'outside_france': 1,
+    }
+
+
+def test_charge_points_commissioned_this_year_are_kept(checked):
+    corrected, report = checked
+    assert rule_rows(report, 'date_out_of_range') == 2
+    assert flagged(corrected, 'date_out_of_range') == ['next_year', 'too_early']
+    assert corrected['date_mise_en_service'].isna().sum() == 2
+    assert corrected.at['this_year', 'date_mise_en_service'].year == THIS_YEAR
+
+
+def test_values_are_repaired(checked):
+    corrected, _ = checked
+    assert corrected.at['watts', 'puissance_nominale'] == 22.0
+    assert np.isnan(corrected.at['negative', 'puissance_nominale'])
+    assert tuple(corrected.loc['swapped', ['consolidated_longitude', 'consolidated_latitude']]) == (2.35, 48.85)
+    assert corrected.loc['abroad', ['consolidated_longitude', 'consolidated_latitude']].isna().all()
+    for name in ('power_in_watts', 'power_out_of_range', 'swapped_coordinates', 'outside_france'):
+        assert len(flagged(corrected, name)) == 1
+    assert flagged(corrected, 'power_in_watts') == ['watts']
+    assert corrected.loc['clean', QUALITY_COLUMN] == 0
+
+
+def test_sidecars_are_rebuilt_when_the_accepted_years_change(release, monkeypatch):
+    path, cache_dir = release
+
+    def installs_until(last_year):
+        years = (2010, last_year)
+        for module, name in ((quality, 'SERVICE_YEARS'), (aggregates, 'YEAR_RANGE'), (cube, 'YEAR_RANGE')):
+            monkeypatch.setattr(module, name, years)
+        dataset = open_dataset(path, cache_dir)
+        return max(row['Year'] for row in aggregates.load_aggregates(dataset, cache_dir)['yearly_installs'])
+
+    assert installs_until(2024) == 2024
+    assert installs_until(2025) == 2025
+    assert len(list(cache_dir.glob('*.aggregates.json'))) == 1
@@ -0,0 +1,48 @@
+import shutil
+
+from irve.aggregates import load_aggregates
+from irve.dataset import open_dataset, prepared_path
+from irve.releases import refresh_dataset
+
+from .conftest import rewrite
+
+
+def fresh_totals(path, tmp_path):
+    """Totals of the release in path, built from scratch in a cache of their own"""
+    cache_dir = tmp_path / 'fresh'
+    dataset = open_dataset(path, cache_dir)
+    totals = load_aggregates(dataset, cache_dir)['totals'], len(dataset.stations)
+    shutil.rmtree(cache_dir)
+    return totals
+
+
+def shrink(rows):
+    # Drop the last stations and change the power of a few PDC
+    rows = rows.iloc[:-400].copy()
+    rows.loc[rows.index[:50], 'puissance_nominale'] = '350'
+    return rows
+
+
+def refresh_in_place(path, cache_dir, edit, keep_prepared):
+    previous = open_dataset(path, cache_dir)
+    aggregates = load_aggregates(previous, cache_dir)
+    if not keep_prepared:
+        # Evicted, or written by an older version of the app
+        prepared_path(path, previous.version, cache_dir).unlink()
+        previous = open_dataset(path, cache_dir)
+    rewrite(path, edit)
+    return refresh_dataset(previous, aggregates, path, cache_dir)
+
+
+def test_in_place_update_is_diffed_against_the_previous_content(release, tmp_path):
+    path, cache_dir = release
+    dataset, aggregates, delta = refresh_in_place(path, cache_dir, shrink, keep_prepared=True)
+    assert delta is not None and delta.removed.sum() > 0
+    assert (aggregates['totals'], len(dataset.stations)) == fresh_totals(path, tmp_path)
+
+
+def test_in_place_update_without_the_previous_frame_is_rebuilt(release, tmp_path):
+    path, cache_dir = release
+    dataset, aggregates, delta = refresh_in_place(path, cache_dir, shrink, keep_prepared=False)
+    assert delta is None
+    assert (aggregates['totals'], len(dataset.stations)) == fresh_totals(path, tmp_path)
@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from irve.schema import (
+    FLAG_COLUMNS,
+    FLAGS_COLUMN,
+    TABLE_COLUMNS,
+    has_any_flag,
+    has_flags,
+    iter_irve_csv,
+    pack_flags,
+    read_irve_csv,
+    unpack_flags,
+)
+
+CSV = """\
+nom_operateur,id_station_itinerance,id_pdc_itinerance,code_insee_commune,consolidated_commune,puissance_nominale,nbre_pdc,date_mise_en_service,consolidated_longitude,consolidated_latitude,coordonneesXY,tarification
+Ionity,FRIONP1,FRIONE1,75056,Paris,350,2,2021-05-04,2.35,48.85,"[2.35, 48.85]",0.5
+Ionity,FRIONP1,FRIONE2,75056,Paris,350.0,2,2021-05-04,,,"[2.36, 48.86]",0.5
+Izivia,FRIZIP1,FRIZIE1,69123,Lyon,n/a,,not a date,,,,
+"""
+
+
+def test_columns_are_read_with_their_declared_dtypes():
+    df = read_irve_csv(io.StringIO(CSV))
+    assert sorted(df.columns) == sorted(TABLE_COLUMNS)
+    assert 'tarification' not in df.columns
+    assert df['nom_operateur'].dtype == 'category'
+    assert df['puissance_nominale'].dtype == np.float32
+    assert df['nbre_pdc'].dtype == 'Int16'
+    assert df['date_mise_en_service'].dtype.kind == 'M'
+    assert df['consolidated_longitude'].dtype == np.float32
+
+
+def test_unparseable_values_are_missing():
+    df = read_irve_csv(io.StringIO(CSV))
+    assert df['puissance_nominale'].tolist()[:2] == [350, 350]
+    assert np.isnan(df.at[2, 'puissance_nominale'])
+    assert pd.isna(df.at[2, 'nbre_pdc'])
+    assert pd.isna(df.at[2, 'date_mise_en_service'])
+
+
+def test_missing_coordinates_fall_back_to_the_raw_point():
+    df = read_irve_csv(io.StringIO(CSV))
+    np.testing.assert_allclose(df['consolidated_longitude'][:2], [2.35, 2.36], rtol=1e-6)
+    np.testing.assert_allclose(df['consolidated_latitude'][:2], [48.85, 48.86], rtol=1e-6)
+    assert df.loc[2, ['consolidated_longitude', 'consolidated_latitude']].isna().all()
+
+
+def test_chunks_match_the_whole_file(release):
+    path, _ = release
+    whole = read_irve_csv(path)
+    chunks = list(iter_irve_csv(path, 700))
+    assert [len(chunk) for chunk in chunks] == [700] * 4 + [200]
+    # Each chunk only knows the categories of its own rows
+    chunks = [chunk.astype(whole.dtypes.to_dict()) for chunk in chunks]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
+
+
+def test_flags_round_trip_through_the_bitmask():
+    rng = np.random.default_rng(3)
+    flags = pd.DataFrame(rng.random((500, len(FLAG_COLUMNS))) < 0.4, columns=FLAG_COLUMNS)
+    packed = pack_flags(flags.copy())
+    assert list(packed.columns) == [FLAGS_COLUMN] and packed[FLAGS_COLUMN].dtype == np.uint8
+    pd.testing.assert_frame_equal(unpack_flags(packed), flags)
+    for col in FLAG_COLUMNS:
+        assert (has_flags(packed[FLAGS_COLUMN], col) == flags[col]).all()
+    both = flags['prise_type_2'] & flags['paiement_cb']
+    either = flags['prise_type_2'] | flags['paiement_cb']
+    assert (has_flags(packed[FLAGS_COLUMN], 'prise_type_2', 'paiement_cb') == both).all()
+    assert (has_any_flag(packed[FLAGS_COLUMN], 'prise_type_2', 'paiement_cb') == either).all()
+
+
+def test_flag_spellings_are_decoded():
+    values = ['true', 'True', '1', 'yes', 'false', 'FALSE', '0', None, 'n/a']
+    packed = pack_flags(pd.DataFrame({'gratuit': pd.Series(values, dtype='category')}))
+    assert has_flags(packed[FLAGS_COLUMN], 'gratuit').tolist() == [True] * 4 + [False] * 5
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from irve.dataset import open_dataset
+from irve.spatial import VIEWS, build_grid_index, cell_size
+
+
+@pytest.fixture
+def stations(release):
+    path, cache_dir = release
+    return open_dataset(path, cache_dir).stations
+
+
+def test_every_level_keeps_the_station_totals(stations):
+    grid = build_grid_index(stations, levels=4)
+    for level in range(4):
+        cells = grid.cells(level)
+        assert cells['stations'].sum() == len(stations)
+        assert cells['charge_points'].sum() == stations['nbre_pdc'].sum()
+        assert np.isclose(cells['power_kw'].astype(np.float64).sum(), stations['puissance_totale'].sum(), rtol=1e-6)
+    assert len(grid.cells(3)) > len(grid.cells(0))
+
+
+def test_cells_are_split_at_their_edges():
+    stations = pd.DataFrame({
+        'longitude': [-0.1, 0.1, 0.2, np.nan, 200.0],
+        'latitude': [45.1, 45.1, 45.3, 45.0, 45.0],
+    })
+    cells = build_grid_index(stations, levels=2).cells(1)
+    # Coordinates that are missing or out of range are left out
+    assert cells['stations'].sum() == 3
+    assert sorted(cells['stations']) == [1, 2]
+    assert cell_size(1) == 0.5
+
+
+def test_finest_level_under_the_cell_budget(stations):
+    grid = build_grid_index(stations)
+    bbox = VIEWS['Metropolitan France']
+    level = grid.pick_level(bbox, max_cells=200)
+    assert len(grid.cells(level, bbox)) <= 200
+    assert level == len(grid.levels) - 1 or len(grid.cells(level + 1, bbox)) > 200
+    inside = grid.cells(level, bbox)
+    assert inside['lon'].between(bbox[0], bbox[2]).all() and inside['lat'].between(bbox[1], bbox[3]).all()
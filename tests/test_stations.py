@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from irve.schema import FLAG_BITS, FLAGS_COLUMN, PDC_KEY, STATION_KEY, has_flags
+from irve.stations import (
+    SeenPdc,
+    build_stations,
+    finalize_stations,
+    merge_partials,
+    station_partials,
+)
+
+
+def pdc_rows(**columns):
+    """Prepared PDC rows of a few stations, with the id columns as categories"""
+    df = pd.DataFrame(columns)
+    for col in (STATION_KEY, PDC_KEY, 'nom_operateur', 'commune'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+ROWS = pdc_rows(**{
+    STATION_KEY: ['S1', 'S1', 'S1', 'S2', None, None],
+    PDC_KEY: ['P1', 'P2', 'P3', 'P4', 'P5', 'P6'],
+    'nom_operateur': ['Ionity', 'Ionity', 'Ionity', 'Izivia', 'Tesla', 'Tesla'],
+    'commune': ['Paris', 'Paris', 'Paris', 'Lyon', 'Lille', 'Lille'],
+    'nbre_pdc': pd.array([4, 4, 4, None, 1, 1], dtype='Int16'),
+    'puissance_nominale': np.array([350, 50, np.nan, 22, 7.4, 11], dtype=np.float32),
+    FLAGS_COLUMN: np.array([
+        FLAG_BITS['prise_type_combo_ccs'], FLAG_BITS['prise_type_2'], 0,
+        FLAG_BITS['prise_type_2'] | FLAG_BITS['paiement_cb'], 0, 0,
+    ], dtype=np.uint8),
+})
+
+
+def test_pdc_rows_collapse_to_their_station():
+    stations = build_stations(ROWS)
+    s1 = stations.loc['S1']
+    assert s1['pdc_rows'] == 3
+    assert s1['nbre_pdc'] == 4
+    assert s1['puissance_max'] == 350
+    assert s1['puissance_totale'] == 400
+    assert has_flags(s1[FLAGS_COLUMN], 'prise_type_combo_ccs', 'prise_type_2')
+    # S2 does not declare its PDC count
+    assert stations.loc['S2', 'nbre_pdc'] == 1
+
+
+def test_rows_without_a_station_id_are_stations_of_their_own():
+    stations = build_stations(ROWS)
+    assert len(stations) == 4
+    assert sorted(stations.index[stations.index.str.startswith('#')]) == ['#4', '#5']
+    assert (stations.loc[['#4', '#5'], 'pdc_rows'] == 1).all()
+
+
+def test_partials_of_chunks_merge_to_the_whole_table():
+    # Station S1 is split across the two chunks
+    parts = [station_partials(ROWS.iloc[:2]), station_partials(ROWS.iloc[2:])]
+    merged = finalize_stations(merge_partials(parts))
+    whole = build_stations(ROWS)
+    pd.testing.assert_frame_equal(merged.loc[list(whole.index)], whole, check_categorical=False)
+
+
+def test_pdc_seen_in_an_earlier_chunk_is_dropped():
+    seen = SeenPdc()
+    first = seen.filter(ROWS.iloc[:4])
+    # P3 is listed again, and a PDC without id is always kept
+    again = pdc_rows(**{PDC_KEY: ['P3', 'P7', None], STATION_KEY: ['S1', 'S3', 'S3']})
+    second = seen.filter(again)
+    assert len(first) == 4
+    assert second.index.tolist() == [1, 2]
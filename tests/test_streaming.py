@@ -0,0 +1,27 @@
+import pytest
+
+from irve.aggregates import AggregateAccumulator, load_aggregates, stream_aggregates
+from irve.dataset import open_dataset
+
+
+@pytest.fixture
+def full_aggregates(release, tmp_path):
+    """Aggregates of the release computed from its whole prepared frame"""
+    path, _ = release
+    return load_aggregates(open_dataset(path, tmp_path / 'full'), tmp_path / 'full')
+
+
+@pytest.mark.parametrize('chunksize', [3000, 1000, 257])
+def test_streamed_aggregates_match_the_full_frame(release, full_aggregates, chunksize, monkeypatch):
+    path, cache_dir = release
+    # Merge the partial station tables every few chunks too
+    monkeypatch.setattr(AggregateAccumulator, 'MERGE_EVERY', 3)
+    assert stream_aggregates(path, chunksize, cache_dir) == full_aggregates
+
+
+def test_streamed_aggregates_share_the_sidecar(release):
+    path, cache_dir = release
+    streamed = stream_aggregates(path, 500, cache_dir)
+    dataset = open_dataset(path, cache_dir)
+    assert load_aggregates(dataset, cache_dir) == streamed
+    assert not dataset.loaded('frame')
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.synthetic import release_name, write_csv
+from irve import cache, history
+from irve.aggregates import sidecar_path
+from irve.cube import cube_path
+from irve.dataset import prepared_path
+from irve.history import History
+from irve.quality import report_path
+from irve.stations import stations_path
+from irve.warmup import main, warm
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_warm_up_writes_every_sidecar(release):
+    path, cache_dir = release
+    dataset = warm(path, cache_dir, log=lambda line: None)
+    for sidecar in (prepared_path, stations_path, sidecar_path, cube_path, report_path):
+        assert sidecar(path, dataset.version, cache_dir).exists(), sidecar.__name__
+    assert History(cache_dir).names() == [path.name]
+
+
+def test_second_warm_up_reads_the_sidecars(release, monkeypatch):
+    path, cache_dir = release
+    warm(path, cache_dir, log=lambda line: None)
+    def read_irve_csv(source, **kwargs):
+        raise AssertionError(f"{source} was parsed again")
+
+    monkeypatch.setattr(cache, 'read_irve_csv', read_irve_csv)
+    monkeypatch.setattr(history, 'read_irve_csv', read_irve_csv)
+    steps = []
+    warm(path, cache_dir, log=steps.append)
+    assert [line.split()[0] for line in steps] == ['version', 'frame', 'aggregates', 'stations', 'cube', 'history']
+
+
+def test_warm_up_of_an_empty_directory_fails(tmp_path, capsys):
+    assert main(['--data-dir', str(tmp_path), '--cache-dir', str(tmp_path / 'cache')]) == 1
+    assert 'No IRVE consolidation CSV' in capsys.readouterr().err
+
+
+def test_warm_up_serves_the_newest_release(tmp_path, capsys):
+    write_csv(tmp_path / release_name('20250901'), 500)
+    write_csv(tmp_path / release_name('20251001'), 500)
+    assert main(['--data-dir', str(tmp_path), '--cache-dir', str(tmp_path / 'cache')]) == 0
+    assert f"Warming {release_name('20251001')}" in capsys.readouterr().out
+
+
+def test_heavy_modules_are_imported_on_first_use():
+    # A fresh interpreter: the test session has already imported them
+    code = (
+        "import sys; import irve.nearest, irve.corridors, irve.aggregates, irve.cube; "
+        "print(sorted(m for m in ('scipy.spatial', 'plotly.express') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert out.strip() == '[]'